@@ -1,39 +1,29 @@
-import fastf1 
 from fastf1 import plotting
 import numpy as np
 from matplotlib import pyplot as plt
+from derived_channels import derived_channels
+import lap_events
+import session_cache
 
 
 
-session_race = fastf1.get_session(2023, 'Silverstone', 'R')
-session_race.load()
+session_race = session_cache.open_session(2023, 'Silverstone', 'R')
 # We choose the driver and obtain his best lap
 driver = 'VER'
 fastest_driver = session_race.laps.pick_drivers(driver).pick_fastest()
 telemetry_driver = fastest_driver.get_telemetry().add_distance()
 
-v = telemetry_driver['Speed'] / 3.6    # Speed in m/s
-time_float = telemetry_driver['Time'] / np.timedelta64(1, 's')    # Time as a float variable
-ver_laps = session_race.laps.pick_drivers('VER')
-Car_data = ver_laps.get_telemetry().add_distance() # getting the fastest drivers telemetry from the car_data field 
+channels = derived_channels(telemetry_driver) # speed in m/s, brake %, DRS open and acceleration, without touching telemetry_driver
 
 
+# Gear changes over the whole race, found lap by lap instead of building one merged telemetry frame for every lap
+gear_changes = lap_events.session_events(session_race, drivers=[driver], kinds=['gear_shift'])
 
 
-# Find gear changes by comparing consecutive rows
-gear = Car_data['nGear']  # 'nGear' in older FastF1 versions
-gear_changes = Car_data[gear.shift() != gear]  # Only rows where gear changes
-
-
-# since the brake being on is a true/false (Boolean) its best to change it to integers
-# making it easier to plot. 
-telemetry_driver['Brake'] = telemetry_driver['Brake'].astype(int)
-telemetry_driver['DRS'] = telemetry_driver['DRS'].astype(int) # the same is applied to DRS
- 
-
-# We calculate the longitudinal acceleration and filter it
-ax = np.gradient(v)/np.gradient(time_float)
-ax_smooth = np.convolve(ax, np.ones((3,))/3, mode = 'same')
+# since the brake being on is a true/false (Boolean) its best to plot it as 0 / 100,
+# and DRS as 0 / 1 (open). derived_channels gives us both, plus the filtered longitudinal acceleration.
+ax = channels.accel_raw
+ax_smooth = channels.accel_smooth
 
 plt.style.use('dark_background')
 
@@ -51,7 +41,7 @@ axes[1].legend()
 
 # Throttle and Brake plot
 axes[2].plot(telemetry_driver['Distance'], telemetry_driver['Throttle'], label='Throttle', color='green')
-axes[2].plot(telemetry_driver['Distance'], telemetry_driver['Brake'] * 100, label='Brake', color='red')
+axes[2].plot(telemetry_driver['Distance'], channels.brake_pct, label='Brake', color='red')
 axes[2].set(xlabel="Distance (m)", ylabel="Throttle / Brake (%)")
 axes[2].legend()
 
@@ -61,7 +51,7 @@ axes[3].set(xlabel="Distance (m)", ylabel="Gear")
 axes[3].legend()
 
 #DRS plot
-axes[4].plot(telemetry_driver['Distance'], telemetry_driver['DRS'], label='DRS', color='pink')
+axes[4].plot(telemetry_driver['Distance'], channels.drs_open, label='DRS', color='pink')
 axes[4].set(xlabel="Distance (m)", ylabel="DRS")
 axes[4].set_yticks([0, 1])
 axes[4].set_yticklabels(['OFF', 'ON']) # manually set the axis to just say on or Off
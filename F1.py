@@ -1,19 +1,16 @@
 #The packages needed are imported
-import fastf1 as ff1
 from fastf1 import plotting
 import numpy as np
 from matplotlib import pyplot as plt
+from tyre_load import CarParameters, compute_loads, session_load_summary
+import session_cache
 
 
-# Enable the cache by providing the name of the cache folder
-ff1.Cache.enable_cache('cache')
-
 # Setup plotting
 plotting.setup_mpl()
 
 # We choose the session and load it
-session = ff1.get_session(2022, 'Abu Dhabi', 'Q')
-session.load()
+session = session_cache.open_session(2022, 'Abu Dhabi', 'Q') # also works offline against replay_server.py
 
 # We choose the driver and obtain his best lap
 driver = 'VER'
@@ -36,46 +33,19 @@ axes[1].plot(telemetry_driver['Distance'], ax_smooth, linewidth = 2, label = 'Fi
 axes[1].set(xlabel = "Distance (m)", ylabel = "Longitudinal Acceleration (m/s^2)")
 axes[1].legend()
 
-m = 798    #kg
-g = 9.81
-
-staticWeightTot = m*g
-
-fractionWeightFront = 0.46
-
-staticWeightFront = fractionWeightFront*staticWeightTot
-staticWeightRear  = staticWeightTot - staticWeightFront
-
-# III Model: the effect of drag and downforce are added
-
-rho = 1.225
-CdA = 1.7               #Drag Coefficient * Frontal Area
-efficiency = 3.7
-ClA = efficiency*CdA    #Downforce Coefficient * Frontal Area
+# The static weight, inertial load transfer (II model) and drag / downforce (III model) now live in tyre_load.py.
+# Change the car by passing different values, e.g. CarParameters(cda=1.9, cog_height=0.3)
+params = CarParameters()
+loads = compute_loads(v.to_numpy(), ax_smooth, params)
 
-dragHeight = 0.5 #Height at which the drag force is applied
+dragForce = loads.drag
+downForce = loads.downforce
 
-# We compute the drag and downforce
-dragForce = 0.5*CdA*rho*np.square(v)
-downForce = 0.5*ClA*rho*np.square(v)
+loadFront_loadTransferModel = loads.front_transfer
+loadRear_loadTransferModel  = loads.rear_transfer
 
-fractionDownforceFront = 0.4    # Front downforce as a fraction of the total downforce (Aero balance)
-
-downForceFront = fractionDownforceFront*downForce
-downForceRear = (1 - fractionDownforceFront)*downForce
-
-# II Model: Inertial Load Transfer added
-CoGheight = 0.25   #m
-wheelbase = 3.6    #m
-
-deltaLoad = -CoGheight/wheelbase*m*ax_smooth    #Positive Longitudinal Acceleration -> Load shifts to the rear axle (deltaLoad < 0)
-
-loadFront_loadTransferModel = staticWeightFront + deltaLoad
-loadRear_loadTransferModel  = staticWeightRear  - deltaLoad
-deltaLoadbyDrag = - dragHeight/wheelbase*dragForce    #Always negative: the drag shifts the load from the front to the rear!
-
-loadFront_loadTransferAeroModel = loadFront_loadTransferModel + downForceFront + deltaLoadbyDrag
-loadRear_loadTransferAeroModel  = loadRear_loadTransferModel  + downForceRear  - deltaLoadbyDrag
+loadFront_loadTransferAeroModel = loads.front
+loadRear_loadTransferAeroModel  = loads.rear
 
 
 
@@ -100,6 +70,10 @@ axes[2].plot(telemetry_driver['Distance'], loadRear_loadTransferAeroModel, ':b',
 axes[2].set(xlabel = "Distance (m)", ylabel = "Vertical Load (N)")
 axes[2].legend()
 
+# The same model over every lap of every driver in one pass: peak / mean axle loads per lap
+summary = session_load_summary(session, params)
+print(summary.sort_values('PeakFront', ascending=False).head(10))
+
 plt.show()
 
 
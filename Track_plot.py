@@ -1,78 +1,54 @@
-import fastf1
-import numpy as np
 import plotly.graph_objects as go
 import streamlit as st
+from track_geometry import GEOMETRY_DIR, get_track_geometry
 
-def rotate(xy, *, angle):
-    """Rotate an (x, y) coordinate array by a given angle in radians."""
-    rot_mat = np.array([[np.cos(angle), np.sin(angle)],
-                        [-np.sin(angle), np.cos(angle)]])
-    return np.matmul(xy, rot_mat)
-
-def plot_track_map_plotly(year=2023, event='Silverstone', session_type='Q',
-                          driver=None, highlight_corners=True):
+def plot_track_map_plotly(session, driver=None, highlight_corners=True, show=True, root=GEOMETRY_DIR):
     """
     Plot an F1 track map in Plotly and display it in Streamlit.
 
     Args:
-        year (int): The season year.
-        event (str): Grand Prix name (e.g. 'Monza').
-        session_type (str): 'Q', 'R', 'FP1', etc.
-        driver (str): Optional driver code to highlight fastest lap.
+        session (fastf1.core.Session): An already loaded session (see session_cache.get_session).
+        driver (str): Optional driver code, shown in the title. The track line itself comes from the
+            cached circuit geometry (track_geometry.py), so it is the same for every driver.
         highlight_corners (bool): Show corner numbers on the map.
+        show (bool): Render with st.plotly_chart. The figure is returned either way.
+        root (str): Directory of the on-disk geometry cache (track_geometry.GEOMETRY_DIR).
     """
 
-    # Load session and lap data
-    session = fastf1.get_session(year, event, session_type)
-    session.load()
-
-    # Pick fastest lap (either from a specific driver or overall)
-    if driver:
-        lap = session.laps.pick_driver(driver).pick_fastest()
-    else:
-        lap = session.laps.pick_fastest()
-
-    pos = lap.get_pos_data()
-    circuit_info = session.get_circuit_info()
-
-    # Rotate track to match circuit info orientation
-    track = pos[['X', 'Y']].to_numpy()
-    track_angle = circuit_info.rotation / 180 * np.pi
-    rotated_track = rotate(track, angle=track_angle)
+    # Rotated centreline, corners and labels, computed once per circuit and season
+    geometry = get_track_geometry(session, root=root)
 
     # Start Plotly figure
     fig = go.Figure()
 
     # Add track line
     fig.add_trace(go.Scatter(
-        x=rotated_track[:, 0],
-        y=rotated_track[:, 1],
+        x=geometry.track[:, 0],
+        y=geometry.track[:, 1],
         mode='lines',
         line=dict(color='white', width=4),
         name='Track'
     ))
 
-    # Optionally add corner markers and labels
+    # Optionally add corner markers and labels, all corners in a single trace
     if highlight_corners:
-        for _, corner in circuit_info.corners.iterrows():
-            txt = f"{corner['Number']}{corner['Letter']}"
-            # Rotate the actual corner coordinates
-            track_x, track_y = rotate([corner['X'], corner['Y']], angle=track_angle)
-            fig.add_trace(go.Scatter(
-                x=[track_x],
-                y=[track_y],
-                mode='markers+text',
-                marker=dict(color='red', size=8),
-                text=[txt],
-                textposition="top center",
-                name=f"Corner {txt}",
-                showlegend=False
-            ))
+        fig.add_trace(go.Scatter(
+            x=geometry.corners[:, 0],
+            y=geometry.corners[:, 1],
+            mode='markers+text',
+            marker=dict(color='red', size=8),
+            text=geometry.labels,
+            textposition="top center",
+            name="Corners",
+            hovertemplate="Corner %{text}<extra></extra>",
+            showlegend=False
+        ))
 
     # Style the layout
+    title = f"{session.event['Location']} Track Map"
     fig.update_layout(
         template="plotly_dark",
-        title=f"{session.event['Location']} Track Map",
+        title=f"{title} ({driver})" if driver else title,
         xaxis=dict(visible=False),
         yaxis=dict(visible=False),
         height=700
@@ -82,4 +58,6 @@ def plot_track_map_plotly(year=2023, event='Silverstone', session_type='Q',
     fig.update_yaxes(scaleanchor="x", scaleratio=1)
 
     # Display in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
@@ -1,96 +1,26 @@
 # importing librabries and also functions made in other files.
+# Only what the selectors need is imported up here; fastf1, plotly and the plotting modules are imported when the
+# button is first clicked, so a cold start paints the page without waiting for them (see import_budget.py).
 import streamlit as st                        
 import streamlit.components.v1 as components
 import pandas as pd
-import fastf1
-import json
-import os
-from Track_plot import plot_track_map_plotly
-from plotly_functions import (
-    plot_laptimes,
-    plot_speed_plotly,
-    plot_longitudinal_acceleration_plotly,
-    plot_throttle_brake_plotly,
-    plot_gear_plotly,
-    plot_drs_plotly
-)
-
-# Enable cache
-fastf1.Cache.enable_cache('cache')
-
-# --- Persistent driver DB file ---
-DRIVER_DB_FILE = "driver_db.json" # Driver database file. 
-
-# Load DB from disk if exists
-if os.path.exists(DRIVER_DB_FILE): # i noticed after testing the web app, it was slow in tetching driver data, so a fix was to create a simple database for each call you make
-    # ^ the above code checks if the file exists, if it does it loads it loads the contents of the JSON file into the Python variable DRIVER_DB (pyhton Dictionary)
-    with open(DRIVER_DB_FILE, "r") as f:
-        DRIVER_DB = json.load(f)
-else:
-    DRIVER_DB = {} # if not create one.
+import driver_index
+import schedule_index
+from click_handler import load_fastest_lap # the button's handler, fastf1 and plotly are imported on its first call
 
-def save_driver_db(): # this is a function that creates a new entry into the Driver_DB JSON file, after a session is loaded by a user. 
-    with open(DRIVER_DB_FILE, "w") as f:
-        json.dump(DRIVER_DB, f)
-
-# --- Static + cached driver list function ---
+# --- Driver index ---
+# i noticed after testing the web app, it was slow in fetching driver data, so a fix was to keep a small database of every
+# entry list we have seen. It now lives in SQLite (driver_index.py) and only loads session metadata, never laps or telemetry.
 def get_drivers_for_event(year, gp, session_type): # here is where the actually telemtry app starts 
     """
-    Returns drivers from DB if available.
-    If missing, fetch once and cache for all session types of the GP/year.
+    Returns drivers from the driver index if available.
+    If missing, fetch the entry list once (metadata only) and store it.
     """
-    key = f"{year}::{gp}::{session_type}" # Driver_Db is a dictionary so in order to keep things organised a key, unique identifier  for that specific event/session.
-    if key in DRIVER_DB: # since each call is stored in the database, if we make a call that has been made before we simply just have to retrive they key 
-        return DRIVER_DB[key]
-    # Auto-fetch if not found
-    drivers = fetch_and_cache_drivers(year, gp, session_type)
-    return drivers
+    return driver_index.get_drivers(year, gp, session_type)
 
 def fetch_and_cache_drivers(year, gp, session_type):
-    """Fetch real drivers from FastF1, save to DB."""
-    session = fastf1.get_session(year, gp, session_type) # we initialize the seeion by calling faftf1 and loading it 
-    session.load()
-
-    try:
-        from fastf1.plotting import team_color as get_team_color # in the driver dropdown menu we want each drivers name abriviated and 
-        # assosciated with the team colour they drive for.
-    except ImportError:
-        get_team_color = None
-
-    FALLBACK_TEAM_COLORS = { #  each individual team and their colours 
-        'Mercedes': '#00D2BE',
-        'Ferrari': '#DC0000',
-        'Red Bull': '#1E41FF',
-        'Alpine': '#0090FF',
-        'McLaren': '#FF8700',
-        'Alfa Romeo': '#900000',
-        'Aston Martin': '#006F62',
-        'Haas': '#FFFFFF',
-        'AlphaTauri': '#2B4562',
-        'Alpha Tauri': '#2B4562',
-        'Williams': '#005AFF'
-    }
-
-    drivers = [] # creating an empty list of drivers
-    for drv in session.drivers:
-        drv_data = session.get_driver(drv) # store driver data fetched from FasfF1
-        code = drv_data.get("Abbreviation", "").upper() # abbriviate their name and change to upper case for consistency 
-        team = drv_data.get("TeamName", "") # teamname
-        if get_team_color: # if get team color from above == None
-            try:
-                color = get_team_color(team) # if get_team_color(team) works, you get the real team color.
-            except Exception:
-                color = FALLBACK_TEAM_COLORS.get(team, "#999999") # if it does not use the fallback team colours, I see it as a fail safe, since FastF1 is ever changing 
-        else:
-            color = FALLBACK_TEAM_COLORS.get(team, "#999999") #if all esle fails use a safe fallback gray
-        drivers.append((code, team, color)) # lastly each driver in our list has their abribiated name, team and colour.
-
-    for sess_type in ["Q", "R", "FP1", "FP2", "FP3"]: # we iterate through a list of session assigning each a key and attaching them to our previous driver list
-        key = f"{year}::{gp}::{sess_type}" # now we know what year, team ,team colour and event that driver partook in.
-        DRIVER_DB[key] = drivers
-
-    save_driver_db()
-    return drivers
+    """Fetch real drivers from FastF1, save to the driver index."""
+    return driver_index.refresh_drivers(year, gp, session_type)
 
 # --- Page settings ---
 st.set_page_config(layout="wide", page_title="F1 Telemetry Viewer")
@@ -99,12 +29,14 @@ st.title("🏎️ F1 Telemetry Visualizer")
 # Select Year
 year = st.selectbox("Select Year", list(range(2019, 2025)))
 
-# Get GP list for that year
-gp_list = fastf1.get_event_schedule(year)['EventName'].unique().tolist()
+# Get GP list for that year (from the in-memory schedule index, no fastf1 call on reruns)
+gp_list = schedule_index.event_names(year)
 gp = st.selectbox("Select Grand Prix", gp_list)
 
 #  dont realy need this: st.write(f"Selected: {year} - {gp}")
-session_type = st.selectbox("Session", ["Q", "R", "FP1", "FP2", "FP3"])
+held_sessions = schedule_index.event_sessions(year, gp) # sprint weekends don't have FP2/FP3
+session_options = [s for s in driver_index.SESSION_TYPES if s in held_sessions] or driver_index.SESSION_TYPES
+session_type = st.selectbox("Session", session_options)
 
 # Get drivers (instant if cached)
 drivers = get_drivers_for_event(year, gp, session_type)
@@ -154,6 +86,13 @@ dropdown_html = f"""
 # Render the custom dropdown in Streamlit
 components.html(dropdown_html, height=50)
 
+separate_charts = st.checkbox("Separate chart per channel") # default is one stacked dashboard with linked zoom
+compare_field = st.checkbox("Compare against the whole field (lap delta)") # every driver's fastest lap vs the selected driver
+corner_breakdown = st.checkbox("Corner breakdown") # entry / apex / exit speed, braking point and time for every corner
+# every driver's stints, fuel corrected, in one view. The fuel model only holds for races and sprints, so it is not
+# offered for practice or qualifying
+race_pace = session_type in ("R", "S") and st.checkbox("Race pace and tyre degradation")
+
 # --- Load Fastest Lap ---
 if st.button("Load Fastest Lap"): # once you click a button to load their fastest lap
     selected_driver = st.session_state.driver_selection
@@ -169,26 +108,62 @@ if st.button("Load Fastest Lap"): # once you click a button to load their fastes
     else:
         try:
             with st.spinner("Fetching data..."):
-                progress = st.progress(0) # this is our progress bar 
-                session = fastf1.get_session(year, gp, session_type) # get our selected session
-                session.load()
-                progress.progress(30)
-
-                lap = session.laps.pick_driver(selected_driver).pick_fastest() # load that drivers fastest lap
-                progress.progress(60)
-
-                telemetry_driver = lap.get_car_data().add_distance() # telemetry_driver includes Time, Speed, throttle, Brake, Engine Rpm and distance
-                progress.progress(80)
-
-                plot_track_map_plotly(year, gp, session_type, selected_driver, highlight_corners=True) # Now we call our plot_track map function
-                fig = plot_laptimes(session, selected_driver)
-                plot_speed_plotly(telemetry_driver) # speed  plot
-                plot_longitudinal_acceleration_plotly(telemetry_driver) # acceleration plot
-                plot_throttle_brake_plotly(telemetry_driver) # Throttle Vs Brake plot 
-                plot_gear_plotly(telemetry_driver) # gear Plot
-                plot_drs_plotly(telemetry_driver) # Drs plot 
-
-                progress.progress(100)
+                progress = st.progress(0) # this is our progress bar, it moves by how long each stage really took on earlier clicks
+                # the whole click lives in click_handler.py (load_test.py runs the same one), we only say where things go
+                timer = load_fastest_lap(
+                    year, gp, session_type, selected_driver,
+                    separate_charts=separate_charts, compare_field=compare_field,
+                    corner_breakdown=corner_breakdown, race_pace=race_pace,
+                    show_figure=lambda figure: st.plotly_chart(figure, use_container_width=True),
+                    show_table=lambda frame: st.dataframe(frame, hide_index=True),
+                    on_progress=progress.progress
+                )
                 progress.empty()
+
+            with st.expander(f"Timing breakdown ({timer.total:.2f} s)"): # where did the time for this click go
+                breakdown = pd.DataFrame(timer.breakdown(), columns=["Stage", "Seconds", "Share"])
+                breakdown["Share"] *= 100
+                st.dataframe(
+                    breakdown,
+                    column_config={"Share": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f%%")},
+                    hide_index=True
+                )
+        except Exception as e:
+            st.error(f"Something went wrong: {e}")
+
+# --- Whole weekend ---
+# every session of the event loads at the same time (weekend_loader.py), each one shows up as soon as it is ready
+if st.button("Compare Across the Weekend"):
+    selected_driver = st.session_state.driver_selection
+    if not selected_driver or selected_driver == "???":
+        st.info("Load the driver list first (Load Fastest Lap).")
+    else:
+        try:
+            import weekend_loader
+            from plotly_functions import plot_weekend_speed_plotly, plot_weekend_long_runs_plotly
+
+            session_types = weekend_loader.weekend_sessions(year, gp)
+            slots = {s: st.empty() for s in session_types} # one status line per session, filled in as they finish
+            for s, slot in slots.items():
+                slot.info(f"{s}: loading...")
+
+            sessions = {}
+            best_table = st.empty()
+            for s, session, seconds, error in weekend_loader.load_weekend(year, gp, session_types):
+                if error is not None:
+                    slots[s].warning(f"{s}: not available ({error})")
+                    continue
+                sessions[s] = session
+                slots[s].success(f"{s}: loaded in {seconds:.1f} s")
+                best_table.dataframe(weekend_loader.best_laps(sessions, selected_driver).round(3), hide_index=True)
+
+            if sessions:
+                plot_weekend_speed_plotly(weekend_loader.speed_traces(sessions, selected_driver), selected_driver)
+                runs = weekend_loader.long_runs(sessions, selected_driver)
+                if runs.empty:
+                    st.info(f"No long runs ({weekend_loader.LONG_RUN_LAPS}+ clean laps) for {selected_driver}.")
+                else:
+                    plot_weekend_long_runs_plotly(runs, selected_driver)
+                    st.dataframe(runs.round(3), hide_index=True)
         except Exception as e:
             st.error(f"Something went wrong: {e}")
@@ -0,0 +1,130 @@
+# Headless batch renderer for the matplotlib dashboard (mpl_dashboard.py): every driver of a session, or every
+# session of a weekend, written to PNG / SVG / PDF with the Agg backend.
+# Jobs fan out over a process pool. Each worker enables the fastf1 cache once, loads a session at most once
+# (session_cache keeps it for the worker's life) and reuses one DashboardTemplate for all its renders.
+#
+#   python batch_report.py 2023 Silverstone Q                  # every driver of qualifying
+#   python batch_report.py 2023 Silverstone --weekend --formats png pdf --workers 4
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+REPORT_DIR = "reports"
+FORMATS = ["png", "svg", "pdf"]
+
+_template = None  # one per worker process
+
+
+def _init_worker(cache_dir):
+    global _template
+    import matplotlib
+    matplotlib.use('Agg')  # before pyplot is imported anywhere in this process
+    import session_cache
+    from mpl_dashboard import DashboardTemplate
+
+    session_cache.enable_cache(cache_dir)
+    _template = DashboardTemplate()
+
+
+def report_path(out_dir, year, event, session_type, driver, fmt):
+    return os.path.join(out_dir, str(year), event.replace(' ', '_'), session_type, f"{driver}.{fmt}")
+
+
+def render_driver(year, event, session_type, driver, out_dir, formats, dpi):
+    """Render one driver's fastest lap of a session. Returns (job, written paths, seconds) or raises."""
+    import session_cache
+
+    start = time.perf_counter()
+    session = session_cache.get_session(year, event, session_type)
+    lap = session.laps.pick_drivers(driver).pick_fastest()
+    if lap is None or lap.empty:
+        return (session_type, driver), [], time.perf_counter() - start
+    telemetry = lap.get_car_data().add_distance()
+    _template.render(session, telemetry, driver)
+
+    paths = []
+    for fmt in formats:
+        path = report_path(out_dir, year, event, session_type, driver, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _template.save(path, dpi=dpi)
+        paths.append(path)
+    return (session_type, driver), paths, time.perf_counter() - start
+
+
+def plan_jobs(year, event, session_types, drivers=None):
+    """(session_type, driver) pairs, grouped by session so each worker tends to stay on one session."""
+    import driver_index
+
+    jobs = []
+    for session_type in session_types:
+        codes = drivers or [code for code, _, _ in driver_index.get_drivers(year, event, session_type)]
+        jobs.extend((session_type, code) for code in codes)
+    return jobs
+
+
+def render_reports(year, event, session_types, drivers=None, out_dir=REPORT_DIR, formats=("png",),
+                   workers=None, dpi=100, cache_dir="cache"):
+    """
+    Render every (session, driver) dashboard on a process pool.
+
+    Returns:
+        list of (session_type, driver, paths, seconds, error) in completion order.
+    """
+    jobs = plan_jobs(year, event, session_types, drivers)
+    workers = workers or min(len(jobs), os.cpu_count() or 1) or 1
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+        futures = {pool.submit(render_driver, year, event, session_type, driver, out_dir, formats, dpi):
+                   (session_type, driver) for session_type, driver in jobs}
+        for future in as_completed(futures):
+            session_type, driver = futures[future]
+            try:
+                _, paths, seconds = future.result()
+                results.append((session_type, driver, paths, seconds, None))
+            except Exception as e:  # one broken lap shouldn't sink the whole grid
+                results.append((session_type, driver, [], 0.0, e))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render matplotlib telemetry dashboards headlessly, in parallel.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("event", help="Grand Prix name, e.g. 'Silverstone'")
+    parser.add_argument("sessions", nargs="*", default=["Q"], help="session identifiers (default: Q)")
+    parser.add_argument("--weekend", action="store_true", help="every session held at the event")
+    parser.add_argument("--drivers", nargs="+", help="driver codes (default: the whole entry list)")
+    parser.add_argument("--formats", nargs="+", default=["png"], choices=FORMATS)
+    parser.add_argument("--out", default=REPORT_DIR, help="output directory (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    import session_cache
+    session_cache.enable_cache(args.cache)  # the entry lists and schedule below are fetched here, not in the workers
+
+    session_types = args.sessions
+    if args.weekend:
+        import schedule_index
+        session_types = schedule_index.event_sessions(args.year, args.event)
+
+    start = time.perf_counter()
+    results = render_reports(args.year, args.event, session_types, args.drivers, args.out, args.formats,
+                             args.workers, args.dpi, args.cache)
+    failed = 0
+    for session_type, driver, paths, seconds, error in results:
+        if error is not None:
+            failed += 1
+            print(f"  {session_type:4s} {driver:4s} FAILED: {error}")
+        elif not paths:
+            print(f"  {session_type:4s} {driver:4s} no timed lap")
+        else:
+            print(f"  {session_type:4s} {driver:4s} {seconds:6.2f} s  {', '.join(paths)}")
+    print(f"{len(results) - failed}/{len(results)} dashboards in {time.perf_counter() - start:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
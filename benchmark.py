@@ -0,0 +1,235 @@
+# Benchmark suite for the click-to-chart path.
+# Every stage reports median wall time and peak traced memory; figure stages also report serialized size.
+#
+#   python benchmark.py --save-baseline     # record benchmark_baseline.json on this machine
+#   python benchmark.py --check             # exit 1 if any stage regressed past the threshold
+#   python benchmark.py --source cache --event "Abu Dhabi" --offline    # a real session from the fastf1 cache
+#
+# By default it needs no network and no warm-up: the synthetic weekend's live timing responses (synthetic_fixtures.py)
+# are served by an in-process replay_server.py, and every session load downloads and parses them into an empty
+# fastf1 cache, i.e. a cold load. With --source cache the session comes from the fastf1 cache directory instead; the
+# checked-in cache/ only holds part of a session, so that needs network access once, and --offline after that.
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASELINE_FILE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25   # a stage fails when it gets 25% slower (or uses 25% more peak memory)
+NOISE_FLOOR_S = 0.002      # ...and the slowdown is bigger than this, so sub-millisecond jitter never fails a run
+NOISE_FLOOR_MB = 1.0
+
+
+def measure(fn, repeats):
+    """
+    Run fn `repeats` times, the last of them under tracemalloc for peak memory. Its allocation hooks slow pandas /
+    NumPy code down several times, so the median wall time is over the untraced repeats, and only a single repeat is
+    timed traced.
+    Returns (median seconds, peak MB of the traced repeat, last return value).
+    """
+    timings, result, peak = [], None, 0.0
+    for i in range(repeats):
+        traced = i == repeats - 1
+        if traced:
+            tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            if traced:
+                tracemalloc.stop()
+    return statistics.median(timings[:-1] or timings), peak, result
+
+
+def figure_bytes(fig):
+    return len(fig.to_json().encode())
+
+
+def replay_loader(root, year, event, session_type):
+    """
+    Session loader that cold-loads a session of the synthetic weekend through an in-process replay server: its
+    fixtures are generated once under root, every load gets its own empty fastf1 cache there.
+    Returns (load(year, event, session_type), server).
+    """
+    import replay_server
+    import synthetic_fixtures
+    from fastf1 import Cache
+
+    fixtures = os.path.join(root, "fixtures")
+    synthetic_fixtures.write_fixtures(fixtures, year, event, [session_type])
+    server = replay_server.ReplayServer(("127.0.0.1", 0), fixtures).start()
+
+    def load(year, event, session_type):
+        import fastf1
+
+        Cache.enable_cache(tempfile.mkdtemp(prefix="cache_", dir=root))
+        replay_server.use_replay(server.url)
+        session = fastf1.get_session(year, event, session_type)
+        session.load()
+        return session
+
+    return load, server
+
+
+def run_benchmarks(year, event, session_type, driver, compare_driver, repeats=5, load_repeats=2, loader=None):
+    """
+    Time every stage. loader(year, event, session_type) returns a loaded session, by default a load from the
+    enabled fastf1 cache.
+    Returns {stage: {'wall_s': ..., 'peak_mb': ..., ['bytes': ...]}}.
+    """
+    import fastf1
+    import derived_channels
+    import lap_delta
+    import plotly_functions as pf
+    import track_geometry
+    from Track_plot import plot_track_map_plotly
+
+    results = {}
+
+    def record(stage, fn, n=repeats, size=False):
+        wall, peak, value = measure(fn, n)
+        results[stage] = {'wall_s': wall, 'peak_mb': peak}
+        if size:
+            results[stage]['bytes'] = figure_bytes(value)
+        print(f"  {stage:28s} {wall * 1000:9.2f} ms {peak:8.2f} MB"
+              + (f" {results[stage]['bytes'] / 1024:8.1f} KiB" if size else ""))
+        return value
+
+    def load():
+        if loader is not None:
+            return loader(year, event, session_type)
+        session = fastf1.get_session(year, event, session_type)
+        session.load()
+        return session
+
+    session = record('session_load', load, n=load_repeats)
+    lap = record('pick_fastest', lambda: session.laps.pick_drivers(driver).pick_fastest())
+    telemetry = record('car_data_add_distance', lambda: lap.get_car_data().add_distance())
+    record('acceleration', lambda: derived_channels.longitudinal_acceleration(
+        telemetry['Speed'].to_numpy(), telemetry['Time'].dt.total_seconds().to_numpy()))
+    record('derived_channels', lambda: derived_channels.compute(telemetry))
+
+    for name, plot in [
+        ('fig_speed', pf.plot_speed_plotly),
+        ('fig_acceleration', pf.plot_longitudinal_acceleration_plotly),
+        ('fig_throttle_brake', pf.plot_throttle_brake_plotly),
+        ('fig_gear', pf.plot_gear_plotly),
+        ('fig_drs', pf.plot_drs_plotly),
+        ('fig_dashboard', pf.plot_telemetry_dashboard_plotly),
+    ]:
+        record(name, lambda plot=plot: plot(telemetry, show=False), size=True)
+    record('fig_laptimes', lambda: pf.plot_laptimes(session, driver, show=False), size=True)
+
+    geometry_dir = tempfile.mkdtemp(prefix="track_geometry_")
+    try:
+        # both read and write the temp directory, so "cold" really computes and ./track_geometry is never touched
+        def cold_track_map():
+            track_geometry.invalidate(root=geometry_dir)
+            return plot_track_map_plotly(session, driver, show=False, root=geometry_dir)
+        record('track_map_cold', cold_track_map, size=True)
+        record('track_map_cached', lambda: plot_track_map_plotly(session, driver, show=False, root=geometry_dir),
+               size=True)
+    finally:
+        track_geometry.invalidate(root=geometry_dir)
+        shutil.rmtree(geometry_dir, ignore_errors=True)
+
+    record('race_delta_pair', lambda: lap_delta.fastest_lap_deltas(session, drivers=[driver, compare_driver]))
+    record('race_delta_field', lambda: lap_delta.fastest_lap_deltas(session))
+    return results
+
+
+def check(results, baseline, threshold):
+    """List of human readable regressions of results against a baseline."""
+    failures = []
+    for stage, base in baseline['stages'].items():
+        now = results.get(stage)
+        if now is None:
+            continue
+        limit = base['wall_s'] * (1 + threshold)
+        if now['wall_s'] > limit and now['wall_s'] - base['wall_s'] > NOISE_FLOOR_S:
+            failures.append(f"{stage}: {now['wall_s'] * 1000:.2f} ms vs baseline {base['wall_s'] * 1000:.2f} ms")
+        limit = base['peak_mb'] * (1 + threshold)
+        if now['peak_mb'] > limit and now['peak_mb'] - base['peak_mb'] > NOISE_FLOOR_MB:
+            failures.append(f"{stage}: {now['peak_mb']:.1f} MB peak vs baseline {base['peak_mb']:.1f} MB")
+        if 'bytes' in base and now.get('bytes', 0) > base['bytes'] * (1 + threshold):
+            failures.append(f"{stage}: {now['bytes']} bytes vs baseline {base['bytes']} bytes")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the telemetry viewer's data and figure stages.")
+    parser.add_argument("--source", choices=["replay", "cache"], default="replay",
+                        help="synthetic weekend over a local replay server, or the fastf1 cache (default: %(default)s)")
+    parser.add_argument("--year", type=int, default=2022)
+    parser.add_argument("--event", default="Synthetic", help="(default: %(default)s, the synthetic weekend)")
+    parser.add_argument("--session", default="Q")
+    parser.add_argument("--driver", default="VER")
+    parser.add_argument("--compare-driver", default="LEC", help="second driver for the pairwise delta")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--load-repeats", type=int, default=2, help="repeats of the (slow) session load")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory with --source cache")
+    parser.add_argument("--offline", action="store_true", help="with --source cache: never touch the network")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"allowed relative regression (default: baseline's, else {DEFAULT_THRESHOLD})")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail if a stage regressed past the threshold")
+    parser.add_argument("--json", help="also write the raw results to this file")
+    args = parser.parse_args(argv)
+
+    print(f"{args.year} {args.event} {args.session} ({args.source}), driver {args.driver}, {args.repeats} repeats")
+    if args.source == "replay":
+        with tempfile.TemporaryDirectory(prefix="benchmark_") as root:
+            loader, server = replay_loader(root, args.year, args.event, args.session)
+            try:
+                results = run_benchmarks(args.year, args.event, args.session, args.driver, args.compare_driver,
+                                         args.repeats, args.load_repeats, loader)
+            finally:
+                server.shutdown()
+                server.server_close()
+    else:
+        import session_cache
+
+        fastf1 = session_cache.enable_cache(args.cache)
+        if args.offline:
+            fastf1.Cache.offline_mode(True)
+        results = run_benchmarks(args.year, args.event, args.session, args.driver, args.compare_driver,
+                                 args.repeats, args.load_repeats)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {
+            'session': [args.year, args.event, args.session, args.driver],
+            'threshold': args.threshold if args.threshold is not None else DEFAULT_THRESHOLD,
+            'stages': results,
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        threshold = args.threshold if args.threshold is not None else baseline.get('threshold', DEFAULT_THRESHOLD)
+        failures = check(results, baseline, threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        print(f"no stage regressed more than {threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
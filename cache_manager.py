@@ -0,0 +1,356 @@
+# Housekeeping for the fastf1 on-disk cache.
+# fastf1 writes one directory of .ff1pkl pickles per session anyone ever opened, plus its HTTP response cache, and
+# never deletes anything. This keeps the directory under a byte budget by dropping the least recently used sessions,
+# reports where the space goes, checks that the pickles still load and pre-warms sessions in bulk.
+#
+# Layout (fastf1's own):
+#   cache/<year>/<date>_<Event_Name>/<date>_<Session_Name>/*.ff1pkl
+#   cache/fastf1_http_cache.sqlite
+#
+# session_cache calls record_use() after every load, which stamps the session directory, and maybe_evict(), which
+# enforces F1_CACHE_MAX_MB (default DEFAULT_BUDGET_BYTES) at most once every EVICT_INTERVAL_S, on a background thread
+# so the scan, the deletes and the VACUUM never hold up the click that loaded the session.
+# The budget covers session directories only. fastf1's HTTP cache is trimmed separately (expired responses, then
+# VACUUM), so a large HTTP cache can never make eviction delete every session and still be over budget.
+#
+#   python cache_manager.py report [--by season|event|session]
+#   python cache_manager.py evict --max-mb 800 [--dry-run]
+#   python cache_manager.py verify [--delete]
+#   python cache_manager.py prewarm 2023:Monza:Q 2023:Monza:R  |  --weekend 2023 Monza
+import argparse
+import os
+import pickle
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+DEFAULT_BUDGET_BYTES = 1024 ** 3   # small container disks; override with F1_CACHE_MAX_MB or --max-mb
+EVICT_INTERVAL_S = 60              # the app checks the budget at most this often
+MIN_IDLE_S = 600                   # sessions used more recently than this are never evicted (may be mid-download)
+USE_MARKER = ".last_used"          # touched in a session directory every time the session is loaded
+PICKLE_SUFFIX = ".ff1pkl"
+HTTP_CACHE_FILE = "fastf1_http_cache.sqlite"
+
+SCAN_COLUMNS = ['Year', 'Event', 'Session', 'Files', 'Bytes', 'LastUsed', 'Path']
+
+_lock = threading.Lock()
+_last_evict = 0.0
+_evicting = None  # the background eviction thread, if one has run
+
+
+def _cache_dir(cache_dir=None):
+    if cache_dir is not None:
+        return cache_dir
+    import session_cache
+    return session_cache._cache_dir or session_cache.CACHE_DIR
+
+
+def _strip_date(name):
+    # '2022-11-20_Abu_Dhabi_Grand_Prix' -> 'Abu Dhabi Grand Prix'
+    date, _, rest = name.partition("_")
+    return (rest if len(date) == 10 else name).replace("_", " ")
+
+
+def budget_bytes():
+    """Byte budget of the cache: F1_CACHE_MAX_MB if set, else DEFAULT_BUDGET_BYTES."""
+    value = os.environ.get("F1_CACHE_MAX_MB")
+    return int(float(value) * 1024 ** 2) if value else DEFAULT_BUDGET_BYTES
+
+
+def session_dir(session, cache_dir=None):
+    """Cache directory fastf1 uses for a session (its api_path without the leading '/static/')."""
+    return os.path.join(_cache_dir(cache_dir), session.api_path[len("/static/"):].strip("/"))
+
+
+def record_use(session, cache_dir=None):
+    """Stamp a session's directory as just used; eviction goes by these stamps."""
+    path = session_dir(session, cache_dir)
+    if os.path.isdir(path):
+        with open(os.path.join(path, USE_MARKER), "w"):
+            pass
+
+
+def scan(cache_dir=None):
+    """
+    One row per cached session: Year, Event, Session, Files, Bytes, LastUsed (epoch s) and Path.
+    LastUsed is the use stamp, or the newest file if the session was cached before stamps existed.
+    """
+    root = _cache_dir(cache_dir)
+    rows = []
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=SCAN_COLUMNS)
+    for year in sorted(os.listdir(root)):
+        year_dir = os.path.join(root, year)
+        if not (year.isdigit() and os.path.isdir(year_dir)):
+            continue
+        for event in sorted(os.listdir(year_dir)):
+            event_dir = os.path.join(year_dir, event)
+            if not os.path.isdir(event_dir):
+                continue
+            for session in sorted(os.listdir(event_dir)):
+                path = os.path.join(event_dir, session)
+                if not os.path.isdir(path):
+                    continue
+                files, size, last_used = 0, 0, 0.0
+                for entry in os.scandir(path):
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    last_used = max(last_used, stat.st_mtime)
+                    if entry.name != USE_MARKER:
+                        files += 1
+                        size += stat.st_size
+                rows.append((int(year), _strip_date(event), _strip_date(session), files, size, last_used, path))
+    return pd.DataFrame(rows, columns=SCAN_COLUMNS)
+
+
+def other_bytes(cache_dir=None):
+    """Bytes in the cache directory that don't belong to a session (fastf1's HTTP cache and the like)."""
+    root = _cache_dir(cache_dir)
+    if not os.path.isdir(root):
+        return 0
+    total = 0
+    for entry in os.scandir(root):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
+
+
+def report(cache_dir=None, by="session"):
+    """Size of the cache grouped by season, event or session, largest first, in MB."""
+    sessions = scan(cache_dir)
+    keys = {"season": ['Year'], "event": ['Year', 'Event'], "session": ['Year', 'Event', 'Session']}[by]
+    table = sessions.groupby(keys).agg(Sessions=('Path', 'size'), Files=('Files', 'sum'), Bytes=('Bytes', 'sum'),
+                                       LastUsed=('LastUsed', 'max'))
+    table = table.sort_values('Bytes', ascending=False).reset_index()
+    table['MB'] = table.pop('Bytes') / 1024 ** 2
+    table['LastUsed'] = pd.to_datetime(table['LastUsed'], unit='s').dt.floor('s')
+    return table
+
+
+def evict(max_bytes=None, cache_dir=None, dry_run=False, min_idle=MIN_IDLE_S):
+    """
+    Delete least recently used sessions until the session directories fit in max_bytes (default budget_bytes()).
+    Non-session files (the HTTP cache) are not part of the budget, see trim_http_cache.
+
+    Returns:
+        list of (path, bytes) removed (or that would be, with dry_run).
+    """
+    max_bytes = budget_bytes() if max_bytes is None else max_bytes
+    sessions = scan(cache_dir).sort_values('LastUsed')
+    total = int(sessions['Bytes'].sum())
+    cutoff = time.time() - min_idle
+    removed = []
+    for row in sessions.itertuples():
+        if total <= max_bytes:
+            break
+        if row.LastUsed > cutoff:  # everything after this one is more recent too
+            break
+        if not dry_run:
+            shutil.rmtree(row.Path, ignore_errors=True)
+            _remove_empty_parents(row.Path, _cache_dir(cache_dir))
+        total -= row.Bytes
+        removed.append((row.Path, int(row.Bytes)))
+    return removed
+
+
+def _remove_empty_parents(path, root):
+    parent = os.path.dirname(path)
+    while os.path.abspath(parent) != os.path.abspath(root):
+        try:
+            os.rmdir(parent)  # only succeeds when empty
+        except OSError:
+            return
+        parent = os.path.dirname(parent)
+
+
+def maybe_evict(cache_dir=None):
+    """
+    trim_http_cache() and evict() with the configured budget on a background thread, at most once every
+    EVICT_INTERVAL_S per process and never two at a time.
+
+    Returns:
+        the started threading.Thread, or None if it wasn't time yet.
+    """
+    global _last_evict, _evicting
+    cache_dir = _cache_dir(cache_dir)  # resolved now, the caller's cache may change before the thread runs
+    with _lock:
+        now = time.monotonic()
+        if _last_evict and now - _last_evict < EVICT_INTERVAL_S:
+            return None
+        if _evicting is not None and _evicting.is_alive():
+            return None
+        _last_evict = now
+        _evicting = threading.Thread(target=_evict_quietly, args=(cache_dir,), name="cache-evict", daemon=True)
+        _evicting.start()
+    return _evicting
+
+
+def _evict_quietly(cache_dir):
+    try:
+        trim_http_cache(cache_dir)
+        evict(cache_dir=cache_dir)
+    except OSError:
+        pass  # disk housekeeping never fails anything, the next run tries again
+
+
+def trim_http_cache(cache_dir=None):
+    """
+    Delete expired responses from fastf1's HTTP cache (it keeps them for 12 h) and VACUUM the file.
+    Returns the bytes freed; 0 if there is no HTTP cache or fastf1 holds it locked right now.
+    """
+    path = os.path.join(_cache_dir(cache_dir), HTTP_CACHE_FILE)
+    if not os.path.exists(path):
+        return 0
+    before = os.path.getsize(path)
+    try:
+        conn = sqlite3.connect(path, timeout=5)
+        try:
+            conn.execute("DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?", (round(time.time()),))
+            conn.commit()
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:  # locked by a download in progress, or not a requests-cache file
+        return 0
+    return before - os.path.getsize(path)
+
+
+def verify(cache_dir=None, delete=False):
+    """
+    Unpickle every .ff1pkl and check it has the shape fastf1 writes ({'version': ..., 'data': ...}).
+
+    Args:
+        delete (bool): Remove broken files, fastf1 downloads them again on next load.
+
+    Returns:
+        list of (path, problem) for every file that is broken or written by another fastf1 API version
+        (stale files are reported, never deleted: fastf1 replaces them itself).
+    """
+    import session_cache
+
+    current = session_cache.enable_cache().Cache._API_CORE_VERSION
+    problems = []
+    for path in scan(cache_dir)['Path']:
+        for entry in os.scandir(path):
+            if not entry.name.endswith(PICKLE_SUFFIX):
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    cached = pickle.load(f)
+                if not isinstance(cached, dict) or 'data' not in cached or 'version' not in cached:
+                    raise ValueError("not a fastf1 cache entry")
+            except Exception as e:
+                problems.append((entry.path, f"broken: {type(e).__name__}: {e}"))
+                if delete:
+                    os.remove(entry.path)
+                continue
+            if cached['version'] != current:
+                problems.append((entry.path, f"stale: version {cached['version']}, fastf1 wants {current}"))
+    return problems
+
+
+def prewarm(sessions, workers=2, cache_dir=None):
+    """
+    Download (or re-read) every (year, event, session_type) into the cache, a few at a time.
+
+    Returns:
+        list of (key, seconds, error) in completion order.
+    """
+    import session_cache
+
+    fastf1 = session_cache.enable_cache(cache_dir)
+
+    def load(year, event, session_type):
+        start = time.perf_counter()
+        session = fastf1.get_session(year, event, session_type)
+        session.load()
+        record_use(session, cache_dir)
+        return time.perf_counter() - start
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(load, *key): key for key in sessions}
+        for future in as_completed(futures):
+            try:
+                results.append((futures[future], future.result(), None))
+            except Exception as e:  # one unavailable session shouldn't stop the rest
+                results.append((futures[future], 0.0, e))
+    return results
+
+
+def parse_session(text):
+    """'2023:Monza:Q' -> (2023, 'Monza', 'Q')."""
+    year, event, session_type = text.split(":")
+    return int(year), event, session_type
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report, trim, verify and pre-warm the fastf1 cache directory.")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("report", help="size per season / event / session")
+    p.add_argument("--by", choices=["season", "event", "session"], default="session")
+
+    p = commands.add_parser("evict", help="drop least recently used sessions down to a budget")
+    p.add_argument("--max-mb", type=float, help="budget in MB (default: F1_CACHE_MAX_MB or %d)"
+                   % (DEFAULT_BUDGET_BYTES // 1024 ** 2))
+    p.add_argument("--min-idle", type=float, default=MIN_IDLE_S, help="keep sessions used in the last N seconds")
+    p.add_argument("--dry-run", action="store_true")
+
+    p = commands.add_parser("verify", help="check every pickle loads")
+    p.add_argument("--delete", action="store_true", help="remove broken files so fastf1 fetches them again")
+
+    p = commands.add_parser("prewarm", help="load sessions into the cache in bulk")
+    p.add_argument("sessions", nargs="*", help="year:event:session, e.g. 2023:Monza:Q")
+    p.add_argument("--weekend", nargs=2, metavar=("YEAR", "EVENT"), help="every session held at an event")
+    p.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        table = report(args.cache, args.by)
+        print(table.round(2).to_string(index=False))
+        print(f"sessions {table['MB'].sum():.1f} MB (budget {budget_bytes() / 1024 ** 2:.0f} MB), "
+              f"HTTP cache and other files {other_bytes(args.cache) / 1024 ** 2:.1f} MB")
+    elif args.command == "evict":
+        max_bytes = None if args.max_mb is None else int(args.max_mb * 1024 ** 2)
+        removed = evict(max_bytes, args.cache, args.dry_run, args.min_idle)
+        for path, size in removed:
+            print(f"{'would remove' if args.dry_run else 'removed'} {size / 1024 ** 2:8.1f} MB  {path}")
+        print(f"{len(removed)} sessions, {sum(size for _, size in removed) / 1024 ** 2:.1f} MB")
+        if not args.dry_run:
+            print(f"HTTP cache trimmed by {trim_http_cache(args.cache) / 1024 ** 2:.1f} MB")
+    elif args.command == "verify":
+        import session_cache
+        session_cache.enable_cache(args.cache)
+        problems = verify(args.cache, args.delete)
+        for path, problem in problems:
+            print(f"{problem}  {path}")
+        broken = sum(problem.startswith("broken") for _, problem in problems)
+        print(f"{broken} broken, {len(problems) - broken} stale")
+        return 1 if broken and not args.delete else 0
+    else:
+        keys = [parse_session(s) for s in args.sessions]
+        if args.weekend:
+            import schedule_index
+            year, event = int(args.weekend[0]), args.weekend[1]
+            keys += [(year, event, s) for s in schedule_index.event_sessions(year, event)]
+        failed = 0
+        for key, seconds, error in prewarm(keys, args.workers, args.cache):
+            if error is not None:
+                failed += 1
+                print(f"  {key} FAILED: {error}")
+            else:
+                print(f"  {key} {seconds:6.1f} s")
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# The "Load Fastest Lap" click, without Streamlit.
+# app.py runs it with sinks that draw into the page; load_test.py runs the very same stages, cache keys and plot
+# functions with sinks that only serialize, so what the load test measures is what a user waits for.
+# Importing this module is cheap: fastf1, plotly and the plotting modules are imported on the first click.
+import json
+
+from stage_timing import TIMING_LOG_FILE, StageTimer
+
+
+def serialize_figure(figure):
+    """Figure sink that only serializes, like st.plotly_chart does before sending a figure to the browser."""
+    return json.dumps(figure) if isinstance(figure, dict) else figure.to_json()
+
+
+def serialize_table(frame):
+    """Table sink that only serializes, like st.dataframe."""
+    return frame.to_json()
+
+
+def load_fastest_lap(year, gp, session_type, driver, separate_charts=False, compare_field=False,
+                     corner_breakdown=False, race_pace=False, show_figure=serialize_figure,
+                     show_table=serialize_table, on_progress=None, log_path=TIMING_LOG_FILE, loader=None):
+    """
+    Build and show every chart of one click: track map, lap times, telemetry (one dashboard or a chart per channel),
+    and the lap delta, corner breakdown and race pace views when ticked.
+
+    Args:
+        show_figure (callable): Called with every figure, a dict when it came from the figure cache.
+        show_table (callable): Called with every table (pd.DataFrame).
+        on_progress (callable): Called with a 0-100 int after each stage (e.g. st.progress(...).progress).
+        log_path (str): Timing log to append the click to, or None.
+        loader (callable): (year, event, session_type) -> loaded session, default session_cache.get_session.
+
+    Returns:
+        The finished StageTimer.
+    """
+    # heavy modules load on the first click only, later clicks get them from sys.modules
+    import corner_analysis
+    import lap_delta
+    import plotly_functions as pf
+    import session_cache
+    import stint_analysis
+    from derived_channels import derived_channels, lap_key
+    from downsample import DEFAULT_POINT_BUDGET
+    from figure_cache import FIGURES
+    from Track_plot import plot_track_map_plotly
+
+    loader = loader or session_cache.get_session
+
+    # Figures are cached as JSON per (session, driver, lap, chart, options) and shared by every user,
+    # so a repeat view doesn't touch the session or build a single go.Figure
+    session_key = (year, gp, session_type)
+
+    def figure_key(chart, driver=driver, **options):
+        return FIGURES.make_key(session_key, driver, "fastest", chart, **options)
+
+    budget = {"point_budget": DEFAULT_POINT_BUDGET}
+    telemetry_charts = [  # (chart, plot function)
+        ("speed", pf.plot_speed_plotly),
+        ("acceleration", pf.plot_longitudinal_acceleration_plotly),
+        ("throttle_brake", pf.plot_throttle_brake_plotly),
+        ("gear", pf.plot_gear_plotly),
+        ("drs", pf.plot_drs_plotly),
+    ] if separate_charts else [("dashboard", pf.plot_telemetry_dashboard_plotly)]  # all five channels in one figure
+    needed = [figure_key("track_map", highlight_corners=True), figure_key("laptimes")]
+    needed += [figure_key(chart, **budget) for chart, _ in telemetry_charts]
+    if compare_field:
+        needed.append(figure_key("lap_delta", driver=None, reference=driver, **budget))
+    cached_figures = {key: FIGURES.get(key) for key in needed}  # taken up front, eviction can't race the render
+    cached = all(figure_json is not None for figure_json in cached_figures.values())
+
+    # the progress bar moves by how long each stage really took on earlier clicks
+    stages = [] if cached else ["lap pick", "car data", "derived channels"]
+    if not cached or corner_breakdown or race_pace:
+        stages.insert(0, "session load")
+    stages += ["track map", "lap times", "telemetry figures"]
+    if compare_field:
+        stages.append("lap delta")
+    if corner_breakdown:
+        stages.append("corner analysis")
+    if race_pace:
+        stages.append("stint analysis")
+    timer = StageTimer(stages, on_progress=on_progress, log_path=log_path)
+
+    session = telemetry = None
+    if not cached or corner_breakdown or race_pace:
+        with timer.span("session load"):
+            session = loader(year, gp, session_type)  # loaded once per process and shared, not once per click
+    if not cached:
+        with timer.span("lap pick"):
+            lap = session.laps.pick_drivers(driver).pick_fastest()
+
+        with timer.span("car data"):
+            telemetry = lap.get_car_data().add_distance()  # Time, Speed, Throttle, Brake, RPM, gear, DRS and Distance
+
+        with timer.span("derived channels"):
+            derived_channels(telemetry, key=lap_key(session, lap))  # memoised per lap, the plots below reuse it
+
+    def show(key, build):
+        figure_json = cached_figures.get(key)
+        show_figure(json.loads(figure_json) if figure_json is not None else FIGURES.build_and_put(key, build))
+
+    with timer.span("track map"):
+        show(figure_key("track_map", highlight_corners=True),
+             lambda: plot_track_map_plotly(session, driver, highlight_corners=True, show=False))
+    with timer.span("lap times"):
+        show(figure_key("laptimes"), lambda: pf.plot_laptimes(session, driver, show=False))
+    with timer.span("telemetry figures"):
+        for chart, plot in telemetry_charts:
+            show(figure_key(chart, **budget), lambda plot=plot: plot(telemetry, show=False, **budget))
+    if compare_field:
+        with timer.span("lap delta"):
+            show(figure_key("lap_delta", driver=None, reference=driver, **budget),
+                 lambda: pf.plot_lap_delta_plotly(
+                     lap_delta.fastest_lap_deltas(session, reference=driver),  # one batched pass for all drivers
+                     highlight=driver, show=False, **budget))
+    if corner_breakdown:
+        with timer.span("corner analysis"):
+            corners = corner_analysis.fastest_lap_corners(session)  # every driver's fastest lap, one batch
+            show_figure(pf.plot_corner_speeds_plotly(corners, highlight=driver, show=False))
+            show_table(corners[corners['Driver'] == driver].drop(columns=['Driver']).round(2))
+    if race_pace:
+        with timer.span("stint analysis"):
+            analysis = stint_analysis.stint_analysis(session)  # whole field at once, cached per session
+            show_figure(pf.plot_stint_degradation_plotly(analysis, session=session, highlight=driver, show=False))
+            show_table(analysis.compounds.round(3))
+            show_table(analysis.stints.round(3))
+
+    timer.finish(year=year, gp=gp, session=session_type, driver=driver, separate_charts=separate_charts,
+                 compare_field=compare_field, corner_breakdown=corner_breakdown, race_pace=race_pace,
+                 figures_cached=cached)
+    return timer
@@ -0,0 +1,148 @@
+# Compact dtypes for loaded sessions.
+# fastf1 hands back float64 Speed / RPM / Throttle, int64 nGear / DRS, object Source / Status strings and 8-byte
+# timedeltas for every sample of every driver; with a few sessions in session_cache that is most of the server's RSS.
+#
+# compact_session(session) works in place and stays fastf1-safe: numeric channels are downcast to float32 / int8 /
+# bool, while time columns stay timedeltas so get_car_data(), merge_channels(), add_distance() and slicing by lap keep
+# working. session_cache applies it on load. (Storing time as float seconds would save more, but every fastf1 API the
+# app calls needs timedeltas back, and long-lived columnar data already lives in telemetry_store as float32 seconds.)
+#
+#   python compact_telemetry.py 2022 "Abu Dhabi" Q     # memory report before / after
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# channel -> compact dtype, for the columns fastf1 can take back as they are
+CHANNEL_DTYPES = {
+    'Speed': np.float32,
+    'RPM': np.float32,
+    'Throttle': np.float32,
+    'X': np.float32,
+    'Y': np.float32,
+    'Z': np.float32,
+    'Distance': np.float32,
+    'nGear': np.int8,
+    'DRS': np.int8,
+    'Brake': bool,
+}  # Source / Status stay strings in place: merge_channels can't combine categoricals with different categories
+_LAP_FLOATS = ['SpeedI1', 'SpeedI2', 'SpeedFL', 'SpeedST', 'TyreLife', 'Stint', 'Position']
+
+
+def frame_bytes(frame):
+    # shallow on purpose: Source / Status / Driver strings are the same few interned objects on every row, so an
+    # object column really costs its 8-byte pointers, not what deep=True would count for every row
+    return int(frame.memory_usage(deep=False).sum())
+
+
+def _downcast(frame, dtypes):
+    """Casts that apply to this frame; int / bool columns holding NaN are left alone (NaN would become a value)."""
+    casts = {}
+    for column, dtype in dtypes.items():
+        if column not in frame.columns or frame[column].dtype == dtype:
+            continue
+        if dtype in (np.int8, bool) and frame[column].isna().any():
+            continue
+        casts[column] = dtype
+    return casts
+
+
+def compact_channels(frame):
+    """fastf1-safe compaction of a car / pos data frame, in place. Returns the frame."""
+    for column, dtype in _downcast(frame, CHANNEL_DTYPES).items():
+        frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def compact_laps(laps):
+    """
+    fastf1-safe compaction of session.laps, in place: speed traps etc. to float32. Driver / Compound stay strings,
+    categoricals would change what groupby and unique() return for every caller.
+    """
+    for column in _LAP_FLOATS:
+        if column in laps.columns and laps[column].dtype == np.float64:
+            laps[column] = laps[column].astype(np.float32)
+    return laps
+
+
+def compact_session(session):
+    """Compact a loaded session's laps, car data and position data in place. Returns the session."""
+    for attr in ('car_data', 'pos_data'):
+        try:
+            per_driver = getattr(session, attr)
+        except Exception:  # fastf1 raises DataNotLoadedError for parts that were not loaded
+            continue
+        for frame in per_driver.values():
+            compact_channels(frame)
+    try:
+        compact_laps(session.laps)
+    except Exception:
+        pass
+    return session
+
+
+def session_frames(session):
+    """(component, driver, frame) for every frame a loaded session holds."""
+    frames = []
+    for attr in ('laps', 'weather_data', 'results'):
+        try:
+            frame = getattr(session, attr)
+        except Exception:
+            continue
+        if frame is not None:
+            frames.append((attr, None, frame))
+    for attr in ('car_data', 'pos_data'):
+        try:
+            per_driver = getattr(session, attr)
+        except Exception:
+            continue
+        frames.extend((attr, drv, frame) for drv, frame in per_driver.items())
+    return frames
+
+
+def memory_report(session):
+    """
+    Bytes per session component now and after the in-place compaction, measured like session_cache's budget
+    (frame_bytes). Doesn't change the session.
+
+    Returns:
+        pd.DataFrame indexed by component with Rows, Original and Compact MB and the Saved share.
+    """
+    rows = {}
+    for component, _, frame in session_frames(session):
+        row = rows.setdefault(component, {'Rows': 0, 'Original': 0, 'Compact': 0})
+        row['Rows'] += len(frame)
+        row['Original'] += frame_bytes(frame)
+        safe = pd.DataFrame(frame, copy=True)
+        if component in ('car_data', 'pos_data'):
+            compact_channels(safe)
+        elif component == 'laps':
+            compact_laps(safe)
+        row['Compact'] += frame_bytes(safe)
+
+    report = pd.DataFrame.from_dict(rows, orient='index')
+    report.loc['total'] = report.sum()
+    for column in ('Original', 'Compact'):
+        report[column] = report[column] / 1024 ** 2
+    report['Saved'] = 1 - report['Compact'] / report['Original']
+    return report.round(3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-session memory report, before and after dtype compaction.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("event")
+    parser.add_argument("session")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    import session_cache
+
+    fastf1 = session_cache.enable_cache(args.cache)
+    session = fastf1.get_session(args.year, args.event, args.session)
+    session.load()
+    print(memory_report(session).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Corner-by-corner lap analytics for every lap of every driver of a session, in one batch.
+# circuit_info.corners gives each corner's distance along the reference lap. Those positions are turned into
+# fractions of a lap once per circuit and season; every lap of the session (lap_batch.py) is then cut into one
+# segment per corner, running from the midpoint with the previous corner to the midpoint with the next, with a
+# single searchsorted over all laps at once. The result is one tidy row per (driver, lap, corner).
+import threading
+
+import numpy as np
+import pandas as pd
+
+import lap_batch
+
+CORNER_CHANNELS = ['Speed', 'Brake', 'nGear']
+CORNER_COLUMNS = ['Driver', 'LapNumber', 'LapTime', 'Corner', 'CornerDistance', 'EntrySpeed', 'ApexSpeed',
+                  'MinSpeed', 'ExitSpeed', 'BrakingPoint', 'SegmentTime', 'ApexGear']
+
+_lock = threading.Lock()
+_circuits = {}  # (location, year) -> (labels, corner fractions, segment boundary fractions)
+_SCALE = 1 - 1e-9  # keeps a lap's last sample (fraction 1.0) below the next lap's first key
+
+
+def corner_layout(session):
+    """
+    Corner labels, corner positions and segment boundaries as fractions of a lap, cached per circuit and season.
+
+    circuit_info distances belong to the session's fastest lap, so they are divided by that lap's length.
+    """
+    key = (session.event['Location'], int(session.event['EventDate'].year))
+    layout = _circuits.get(key)
+    if layout is not None:
+        return layout
+
+    corners = session.get_circuit_info().corners.sort_values('Distance')
+    labels = (corners['Number'].astype(str) + corners['Letter'].fillna('').astype(str)).tolist()
+    reference = session.laps.pick_fastest().get_car_data().add_distance()
+    fractions = np.clip(corners['Distance'].to_numpy(dtype=np.float64) / reference['Distance'].iloc[-1], 0.0, 1.0)
+    # segment k spans [midpoint(k - 1, k), midpoint(k, k + 1)); the first starts on the line, the last ends on it
+    bounds = np.concatenate(([0.0], (fractions[:-1] + fractions[1:]) / 2, [1.0]))
+
+    layout = (labels, fractions, bounds)
+    with _lock:
+        _circuits[key] = layout
+    return layout
+
+
+def _lap_fraction_keys(batch):
+    """
+    Monotonic per-sample key, lap index + fraction of that lap's distance (scaled below 1 so laps never overlap),
+    and each lap's length in m.
+    """
+    distance = batch.channels['Distance']
+    lap_length = lap_batch.segment_reduce(np.fmax, distance, batch.offsets)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.nan_to_num(distance / np.repeat(lap_length, batch.lengths))
+    return batch.lap_index() + np.minimum(fraction, 1.0) * _SCALE, lap_length
+
+
+def corner_table(batch, labels, fractions, bounds):
+    """
+    Per corner and per lap: entry / apex / minimum / exit speed, braking point, time in the segment and apex gear.
+
+    Args:
+        batch (lap_batch.LapBatch): Laps with CORNER_CHANNELS.
+        labels, fractions, bounds: From corner_layout().
+
+    Returns:
+        pd.DataFrame of CORNER_COLUMNS. Speeds in km/h, CornerDistance / BrakingPoint in m from the lap start,
+        BrakingPoint NaN where the driver didn't brake in that segment.
+    """
+    n_laps, n_corners = len(batch), len(labels)
+    if n_laps == 0 or n_corners == 0:
+        return pd.DataFrame(columns=CORNER_COLUMNS)
+
+    key, lap_length = _lap_fraction_keys(batch)
+    lap_ids = np.arange(n_laps)[:, None]
+    bound_keys = (lap_ids + bounds[None, :] * _SCALE).ravel()    # (L * (K + 1),) every segment edge of every lap
+    apex_keys = (lap_ids + fractions[None, :] * _SCALE).ravel()  # (L * K,) every corner of every lap
+
+    # sample index of every segment edge, all laps in one searchsorted; first / last edge are the lap's own bounds
+    edges = np.searchsorted(key, bound_keys, side='left').reshape(n_laps, n_corners + 1)
+    edges[:, 0] = batch.offsets[:-1]
+    edges[:, -1] = batch.offsets[1:]
+    starts, stops = edges[:, :-1].ravel(), edges[:, 1:].ravel()
+    empty = stops <= starts  # data gaps, or laps without car data
+    lap_start = np.repeat(batch.offsets[:-1], n_corners)
+    lap_stop = np.repeat(batch.offsets[1:], n_corners)
+    apex = np.clip(np.searchsorted(key, apex_keys, side='left'), lap_start, np.maximum(lap_stop - 1, lap_start))
+    apex = np.minimum(apex, len(key) - 1)
+
+    # time and speed exactly on the segment edges, interpolated along the key (keys of different laps don't overlap)
+    speed = batch.channels['Speed']
+    edge_time = np.interp(bound_keys, key, batch.channels['Time']).reshape(n_laps, n_corners + 1)
+    edge_speed = np.interp(bound_keys, key, speed).reshape(n_laps, n_corners + 1)
+    lap_empty = np.repeat(batch.lengths == 0, n_corners)
+
+    # segments tile every lap back to back, so their starts plus the last stop are reduceat offsets
+    min_speed = lap_batch.segment_reduce(np.fmin, speed, np.append(starts, stops[-1]))
+
+    # braking point: first braking sample inside each segment
+    braking = np.flatnonzero(batch.channels['Brake'] > 0)
+    first = np.minimum(np.searchsorted(braking, starts), max(len(braking) - 1, 0))
+    brake_idx = braking[first] if len(braking) else np.full(len(starts), -1)
+    found = (brake_idx >= starts) & (brake_idx < stops)
+    braking_point = np.where(found, batch.channels['Distance'][np.maximum(brake_idx, 0)], np.nan)
+
+    lap_of = np.repeat(np.arange(n_laps), n_corners)
+    table = pd.DataFrame({
+        'Driver': batch.drivers[lap_of],
+        'LapNumber': batch.lap_numbers[lap_of],
+        'LapTime': batch.lap_times[lap_of],
+        'Corner': np.tile(np.asarray(labels, dtype=object), n_laps),
+        'CornerDistance': (fractions[None, :] * lap_length[:, None]).ravel(),
+        'EntrySpeed': edge_speed[:, :-1].ravel(),
+        'ApexSpeed': np.where(empty, np.nan, speed[apex]),
+        'MinSpeed': min_speed,
+        'ExitSpeed': edge_speed[:, 1:].ravel(),
+        'BrakingPoint': braking_point,
+        'SegmentTime': np.diff(edge_time, axis=1).ravel(),
+        'ApexGear': np.where(empty, np.nan, batch.channels['nGear'][apex]),
+    })
+    table.loc[lap_empty, CORNER_COLUMNS[4:]] = np.nan
+    return table
+
+
+def session_corner_table(session, drivers=None, laps=None):
+    """Corner table of every lap (of `drivers`, or everyone, or just `laps`) of a loaded session."""
+    batch = lap_batch.from_session(session, drivers=drivers, channels=CORNER_CHANNELS, laps=laps)
+    return corner_table(batch, *corner_layout(session))
+
+
+def fastest_lap_corners(session, drivers=None):
+    """Corner table restricted to each driver's fastest lap, the view the app shows."""
+    laps = session.laps if drivers is None else session.laps.pick_drivers(drivers)
+    fastest = laps.loc[laps.dropna(subset=['LapTime']).groupby('Driver')['LapTime'].idxmin()]
+    return session_corner_table(session, laps=fastest)
@@ -0,0 +1,65 @@
+# Measure the stacked telemetry dashboard against the old one-chart-per-channel path.
+# Reports serialized figure size (what st.plotly_chart ships to the browser) and build + serialize time.
+# Browser render time is not measured: that needs a headless browser, and this repo has none to drive.
+#   python dashboard_payload.py 2022 "Abu Dhabi" Q VER
+import argparse
+import statistics
+import time
+
+import plotly_functions as pf
+
+PER_CHART = [
+    pf.plot_speed_plotly,
+    pf.plot_longitudinal_acceleration_plotly,
+    pf.plot_throttle_brake_plotly,
+    pf.plot_gear_plotly,
+    pf.plot_drs_plotly,
+]
+
+
+def _time_path(build, repeats):
+    """Median seconds to build and serialize, plus the serialized size in bytes."""
+    timings = []
+    size = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        size = sum(len(fig.to_json().encode()) for fig in build())
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), size
+
+
+def compare_payload(telemetry_driver, point_budget=pf.DEFAULT_POINT_BUDGET, repeats=5):
+    """Returns {'per_chart': (seconds, bytes), 'dashboard': (seconds, bytes)} for one telemetry frame."""
+    per_chart = _time_path(
+        lambda: [plot(telemetry_driver, point_budget, show=False) for plot in PER_CHART], repeats)
+    dashboard = _time_path(
+        lambda: [pf.plot_telemetry_dashboard_plotly(telemetry_driver, point_budget, show=False)], repeats)
+    return {'per_chart': per_chart, 'dashboard': dashboard}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare dashboard vs per-chart payload size and build time.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("event")
+    parser.add_argument("session")
+    parser.add_argument("driver")
+    parser.add_argument("--budget", type=int, default=pf.DEFAULT_POINT_BUDGET, help="points per trace")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    import session_cache
+
+    session_cache.enable_cache(args.cache)
+    session = session_cache.get_session(args.year, args.event, args.session)
+    telemetry_driver = session.laps.pick_drivers(args.driver).pick_fastest().get_car_data().add_distance()
+
+    results = compare_payload(telemetry_driver, args.budget, args.repeats)
+    base_time, base_size = results['per_chart']
+    for name, (seconds, size) in results.items():
+        print(f"{name:10s} {size / 1024:8.1f} KiB  {seconds * 1000:7.1f} ms  "
+              f"({size / base_size:.0%} size, {seconds / base_time:.0%} time of per_chart)")
+
+
+if __name__ == "__main__":
+    main()
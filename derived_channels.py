@@ -0,0 +1,129 @@
+# Derived telemetry channels (DRS open, brake %, longitudinal acceleration, ...) computed once per lap.
+# The plotters used to write these back into the telemetry frame (Brake *= 100, DRS -> 0/1), so plotting the same
+# frame twice gave wrong numbers and frames couldn't be shared between reruns. Here nothing touches the input frame:
+# every channel is a new read-only numpy array, memoised per lap.
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+DRS_OPEN_THRESHOLD = 10  # fastf1 reports DRS as 0 - 14, 10 and above means the flap is open
+MAX_MEMO_LAPS = 256
+
+
+@dataclass(frozen=True)
+class DerivedChannels:
+    """Read-only per-sample channels of one lap. All arrays have the same length as the source telemetry."""
+    distance: np.ndarray      # m
+    time: np.ndarray          # s from the first sample
+    speed: np.ndarray         # km/h
+    speed_ms: np.ndarray      # m/s
+    throttle: np.ndarray      # %
+    brake_pct: np.ndarray     # 0 or 100, so it shares an axis with throttle
+    gear: np.ndarray
+    drs_open: np.ndarray      # 0 / 1
+    accel_raw: np.ndarray     # m/s², dv/dt
+    accel_smooth: np.ndarray  # m/s², 3-point moving average of accel_raw
+
+
+def _frozen(values, dtype=np.float64):
+    arr = np.array(values, dtype=dtype)  # always a copy, never a view of the caller's frame
+    arr.setflags(write=False)
+    return arr
+
+
+def longitudinal_acceleration(speed_kmh, time_s):
+    """Raw and 3-point smoothed dv/dt in m/s² (same maths the plotters have always used)."""
+    v = np.asarray(speed_kmh, dtype=np.float64) / 3.6
+    t = np.asarray(time_s, dtype=np.float64)
+    ax_raw = np.gradient(v) / np.gradient(t)
+    ax_smooth = np.convolve(ax_raw, np.ones((3,)) / 3, mode='same')
+    return ax_raw, ax_smooth
+
+
+def compute(telemetry):
+    """Build DerivedChannels from a car data frame (needs Distance, so call add_distance() first)."""
+    time_s = telemetry['Time'].dt.total_seconds().to_numpy(dtype=np.float64)
+    speed = telemetry['Speed'].to_numpy(dtype=np.float64)
+    ax_raw, ax_smooth = longitudinal_acceleration(speed, time_s)
+    drs = np.nan_to_num(telemetry['DRS'].to_numpy(dtype=np.float64), nan=0.0)
+    brake = np.nan_to_num(telemetry['Brake'].to_numpy(dtype=np.float64), nan=0.0)
+
+    return DerivedChannels(
+        distance=_frozen(telemetry['Distance']),
+        time=_frozen(time_s),
+        speed=_frozen(speed),
+        speed_ms=_frozen(speed / 3.6),
+        throttle=_frozen(telemetry['Throttle']),
+        brake_pct=_frozen((brake > 0) * 100.0),
+        gear=_frozen(telemetry['nGear'], np.int8),
+        drs_open=_frozen(drs >= DRS_OPEN_THRESHOLD, np.int8),
+        accel_raw=_frozen(ax_raw),
+        accel_smooth=_frozen(ax_smooth),
+    )
+
+
+_lock = threading.Lock()
+_by_key = OrderedDict()  # lap key -> DerivedChannels, LRU
+_by_frame = {}           # id(frame) -> DerivedChannels, dropped when the frame is garbage collected; assumes the
+                         # frame is never modified in place while it is alive (a changed frame keeps stale channels)
+
+
+def lap_key(session, lap):
+    """Stable memo key for one lap of a loaded session."""
+    event = session.event
+    return (int(event['EventDate'].year), event['EventName'], session.name, lap['Driver'], int(lap['LapNumber']))
+
+
+def derived_channels(telemetry, key=None):
+    """
+    Memoised derived channels for one lap's telemetry.
+
+    Args:
+        telemetry (pd.DataFrame): Car data with Distance (e.g. lap.get_car_data().add_distance()). Not modified.
+        key (tuple): Optional lap key (see lap_key) so the result is shared across frames and reruns.
+            Without a key the result is memoised for as long as this exact frame object is alive, by id(): the frame
+            must not be modified in place afterwards, or later calls return channels of the old data. Pass a key
+            (or a fresh frame) whenever the telemetry may change.
+
+    Returns:
+        DerivedChannels
+    """
+    if key is not None:
+        with _lock:
+            channels = _by_key.get(key)
+            if channels is not None:
+                _by_key.move_to_end(key)
+        if channels is None:
+            channels = compute(telemetry)
+            with _lock:
+                _by_key[key] = channels
+                while len(_by_key) > MAX_MEMO_LAPS:
+                    _by_key.popitem(last=False)
+        _remember_frame(telemetry, channels)  # calls without the key on this frame (the plot functions) reuse it
+        return channels
+
+    with _lock:
+        channels = _by_frame.get(id(telemetry))
+    if channels is not None:
+        return channels
+    channels = compute(telemetry)
+    _remember_frame(telemetry, channels)
+    return channels
+
+
+def _remember_frame(telemetry, channels):
+    frame_id = id(telemetry)
+    with _lock:
+        if frame_id in _by_frame:
+            return
+        _by_frame[frame_id] = channels
+    weakref.finalize(telemetry, _by_frame.pop, frame_id, None)
+
+
+def clear():
+    with _lock:
+        _by_key.clear()
+        _by_frame.clear()
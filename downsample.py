@@ -0,0 +1,151 @@
+# Shape preserving decimation for Plotly traces.
+# A lap is a few hundred samples, but whole-race telemetry (e.g. ver_laps.get_telemetry() in Display.py) is hundreds of
+# thousands, and every one of them would otherwise be serialised into the page. Every line trace in plotly_functions goes
+# through line_trace(), which keeps at most `budget` points and switches to WebGL when a trace is still large.
+import numpy as np
+import plotly.graph_objects as go
+
+DEFAULT_POINT_BUDGET = 1500  # points per trace sent to the browser
+WEBGL_THRESHOLD = 1000       # above this many points per trace, use Scattergl instead of SVG
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep the visual shape of a continuous signal.
+
+    Args:
+        x (np.ndarray): Sorted x values.
+        y (np.ndarray): y values, same length as x.
+        n_out (int): Number of points to keep (including first and last).
+
+    Returns:
+        np.ndarray: Sorted indices into x / y.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    y = np.where(np.isnan(y), 0.0, y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets between the first and last point
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # each bucket is compared against the average of the next one; the last bucket against the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):  # sequential by design: each pick depends on the previous one
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Min/max bucketing: per bucket keep the lowest and highest sample. Exact for step signals like gear, DRS and brake.
+
+    Returns:
+        np.ndarray: Sorted, unique indices, at most n_out of them plus the first and last point.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = n_out // 2
+    size = int(np.ceil(n / n_buckets))
+    padded = np.pad(np.asarray(y, dtype=np.float64), (0, n_buckets * size - n), mode='edge').reshape(n_buckets, size)
+    base = np.arange(n_buckets) * size
+    lows = base + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    highs = base + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    keep = np.concatenate(([0], lows, highs, [n - 1]))
+    return np.unique(np.minimum(keep, n - 1))
+
+
+def downsample(x, y, budget=DEFAULT_POINT_BUDGET, method='lttb'):
+    """Return (x, y) reduced to at most `budget` points. method is 'lttb' (continuous) or 'minmax' (steps)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if budget is None or len(x) <= budget:
+        return x, y
+    if method == 'minmax':
+        idx = minmax_indices(y, budget)
+    elif method == 'lttb':
+        idx = lttb_indices(x, y, budget)
+    else:
+        raise ValueError(f"unknown downsampling method {method!r}")
+    return x[idx], y[idx]
+
+
+def line_trace(x, y, budget=DEFAULT_POINT_BUDGET, method='lttb', **kwargs):
+    """A decimated lines trace: go.Scatter for small traces, go.Scattergl once it is above WEBGL_THRESHOLD points."""
+    x, y = downsample(x, y, budget, method)
+    trace_type = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    kwargs.setdefault('mode', 'lines')
+    return trace_type(x=x, y=y, **kwargs)
+
+
+def uniform_grid(x, budget=DEFAULT_POINT_BUDGET):
+    """(x0, dx, n) of an evenly spaced grid over x with at most `budget` points (never more than len(x))."""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x) if budget is None else max(2, min(budget, len(x)))
+    x0, x1 = np.nanmin(x), np.nanmax(x)
+    return x0, (x1 - x0) / (n - 1), n
+
+
+def resample_uniform(x, y, x0, dx, n, method='linear'):
+    """
+    y sampled on the grid x0 + k * dx. method is 'linear' (continuous channels) or
+    'previous' (step channels: the last sample at or before each grid point, so edges stay sharp).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    grid = x0 + np.arange(n) * dx
+    if method == 'linear':
+        return np.interp(grid, x, y)
+    if method == 'previous':
+        idx = np.clip(np.searchsorted(x, grid, side='right') - 1, 0, len(x) - 1)
+        return y[idx]
+    raise ValueError(f"unknown resampling method {method!r}")
+
+
+def resample_extrema(x, y, x0, dx, n):
+    """
+    y on the grid x0 + k * dx (k < n) made of real samples instead of interpolated ones: grid points are paired into
+    buckets, and each bucket holds the lowest and highest sample whose x falls in it, in the order they occur. Brake
+    spikes, gear blips and speed minima survive however long the range is (the min/max idea of minmax_indices, kept
+    on an evenly spaced axis so the trace still only needs x0 / dx). Buckets without samples are interpolated.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    grid = x0 + np.arange(n) * dx
+    out = np.interp(grid, x, y) if len(x) else np.full(n, np.nan)
+    n_buckets = n // 2
+    if n_buckets == 0 or len(x) == 0 or dx <= 0:
+        return out
+
+    bucket = np.clip(((x - x0) // (2 * dx)).astype(np.int64), 0, n_buckets - 1)
+    order = np.lexsort((y, bucket))  # by bucket, then by value: first of a bucket is its min, last its max
+    counts = np.bincount(bucket, minlength=n_buckets)
+    filled = counts > 0
+    ends = np.cumsum(counts)
+    lows = order[(ends - counts)[filled]]
+    highs = order[ends[filled] - 1]
+    first, second = np.minimum(lows, highs), np.maximum(lows, highs)  # keep the samples in x order
+    slots = 2 * np.flatnonzero(filled)
+    out[slots] = y[first]
+    out[slots + 1] = y[second]
+    return out
+
+
+def grid_trace(y, x0, dx, **kwargs):
+    """Lines trace on an evenly spaced x axis: only x0 and dx are serialised, never an x array."""
+    trace_type = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    kwargs.setdefault('mode', 'lines')
+    return trace_type(x0=x0, dx=dx, y=y, **kwargs)
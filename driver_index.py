@@ -0,0 +1,166 @@
+# SQLite backed driver / entry list index.
+# Replaces the old driver_db.json: every (year, gp, session) is upserted in its own transaction,
+# so two Streamlit users filling the dropdown at the same time can't corrupt each other's writes.
+# Driver lists are read from session metadata only (no laps, telemetry or weather).
+import argparse
+import sqlite3
+import threading
+
+import session_cache
+
+DRIVER_INDEX_FILE = "driver_index.sqlite"
+
+# same order as the session selectbox in app.py; SQ is sprint qualifying, SS the 2023 sprint shootout, S the sprint
+SESSION_TYPES = ["Q", "R", "SQ", "SS", "S", "FP1", "FP2", "FP3"]
+
+FALLBACK_TEAM_COLORS = { #  each individual team and their colours, used when fastf1 can't give us one
+    'Mercedes': '#00D2BE',
+    'Ferrari': '#DC0000',
+    'Red Bull': '#1E41FF',
+    'Alpine': '#0090FF',
+    'McLaren': '#FF8700',
+    'Alfa Romeo': '#900000',
+    'Aston Martin': '#006F62',
+    'Haas': '#FFFFFF',
+    'AlphaTauri': '#2B4562',
+    'Alpha Tauri': '#2B4562',
+    'Williams': '#005AFF'
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drivers (
+    year      INTEGER NOT NULL,
+    gp        TEXT    NOT NULL,
+    session   TEXT    NOT NULL,
+    position  INTEGER NOT NULL,
+    code      TEXT    NOT NULL,
+    team      TEXT    NOT NULL,
+    color     TEXT    NOT NULL,
+    PRIMARY KEY (year, gp, session, code)
+);
+CREATE INDEX IF NOT EXISTS idx_drivers_event ON drivers (year, gp, session, position);
+"""
+
+_local = threading.local()  # sqlite connections can't be shared between Streamlit script threads
+
+
+def _connect(path=DRIVER_INDEX_FILE):
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")  # readers never block on a writer
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+def lookup_drivers(year, gp, session_type, path=DRIVER_INDEX_FILE):
+    """Indexed read of [(code, team, color), ...], or None if the session hasn't been indexed yet."""
+    rows = _connect(path).execute(
+        "SELECT code, team, color FROM drivers WHERE year = ? AND gp = ? AND session = ? ORDER BY position",
+        (int(year), gp, session_type),
+    ).fetchall()
+    return [tuple(r) for r in rows] or None
+
+
+def upsert_drivers(year, gp, session_type, drivers, path=DRIVER_INDEX_FILE):
+    """Replace the entry list of one (year, gp, session) in a single transaction."""
+    conn = _connect(path)
+    with conn:  # commits on success, rolls back on error
+        conn.execute(
+            "DELETE FROM drivers WHERE year = ? AND gp = ? AND session = ?",
+            (int(year), gp, session_type),
+        )
+        conn.executemany(
+            "INSERT INTO drivers (year, gp, session, position, code, team, color) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(int(year), gp, session_type, i, code, team, color) for i, (code, team, color) in enumerate(drivers)],
+        )
+
+
+def team_color(team):
+    """Team colour from fastf1 if it knows the team, otherwise our fallback table."""
+    try:
+        from fastf1.plotting import team_color as get_team_color
+    except ImportError:
+        get_team_color = None
+
+    if get_team_color:
+        try:
+            return get_team_color(team) # if get_team_color(team) works, you get the real team color.
+        except Exception:
+            pass # FastF1 is ever changing, so fall through to our own table
+    return FALLBACK_TEAM_COLORS.get(team, "#999999") #if all esle fails use a safe fallback gray
+
+
+def fetch_entry_list(year, gp, session_type):
+    """Load only the session metadata (results / driver info) and build [(code, team, color), ...]."""
+    fastf1 = session_cache.enable_cache()
+    session = fastf1.get_session(year, gp, session_type)
+    session.load(laps=False, telemetry=False, weather=False, messages=False)
+
+    drivers = []
+    for drv in session.drivers:
+        drv_data = session.get_driver(drv)
+        code = drv_data.get("Abbreviation", "").upper() # abbreviate their name and change to upper case for consistency
+        team = drv_data.get("TeamName", "")
+        drivers.append((code, team, team_color(team)))
+    return drivers
+
+
+def get_drivers(year, gp, session_type, path=DRIVER_INDEX_FILE):
+    """Drivers from the index, fetching (metadata only) and upserting on a miss."""
+    drivers = lookup_drivers(year, gp, session_type, path)
+    if drivers is not None:
+        return drivers
+    return refresh_drivers(year, gp, session_type, path)
+
+
+def refresh_drivers(year, gp, session_type, path=DRIVER_INDEX_FILE):
+    """Force a fresh entry list fetch for one session and store it."""
+    drivers = fetch_entry_list(year, gp, session_type)
+    if drivers:
+        upsert_drivers(year, gp, session_type, drivers, path)
+    return drivers
+
+
+def index_season(year, session_types=SESSION_TYPES, path=DRIVER_INDEX_FILE, force=False):
+    """Index every event of a season. Returns the number of sessions written."""
+    fastf1 = session_cache.enable_cache()
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    written = 0
+    for gp in schedule['EventName'].unique():
+        for session_type in session_types:
+            if not force and lookup_drivers(year, gp, session_type, path) is not None:
+                continue
+            try:
+                drivers = refresh_drivers(year, gp, session_type, path)
+            except Exception as e: # sprint weekends lack FP2/FP3, the rest SQ/SS/S; future events have no data
+                print(f"skip {year} {gp} {session_type}: {e}")
+                continue
+            if drivers:
+                written += 1
+                print(f"{year} {gp} {session_type}: {len(drivers)} drivers")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the SQLite driver index for whole seasons.")
+    parser.add_argument("years", nargs="+", type=int, help="season(s) to index, e.g. 2022 2023")
+    parser.add_argument("--sessions", nargs="+", default=SESSION_TYPES, help="session types to index")
+    parser.add_argument("--db", default=DRIVER_INDEX_FILE, help="index file (default: %(default)s)")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="re-fetch sessions that are already indexed")
+    args = parser.parse_args(argv)
+
+    session_cache.enable_cache(args.cache)
+    for year in args.years:
+        written = index_season(year, args.sessions, args.db, args.force)
+        print(f"{year}: indexed {written} sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# Render cache for Plotly figures, shared by every user session of the Streamlit server process.
+# Streamlit reruns app.py on every interaction and used to rebuild every go.Figure, even when year / GP / session /
+# driver hadn't changed. Figures are cached here as their serialized JSON, keyed by what they were built from, so a
+# repeat view skips both the telemetry extraction and the figure construction.
+# Memory is an LRU bounded in bytes; an optional disk tier keeps figures across server restarts, one directory per
+# session (figure_cache/<session hash>/<figure hash>.json) so a session's figures can be dropped together.
+# Keys carry FORMAT_VERSION and the plotly version, so figures written by older code are never served.
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+MAX_MEMORY_BYTES = 256 * 1024 ** 2
+MAX_DISK_BYTES = 1024 ** 3
+FIGURE_CACHE_DIR = "figure_cache"
+FORMAT_VERSION = 1  # bump whenever a plot function changes what it draws for the same inputs
+
+_plotly_version = None
+
+
+def _format():
+    """(FORMAT_VERSION, plotly version): figure JSON from another plotly may not load in this one."""
+    global _plotly_version
+    if _plotly_version is None:
+        import plotly  # already imported by whoever builds the figures
+        _plotly_version = plotly.__version__
+    return FORMAT_VERSION, _plotly_version
+
+
+def _digest(value):
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+class FigureCache:
+    """
+    Size-bounded LRU of serialized figures, with an optional on-disk second tier.
+
+    Args:
+        max_bytes (int): Budget for the JSON held in memory.
+        disk_dir (str): Directory of the disk tier, or None for memory only.
+        max_disk_bytes (int): Budget of the disk tier; the least recently written files go first.
+    """
+
+    def __init__(self, max_bytes=MAX_MEMORY_BYTES, disk_dir=None, max_disk_bytes=MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._figures = OrderedDict()  # key -> JSON str, oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_files = None        # path -> bytes of every file in the disk tier, oldest write first
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()  # guards the two above
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(session_key, driver, lap_id, chart, **options):
+        """Hashable key of one rendered chart. Options are every display setting that changes the figure."""
+        return (_format(), tuple(session_key), driver, str(lap_id), chart, tuple(sorted(options.items())))
+
+    def _session_dir(self, session_key):
+        return os.path.join(self.disk_dir, _digest(tuple(session_key))[:16])
+
+    def _path(self, key):
+        return os.path.join(self._session_dir(key[1]), f"{_digest(key)}.json")
+
+    def _remember(self, key, figure_json):
+        with self._lock:
+            old = self._figures.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._figures[key] = figure_json
+            self._bytes += len(figure_json)
+            # always keep the newest entry, even if it alone is over budget
+            while len(self._figures) > 1 and self._bytes > self.max_bytes:
+                _, dropped = self._figures.popitem(last=False)
+                self._bytes -= len(dropped)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._figures:
+                return True
+        return self.disk_dir is not None and os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Cached figure JSON, or None."""
+        with self._lock:
+            figure_json = self._figures.get(key)
+            if figure_json is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return figure_json
+        if self.disk_dir is not None:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    figure_json = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                self._remember(key, figure_json)
+                with self._lock:
+                    self.disk_hits += 1
+                return figure_json
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, figure_json):
+        self._remember(key, figure_json)
+        if self.disk_dir is not None:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(figure_json)
+            os.replace(tmp, path)  # readers never see half a file
+            self._written(path, os.path.getsize(path))
+
+    def _scan_disk(self):
+        # once per process, what earlier runs left behind; from then on puts keep the index up to date
+        files = []
+        if os.path.isdir(self.disk_dir):
+            for root, _, names in os.walk(self.disk_dir):
+                for name in names:
+                    if name.endswith(".json"):
+                        stat = os.stat(os.path.join(root, name))
+                        files.append((stat.st_mtime, os.path.join(root, name), stat.st_size))
+        self._disk_files = OrderedDict((path, size) for _, path, size in sorted(files))
+        self._disk_bytes = sum(self._disk_files.values())
+
+    def _written(self, path, size):
+        """Account for a file just written and drop the least recently written ones over max_disk_bytes."""
+        with self._disk_lock:
+            if self._disk_files is None:
+                self._scan_disk()  # already sees the new file
+            else:
+                self._disk_bytes += size - self._disk_files.pop(path, 0)
+                self._disk_files[path] = size
+            dropped = []
+            # always keep the newest file, even if it alone is over budget
+            while len(self._disk_files) > 1 and self._disk_bytes > self.max_disk_bytes:
+                old_path, old_size = self._disk_files.popitem(last=False)
+                self._disk_bytes -= old_size
+                dropped.append(old_path)
+        for old_path in dropped:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:  # another process got there first
+                pass
+
+    def disk_bytes(self):
+        with self._disk_lock:
+            if self._disk_files is None and self.disk_dir is not None:
+                self._scan_disk()
+            return self._disk_bytes
+
+    def get_or_build(self, key, build):
+        """
+        Figure as a plain dict (what st.plotly_chart takes), from the cache or from build().
+
+        Args:
+            build (callable): Returns a go.Figure; only called on a miss.
+        """
+        figure_json = self.get(key)
+        if figure_json is None:
+            return self.build_and_put(key, build)
+        return json.loads(figure_json)
+
+    def build_and_put(self, key, build):
+        """
+        Build, cache and return a figure (as a dict) after the caller's own get() missed, without looking it up
+        (and counting a miss) a second time.
+        """
+        figure_json = build().to_json()
+        self.put(key, figure_json)
+        return json.loads(figure_json)
+
+    def total_bytes(self):
+        return self._bytes
+
+    def invalidate(self, session_key=None):
+        """Drop every figure of one session, or everything if called without arguments, from memory and disk."""
+        with self._lock:
+            if session_key is None:
+                self._figures.clear()
+                self._bytes = 0
+            else:
+                for key in [k for k in self._figures if k[1] == tuple(session_key)]:
+                    self._bytes -= len(self._figures.pop(key))
+        if self.disk_dir is None or not os.path.isdir(self.disk_dir):
+            return
+        with self._disk_lock:
+            if session_key is None:
+                doomed = [entry.path for entry in os.scandir(self.disk_dir) if entry.is_dir()]
+            else:
+                doomed = [self._session_dir(session_key)]
+            for path in doomed:
+                shutil.rmtree(path, ignore_errors=True)
+            if self._disk_files is not None:
+                prefixes = tuple(os.path.join(path, "") for path in doomed)
+                for path in [p for p in self._disk_files if p.startswith(prefixes)]:
+                    self._disk_bytes -= self._disk_files.pop(path)
+
+    def __len__(self):
+        return len(self._figures)
+
+
+# the one cache every user session in this process shares; set FIGURE_CACHE_DISK=1 to add the disk tier
+FIGURES = FigureCache(disk_dir=FIGURE_CACHE_DIR if os.environ.get("FIGURE_CACHE_DISK") else None)
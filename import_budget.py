@@ -0,0 +1,89 @@
+# Import-time budget for the Streamlit app's cold start.
+# Collects the module-level imports of app.py (the ones that run before the selectors are painted; imports inside
+# the button handler are deliberately deferred), imports them in a fresh interpreter under `python -X importtime`
+# and checks the total against a budget. Modules that should never be part of startup are reported as failures too.
+#
+#   python import_budget.py                    # report
+#   python import_budget.py --check            # exit 1 if over budget or a deferred module leaked into startup
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+APP_FILE = "app.py"
+DEFAULT_BUDGET_MS = 2500   # streamlit itself accounts for most of this
+# first click only; plain plotly / plotly.graph_objects are not listed because streamlit itself imports them
+DEFERRED_MODULES = ["fastf1", "matplotlib", "plotly.express", "scipy"]
+
+
+def startup_imports(path=APP_FILE):
+    """Top level modules imported at module scope of a script, in order (imports inside if / def / with are skipped)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(stderr):
+    """`-X importtime` output -> [(module, self_us, cumulative_us, depth)] in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(modules, cwd="."):
+    """Import `modules` in a fresh interpreter. Returns (total ms, importtime rows)."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = parse_importtime(proc.stderr)
+    # -X importtime lists every module once; top level rows' cumulative times add up to the whole import
+    total_us = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    return total_us / 1000, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure and check the app's startup import time.")
+    parser.add_argument("--app", default=APP_FILE)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeats", type=int, default=3, help="fresh interpreters to run, the fastest counts")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--check", action="store_true", help="exit 1 on a budget or deferred-module failure")
+    args = parser.parse_args(argv)
+
+    modules = startup_imports(args.app)
+    cwd = os.path.dirname(os.path.abspath(args.app))
+    total_ms, rows = min((measure(modules, cwd) for _ in range(args.repeats)), key=lambda run: run[0])
+
+    print(f"startup imports of {args.app}: {', '.join(modules)}")
+    print(f"total {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, _, cumulative, _ in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"startup imports take {total_ms:.0f} ms, budget is {args.budget_ms:.0f} ms")
+    loaded = {name for name, _, _, _ in rows}
+    for module in DEFERRED_MODULES:
+        if module in loaded:
+            failures.append(f"{module} is imported at startup, it should load on first use")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if args.check and failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
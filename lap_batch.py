@@ -0,0 +1,173 @@
+# Every lap of every driver as one ragged batch: flat per-sample channel arrays plus lap offsets.
+# Lap i owns samples offsets[i]:offsets[i + 1] of every channel, so whole-session models run as single NumPy
+# passes instead of one get_car_data() call and one Python loop iteration per lap.
+from dataclasses import dataclass
+
+import numpy as np
+
+from telemetry_store import lap_bounds
+
+CHANNELS = ['Speed', 'Throttle', 'Brake', 'nGear', 'DRS', 'RPM']
+
+
+@dataclass
+class LapBatch:
+    drivers: np.ndarray      # (L,) driver code of each lap
+    lap_numbers: np.ndarray  # (L,) lap number of each lap
+    lap_times: np.ndarray    # (L,) lap time in seconds (NaN if fastf1 has none)
+    offsets: np.ndarray      # (L + 1,) sample offsets; lap i is offsets[i]:offsets[i + 1]
+    channels: dict           # name -> (S,) flat array; always has 'Time' (s from lap start) and 'Distance' (m)
+
+    def __len__(self):
+        return len(self.lap_numbers)
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def lap_index(self):
+        """(S,) index of the lap each sample belongs to."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def lap(self, i):
+        """Channels of lap i as views."""
+        a, b = self.offsets[i], self.offsets[i + 1]
+        return {name: values[a:b] for name, values in self.channels.items()}
+
+
+def _ranges(starts, stops):
+    """Concatenation of arange(start, stop) for every pair, without a Python loop."""
+    lengths = stops - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    seg_starts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return np.arange(total) + seg_starts
+
+
+def segment_starts(values, offsets):
+    """Each sample's segment's first value, broadcast to every sample of the segment."""
+    if len(values) == 0:
+        return values
+    return np.repeat(values[np.minimum(offsets[:-1], len(values) - 1)], np.diff(offsets))
+
+
+def segmented_cumsum(values, offsets):
+    """Cumulative sum that restarts at every segment."""
+    total = np.cumsum(values)
+    before = np.concatenate(([0.0], total))[offsets[:-1]]
+    return total - np.repeat(before, np.diff(offsets))
+
+
+def segmented_gradient(values, offsets):
+    """np.gradient applied to each segment separately (central differences inside, one-sided at the edges)."""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    prev_idx = np.arange(n) - 1
+    next_idx = np.arange(n) + 1
+    first = np.zeros(n, dtype=bool)
+    last = np.zeros(n, dtype=bool)
+    lengths = np.diff(offsets)
+    first[offsets[:-1][lengths > 0]] = True
+    last[offsets[1:][lengths > 0] - 1] = True
+    prev_idx[first] = np.flatnonzero(first)
+    next_idx[last] = np.flatnonzero(last)
+    span = (next_idx - prev_idx).astype(np.float64)
+    span[span == 0] = np.nan  # one-sample segments have no gradient
+    return (values[next_idx] - values[prev_idx]) / span
+
+
+def segmented_smooth3(values, offsets):
+    """3-point moving average per segment, same edges as np.convolve(..., np.ones(3) / 3, mode='same')."""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    lengths = np.diff(offsets)
+    prev = np.concatenate(([0.0], values[:-1]))
+    nxt = np.concatenate((values[1:], [0.0]))
+    prev[offsets[:-1][lengths > 0]] = 0.0      # zero padding at each segment start...
+    nxt[offsets[1:][lengths > 0] - 1] = 0.0    # ...and end, like mode='same'
+    return (prev + values + nxt) / 3
+
+
+def segment_reduce(ufunc, values, offsets):
+    """ufunc.reduceat over segments; empty segments give NaN."""
+    lengths = np.diff(offsets)
+    out = np.full(len(lengths), np.nan)
+    nonempty = lengths > 0
+    if nonempty.any():
+        out[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return out
+
+
+def segment_mean(values, offsets):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return segment_reduce(np.add, values, offsets) / np.diff(offsets)
+
+
+def longitudinal_acceleration(batch):
+    """Raw and smoothed dv/dt for every sample, lap by lap but in one pass (matches derived_channels)."""
+    v = batch.channels['Speed'] / 3.6
+    ax_raw = segmented_gradient(v, batch.offsets) / segmented_gradient(batch.channels['Time'], batch.offsets)
+    return ax_raw, segmented_smooth3(ax_raw, batch.offsets)
+
+
+def from_session(session, drivers=None, channels=CHANNELS, laps=None):
+    """
+    Gather every lap (of `drivers`, or everyone) of a loaded session into a LapBatch.
+
+    Args:
+        session (fastf1.core.Session): Loaded with telemetry.
+        drivers (list[str]): Driver codes, default all.
+        channels (list[str]): Car data columns to gather.
+        laps (fastf1.core.Laps): Use these laps instead of session.laps (e.g. already filtered).
+    """
+    laps = session.laps if laps is None else laps
+    if drivers is not None:
+        laps = laps.pick_drivers(drivers)
+
+    lap_drivers, lap_numbers, lap_times, parts, lengths = [], [], [], {c: [] for c in channels}, []
+    session_times = []
+    for drv_number in laps['DriverNumber'].dropna().unique():
+        if drv_number not in session.car_data:
+            continue
+        driver_laps = laps[laps['DriverNumber'] == drv_number]
+        car = session.car_data[drv_number]
+        car_st = car['SessionTime'].dt.total_seconds().to_numpy(dtype=np.float64)
+        starts, stops = lap_bounds(car_st,
+                                   driver_laps['LapStartTime'].dt.total_seconds().to_numpy(dtype=np.float64),
+                                   driver_laps['Time'].dt.total_seconds().to_numpy(dtype=np.float64))
+        idx = _ranges(starts, stops)
+        for c in channels:
+            parts[c].append(car[c].to_numpy(dtype=np.float64)[idx])
+        session_times.append(car_st[idx])
+        lengths.append(stops - starts)
+        lap_drivers.append(driver_laps['Driver'].to_numpy())
+        lap_numbers.append(driver_laps['LapNumber'].to_numpy(dtype=np.float64))
+        lap_times.append(driver_laps['LapTime'].dt.total_seconds().to_numpy(dtype=np.float64))
+
+    if not lengths:
+        empty = np.zeros(0)
+        return LapBatch(np.zeros(0, dtype=object), empty, empty, np.zeros(1, dtype=np.int64),
+                        {c: empty for c in channels + ['SessionTime', 'Time', 'Distance']})
+
+    offsets = np.concatenate(([0], np.cumsum(np.concatenate(lengths)))).astype(np.int64)
+    flat = {c: np.concatenate(parts[c]) for c in channels}
+    session_time = np.concatenate(session_times)
+    # Time and Distance restart every lap, like lap.get_car_data().add_distance()
+    flat['SessionTime'] = session_time
+    flat['Time'] = session_time - segment_starts(session_time, offsets)
+    dt = np.diff(session_time, prepend=session_time[:1])
+    dt[offsets[:-1][np.diff(offsets) > 0]] = 0.0
+    flat['Distance'] = segmented_cumsum(flat['Speed'] / 3.6 * dt, offsets)
+
+    return LapBatch(
+        drivers=np.concatenate(lap_drivers),
+        lap_numbers=np.concatenate(lap_numbers),
+        lap_times=np.concatenate(lap_times),
+        offsets=offsets,
+        channels=flat,
+    )
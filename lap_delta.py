@@ -0,0 +1,113 @@
+# Lap delta engine: generalises Race_Delta.py from two hard-coded drivers to any set of laps.
+# Every lap's telemetry is fetched exactly once, then all laps are resampled onto one shared distance grid
+# in a single np.interp call and compared against a reference lap.
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class LapDelta:
+    """Result of a delta computation. Rows of `times` and `delta` follow `labels`."""
+    distance: np.ndarray   # (M,) shared distance grid in metres
+    labels: list           # N row labels, e.g. driver codes or "VER L12"
+    times: np.ndarray      # (N, M) elapsed lap time in seconds at each grid point
+    delta: np.ndarray      # (N, M) times minus the reference row (positive = slower than reference)
+    reference: str         # label of the reference lap
+
+    def row(self, label):
+        return self.delta[self.labels.index(label)]
+
+
+def lap_trace(lap):
+    """(distance, time) arrays of one lap, fetched once. Time is in seconds from the start of the lap."""
+    telemetry = lap.get_car_data().add_distance()
+    distance = telemetry['Distance'].to_numpy(dtype=np.float64)
+    time = telemetry['Time'].dt.total_seconds().to_numpy(dtype=np.float64)
+    return distance, time
+
+
+def resample_traces(distances, times, num_points=1000):
+    """
+    Resample ragged (distance, time) traces onto a common distance grid in one batched pass.
+
+    Each trace is shifted onto its own stretch of a single monotonic axis, so one np.interp call
+    handles all of them instead of one call per lap.
+
+    Args:
+        distances (list[np.ndarray]): Per-lap distance arrays (non-decreasing).
+        times (list[np.ndarray]): Per-lap time arrays, same lengths as distances.
+        num_points (int): Grid size.
+
+    Returns:
+        tuple: (grid (M,), resampled times (N, M))
+    """
+    lengths = np.array([len(d) for d in distances])
+    starts = np.array([d[0] for d in distances])
+    ends = np.array([d[-1] for d in distances])
+
+    # like Race_Delta.py: compare only over the distance every lap actually covered
+    grid = np.linspace(0, ends.min(), num=num_points)
+
+    span = ends.max() + 1.0
+    offsets = np.arange(len(distances)) * span
+    all_distance = np.concatenate(distances) + np.repeat(offsets, lengths)
+    all_time = np.concatenate(times)
+
+    # clamp each lap's queries to its own samples so nothing interpolates into a neighbouring lap
+    queries = np.clip(grid[None, :], starts[:, None], ends[:, None]) + offsets[:, None]
+    resampled = np.interp(queries.ravel(), all_distance, all_time).reshape(len(distances), num_points)
+    return grid, resampled
+
+
+def compute_deltas(laps, labels, reference=None, num_points=1000):
+    """
+    Delta matrix of several laps against a reference lap.
+
+    Args:
+        laps (list): fastf1 Lap objects (or anything with get_car_data()).
+        labels (list[str]): One label per lap.
+        reference (str): Label of the reference lap. Defaults to the lap with the shortest time.
+        num_points (int): Distance grid size.
+
+    Returns:
+        LapDelta
+
+    Raises:
+        ValueError: If reference is not one of the labels (e.g. that driver set no timed lap).
+    """
+    if reference is not None and reference not in labels:
+        raise ValueError(f"reference {reference!r} has no timed lap to compare against")
+    traces = [lap_trace(lap) for lap in laps]
+    grid, times = resample_traces([d for d, _ in traces], [t for _, t in traces], num_points)
+
+    if reference is None:
+        ref_row = int(np.argmin([t[-1] for _, t in traces]))
+    else:
+        ref_row = labels.index(reference)
+    delta = times - times[ref_row]
+    return LapDelta(distance=grid, labels=list(labels), times=times, delta=delta, reference=labels[ref_row])
+
+
+def fastest_lap_deltas(session, drivers=None, reference=None, num_points=1000):
+    """Every driver's fastest lap (or just `drivers`) against a reference driver's fastest lap."""
+    if drivers is None:
+        drivers = session.laps['Driver'].dropna().unique().tolist()
+
+    laps, labels = [], []
+    for drv in drivers:
+        lap = session.laps.pick_drivers(drv).pick_fastest()
+        if lap is None or lap.empty:  # no timed lap (crash, DNS...), nothing to compare
+            continue
+        laps.append(lap)
+        labels.append(drv)
+    return compute_deltas(laps, labels, reference, num_points)
+
+
+def driver_lap_deltas(session, driver, reference=None, num_points=1000):
+    """Every timed lap of one driver against their fastest (or the given) lap. Labels are 'VER L12'."""
+    driver_laps = session.laps.pick_drivers(driver).pick_wo_box()
+    driver_laps = driver_laps[driver_laps['LapTime'].notna()]
+    laps = [lap for _, lap in driver_laps.iterlaps()]
+    labels = [f"{driver} L{int(lap['LapNumber'])}" for lap in laps]
+    return compute_deltas(laps, labels, reference, num_points)
@@ -0,0 +1,276 @@
+# Streaming event extraction: gear shifts, brake on/off, DRS open/close and full-throttle segments, lap by lap.
+# Display.py used to build one merged get_telemetry() frame for a whole race just to find gear changes; here every
+# lap is sliced straight out of the per-driver car data (or the memory-mapped telemetry_store), turned into a handful
+# of event rows with NumPy edge detection and handed on in chunks, so peak memory is one driver's channels plus one
+# chunk of events. Results are written to a SQLite event table.
+#
+#   python lap_events.py 2023 Silverstone R                # every driver
+#   python lap_events.py 2023 Silverstone R --drivers VER HAM
+import argparse
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+import telemetry_store
+from derived_channels import DRS_OPEN_THRESHOLD
+from telemetry_store import lap_bounds
+
+EVENT_INDEX_FILE = "lap_events.sqlite"
+FULL_THROTTLE = 99  # % pedal, fastf1 rarely reports a clean 100
+DEFAULT_CHUNK_LAPS = 50
+EVENT_KINDS = ['gear_shift', 'brake_on', 'brake_off', 'drs_open', 'drs_close', 'full_throttle']
+EVENT_COLUMNS = ['Driver', 'LapNumber', 'Event', 'SessionTime', 'Time', 'Distance',
+                 'FromValue', 'ToValue', 'Duration', 'Length']
+_CHANNELS = ['SessionTime', 'Time', 'Distance', 'Speed', 'Throttle', 'Brake', 'nGear', 'DRS']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    year         INTEGER NOT NULL,
+    gp           TEXT    NOT NULL,
+    session      TEXT    NOT NULL,
+    driver       TEXT    NOT NULL,
+    lap          INTEGER NOT NULL,
+    event        TEXT    NOT NULL,
+    session_time REAL    NOT NULL,   -- s since session start
+    time         REAL    NOT NULL,   -- s since lap start
+    distance     REAL    NOT NULL,   -- m since lap start
+    from_value   REAL,               -- gear before / after a shift
+    to_value     REAL,
+    duration     REAL,               -- full_throttle segments only
+    length       REAL
+);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events (year, gp, session, driver, lap);
+"""
+
+_local = threading.local()
+
+
+def _connect(path=EVENT_INDEX_FILE):
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+def iter_session_laps(session, drivers=None):
+    """
+    Yield (driver, lap_number, channels) for every lap of a loaded fastf1 session, one driver's car data at a time.
+    channels holds NumPy arrays of _CHANNELS; Time and Distance restart every lap, like get_car_data().add_distance().
+    """
+    laps = session.laps if drivers is None else session.laps.pick_drivers(drivers)
+    for drv_number in laps['DriverNumber'].dropna().unique():
+        if drv_number not in session.car_data:
+            continue
+        driver_laps = laps[laps['DriverNumber'] == drv_number]
+        car = session.car_data[drv_number]
+        session_time = car['SessionTime'].dt.total_seconds().to_numpy(dtype=np.float64)
+        columns = {c: car[c].to_numpy(dtype=np.float64) for c in ('Speed', 'Throttle', 'Brake', 'nGear', 'DRS')}
+        starts, stops = lap_bounds(session_time,
+                                   driver_laps['LapStartTime'].dt.total_seconds().to_numpy(dtype=np.float64),
+                                   driver_laps['Time'].dt.total_seconds().to_numpy(dtype=np.float64))
+        for code, lap_number, a, b in zip(driver_laps['Driver'], driver_laps['LapNumber'], starts, stops):
+            if b <= a or np.isnan(lap_number):
+                continue
+            st = session_time[a:b]
+            channels = {c: values[a:b] for c, values in columns.items()}
+            channels['SessionTime'] = st
+            channels['Time'] = st - st[0]
+            ds = channels['Speed'] / 3.6 * np.diff(st, prepend=st[0])
+            channels['Distance'] = np.cumsum(ds)
+            yield code, int(lap_number), channels
+
+
+def iter_stored_laps(stored, drivers=None):
+    """Same as iter_session_laps, from a telemetry_store.StoredSession (laps are memory-mapped views)."""
+    for driver in drivers or stored.drivers:
+        for lap_number in stored.laps(driver)['LapNumber']:
+            if np.isnan(lap_number):
+                continue
+            yield driver, int(lap_number), stored.lap_car_data(driver, int(lap_number), _CHANNELS)
+
+
+def _edges(state, previous):
+    """Indices where a boolean channel switches on and off, given its value on the sample before the lap."""
+    step = np.diff(np.concatenate(([previous], state)).astype(np.int8))
+    return np.flatnonzero(step == 1), np.flatnonzero(step == -1)
+
+
+def lap_events(channels, previous=None):
+    """
+    Events of one lap as a dict of equal-length column arrays (EVENT_COLUMNS minus Driver and LapNumber).
+
+    Args:
+        channels (dict): Arrays of _CHANNELS for the lap.
+        previous (dict): Brake / DRS / nGear state on the last sample of the previous lap, so events that happen on the
+            lap line are neither lost nor duplicated. None for the first lap.
+    """
+    brake = np.asarray(channels['Brake']) > 0
+    drs = np.asarray(channels['DRS']) >= DRS_OPEN_THRESHOLD
+    gear = np.asarray(channels['nGear'])
+    if previous is None:
+        previous = {'Brake': brake[0], 'DRS': drs[0], 'nGear': gear[0]}
+
+    kinds, idx, from_value, to_value = [], [], [], []
+
+    prev_gear = np.concatenate(([previous['nGear']], gear[:-1]))
+    shifts = np.flatnonzero(gear != prev_gear)
+    kinds.append(np.full(len(shifts), 'gear_shift'))
+    idx.append(shifts)
+    from_value.append(prev_gear[shifts])
+    to_value.append(gear[shifts])
+
+    for name, state, on, off in (('Brake', brake, 'brake_on', 'brake_off'), ('DRS', drs, 'drs_open', 'drs_close')):
+        rising, falling = _edges(state, previous[name])
+        for kind, where in ((on, rising), (off, falling)):
+            kinds.append(np.full(len(where), kind))
+            idx.append(where)
+            from_value.append(np.full(len(where), np.nan))
+            to_value.append(np.full(len(where), np.nan))
+
+    time = np.asarray(channels['Time'])
+    distance = np.asarray(channels['Distance'])
+    point = np.concatenate(idx)
+    out = {
+        'Event': np.concatenate(kinds),
+        'SessionTime': np.asarray(channels['SessionTime'])[point],
+        'Time': time[point],
+        'Distance': distance[point],
+        'FromValue': np.concatenate(from_value).astype(np.float64),
+        'ToValue': np.concatenate(to_value).astype(np.float64),
+        'Duration': np.full(len(point), np.nan),
+        'Length': np.full(len(point), np.nan),
+    }
+
+    # full-throttle segments are cut at the lap line so each one belongs to exactly one lap
+    full = np.asarray(channels['Throttle']) >= FULL_THROTTLE
+    starts, ends = _edges(np.concatenate((full, [False])), False)
+    last = ends - 1
+    segment = {
+        'Event': np.full(len(starts), 'full_throttle'),
+        'SessionTime': np.asarray(channels['SessionTime'])[starts],
+        'Time': time[starts],
+        'Distance': distance[starts],
+        'FromValue': np.full(len(starts), np.nan),
+        'ToValue': np.full(len(starts), np.nan),
+        'Duration': time[last] - time[starts],
+        'Length': distance[last] - distance[starts],
+    }
+    out = {name: np.concatenate((out[name], segment[name])) for name in out}
+    order = np.argsort(out['Time'], kind='stable')
+    return {name: values[order] for name, values in out.items()}
+
+
+def iter_events(laps, chunk_laps=DEFAULT_CHUNK_LAPS):
+    """
+    Turn a (driver, lap_number, channels) stream into DataFrames of EVENT_COLUMNS, one per chunk_laps laps.
+
+    Args:
+        laps (iterable): e.g. iter_session_laps(session) or iter_stored_laps(stored).
+    """
+    parts, n_laps, state = [], 0, {}
+    for driver, lap_number, channels in laps:
+        if len(channels['Time']) == 0:
+            continue
+        events = lap_events(channels, state.get(driver))
+        state[driver] = {'Brake': channels['Brake'][-1] > 0, 'DRS': channels['DRS'][-1] >= DRS_OPEN_THRESHOLD,
+                         'nGear': channels['nGear'][-1]}
+        n = len(events['Event'])
+        parts.append({'Driver': np.full(n, driver, dtype=object), 'LapNumber': np.full(n, lap_number), **events})
+        n_laps += 1
+        if n_laps == chunk_laps:
+            yield _frame(parts)
+            parts, n_laps = [], 0
+    if parts:
+        yield _frame(parts)
+
+
+def _frame(parts):
+    return pd.DataFrame({c: np.concatenate([p[c] for p in parts]) for c in EVENT_COLUMNS})
+
+
+def session_events(session, drivers=None, kinds=None):
+    """All events of a loaded session (or of `drivers`) as one DataFrame. Prefer iter_events for long races."""
+    frames = list(iter_events(iter_session_laps(session, drivers)))
+    events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=EVENT_COLUMNS)
+    if kinds is not None:
+        events = events[events['Event'].isin(kinds)].reset_index(drop=True)
+    return events
+
+
+def write_events(chunks, year, gp, session_type, path=EVENT_INDEX_FILE, drivers=None):
+    """
+    Replace the stored events of one session (or only of `drivers`) with the chunks of iter_events, in one transaction.
+    Returns the number of rows written.
+    """
+    conn = _connect(path)
+    rows = 0
+    with conn:
+        if drivers is None:
+            conn.execute("DELETE FROM events WHERE year = ? AND gp = ? AND session = ?", (int(year), gp, session_type))
+        else:
+            conn.executemany("DELETE FROM events WHERE year = ? AND gp = ? AND session = ? AND driver = ?",
+                             [(int(year), gp, session_type, d) for d in drivers])
+        for chunk in chunks:
+            values = chunk[EVENT_COLUMNS].astype(object).where(chunk[EVENT_COLUMNS].notna(), None)
+            conn.executemany(
+                "INSERT INTO events (year, gp, session, driver, lap, event, session_time, time, distance, "
+                "from_value, to_value, duration, length) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(int(year), gp, session_type, *row) for row in values.itertuples(index=False)],
+            )
+            rows += len(chunk)
+    return rows
+
+
+def read_events(year, gp, session_type, driver=None, kinds=None, path=EVENT_INDEX_FILE):
+    """Stored events of one session as a DataFrame of EVENT_COLUMNS (empty if it hasn't been extracted yet)."""
+    query = ("SELECT driver, lap, event, session_time, time, distance, from_value, to_value, duration, length "
+             "FROM events WHERE year = ? AND gp = ? AND session = ?")
+    params = [int(year), gp, session_type]
+    if driver is not None:
+        query += " AND driver = ?"
+        params.append(driver)
+    if kinds is not None:
+        query += f" AND event IN ({','.join('?' * len(kinds))})"
+        params.extend(kinds)
+    rows = _connect(path).execute(query + " ORDER BY driver, lap, time", params).fetchall()
+    return pd.DataFrame(rows, columns=EVENT_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract lap events of a session into the SQLite event table.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("event", help="Grand Prix name, e.g. 'Silverstone'")
+    parser.add_argument("session", help="session identifier, e.g. R")
+    parser.add_argument("--drivers", nargs="+", help="driver codes (default: everyone)")
+    parser.add_argument("--chunk-laps", type=int, default=DEFAULT_CHUNK_LAPS)
+    parser.add_argument("--db", default=EVENT_INDEX_FILE, help="event table file (default: %(default)s)")
+    parser.add_argument("--store", default=telemetry_store.STORE_DIR,
+                        help="read from this telemetry_store if the session has been ingested (default: %(default)s)")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    stored = telemetry_store.open_session(args.year, args.event, args.session, args.store)
+    if stored is not None:
+        laps = iter_stored_laps(stored, args.drivers)
+    else:
+        import session_cache
+
+        session_cache.enable_cache(args.cache)
+        laps = iter_session_laps(session_cache.get_session(args.year, args.event, args.session), args.drivers)
+
+    rows = write_events(iter_events(laps, args.chunk_laps), args.year, args.event, args.session,
+                        path=args.db, drivers=args.drivers)
+    print(f"wrote {rows} events to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
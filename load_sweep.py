@@ -0,0 +1,150 @@
+# Parameter sweep / sensitivity mode for the tyre load model (tyre_load.py).
+# Every combination of the given parameter grids is evaluated against one fixed telemetry lap with NumPy broadcasting:
+# parameters are (P, 1) columns, the lap is a (1, S) row, so a chunk of P cars is one set of array operations.
+# Large grids are cut into chunks sized to a memory budget.
+#
+#   python load_sweep.py 2022 "Abu Dhabi" Q VER --cda 1.4:2.0:25 --efficiency 3:4.5:25 --cog-height 0.2,0.25,0.3
+import argparse
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from tyre_load import CarParameters, compute_loads
+
+SWEEPABLE = [f.name for f in fields(CarParameters)]
+DEFAULT_MEMORY_BUDGET = 256 * 1024 ** 2  # bytes of float64 work arrays per chunk
+_WORK_ARRAYS = 10  # roughly how many (P, S) float64 temporaries compute_loads keeps alive at once
+
+METRICS = {
+    # metric name -> (AxleLoads field, reduction over the lap)
+    'PeakFront': ('front', np.max),
+    'MeanFront': ('front', np.mean),
+    'MinFront': ('front', np.min),
+    'PeakRear': ('rear', np.max),
+    'MeanRear': ('rear', np.mean),
+    'PeakDrag': ('drag', np.max),
+    'PeakDownforce': ('downforce', np.max),
+}
+
+
+@dataclass
+class SweepResult:
+    """Labelled result cube: metrics[name] has one axis per swept parameter, in `dims` order."""
+    dims: list       # swept parameter names
+    coords: dict     # parameter name -> 1-D grid values
+    metrics: dict    # metric name -> ndarray with shape tuple(len(coords[d]) for d in dims)
+
+    def sel(self, metric, **where):
+        """Slice a metric by parameter values, e.g. sel('PeakFront', cda=1.7)."""
+        index = tuple(
+            int(np.argmin(np.abs(self.coords[d] - where[d]))) if d in where else slice(None) for d in self.dims
+        )
+        return self.metrics[metric][index]
+
+    def to_frame(self):
+        """Long table: one row per parameter combination, one column per metric."""
+        index = pd.MultiIndex.from_product([self.coords[d] for d in self.dims], names=self.dims)
+        return pd.DataFrame({name: cube.ravel() for name, cube in self.metrics.items()}, index=index)
+
+
+def chunk_size(n_samples, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """How many parameter combinations fit in one chunk for a lap of n_samples."""
+    return max(1, int(memory_budget // (max(n_samples, 1) * 8 * _WORK_ARRAYS)))
+
+
+def sweep(v, ax_smooth, grids, base=CarParameters(), metrics=METRICS, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Evaluate the load model over the full cartesian product of parameter grids for one lap.
+
+    Args:
+        v (np.ndarray): Speed of the lap in m/s, shape (S,).
+        ax_smooth (np.ndarray): Filtered longitudinal acceleration, shape (S,).
+        grids (dict): CarParameters field name -> 1-D array of values to try. Unswept fields come from `base`.
+        base (CarParameters): Values of every parameter that is not swept.
+        metrics (dict): Metric name -> (AxleLoads field, reduction), default METRICS.
+        memory_budget (int): Bytes of work arrays allowed per chunk.
+
+    Returns:
+        SweepResult
+    """
+    unknown = set(grids) - set(SWEEPABLE)
+    if unknown:
+        raise ValueError(f"can't sweep {sorted(unknown)}, choose from {SWEEPABLE}")
+
+    dims = list(grids)
+    coords = {d: np.asarray(grids[d], dtype=np.float64).ravel() for d in dims}
+    shape = tuple(len(coords[d]) for d in dims)
+    n_combos = int(np.prod(shape)) if shape else 1
+
+    v = np.asarray(v, dtype=np.float64)[None, :]
+    ax_smooth = np.asarray(ax_smooth, dtype=np.float64)[None, :]
+    flat = {name: np.empty(n_combos) for name in metrics}
+
+    step = chunk_size(v.shape[1], memory_budget)
+    for start in range(0, n_combos, step):
+        combo = np.arange(start, min(start + step, n_combos))
+        # flat combination index -> one value per swept parameter, as (P, 1) columns
+        grid_idx = np.unravel_index(combo, shape) if shape else ()
+        params = base.with_changes(**{d: coords[d][i][:, None] for d, i in zip(dims, grid_idx)})
+        loads = compute_loads(v, ax_smooth, params)
+        for name, (field, reduce) in metrics.items():
+            values = np.broadcast_to(getattr(loads, field), (len(combo), v.shape[1]))
+            flat[name][combo] = reduce(values, axis=1)
+
+    return SweepResult(dims=dims, coords=coords, metrics={name: arr.reshape(shape) for name, arr in flat.items()})
+
+
+def parse_grid(spec):
+    """'1.4:2.0:25' -> np.linspace(1.4, 2.0, 25); '0.2,0.25,0.3' -> those values."""
+    if ':' in spec:
+        start, stop, num = spec.split(':')
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(x) for x in spec.split(',')])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep the tyre load model over parameter grids for one lap.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("event")
+    parser.add_argument("session")
+    parser.add_argument("driver")
+    parser.add_argument("--lap", default="fastest", help="lap number or 'fastest' (default)")
+    for name in SWEEPABLE:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, metavar="GRID",
+                            help="start:stop:num or comma separated values")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_BUDGET / 1024 ** 2,
+                        help="work memory per chunk (default: %(default)s)")
+    parser.add_argument("--out", help="write the long table to this .csv (or .parquet) file")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    grids = {name: parse_grid(getattr(args, name)) for name in SWEEPABLE if getattr(args, name)}
+    if not grids:
+        parser.error("give at least one grid, e.g. --cda 1.4:2.0:25")
+
+    import session_cache
+    from derived_channels import longitudinal_acceleration
+
+    session_cache.enable_cache(args.cache)
+    session = session_cache.get_session(args.year, args.event, args.session)
+    driver_laps = session.laps.pick_drivers(args.driver)
+    lap = driver_laps.pick_fastest() if args.lap == "fastest" else driver_laps.pick_laps(int(args.lap)).iloc[0]
+    telemetry = lap.get_car_data().add_distance()
+    speed = telemetry['Speed'].to_numpy(dtype=np.float64)
+    _, ax_smooth = longitudinal_acceleration(speed, telemetry['Time'].dt.total_seconds().to_numpy())
+
+    result = sweep(speed / 3.6, ax_smooth, grids, memory_budget=args.memory_mb * 1024 ** 2)
+    table = result.to_frame()
+    print(f"{len(table)} combinations x {len(speed)} samples")
+    print(table.describe().T[['min', 'mean', 'max']])
+    if args.out:
+        if args.out.endswith('.parquet'):
+            table.to_parquet(args.out)
+        else:
+            table.to_csv(args.out)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
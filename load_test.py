@@ -0,0 +1,262 @@
+# Concurrent-user load test for the Streamlit app's data path, headless.
+# Streamlit runs every browser session's script on its own thread of one server process, sharing the module level
+# caches (session_cache.REGISTRY, figure_cache.FIGURES, ...). Simulated users here are threads of one process too,
+# each making a run of "Load Fastest Lap" clicks with the same stages, cache keys and plot functions as app.py.
+# Choices follow a skewed mix: a few sessions and front-running drivers get most of the traffic.
+#
+# Runs offline and exits 1 if any click fails. By default sessions come from synthetic_session.py in memory (the
+# checked-in cache/ has no schedule or car data to load a real one from); --replay-fixtures loads them with fastf1
+# from replay_server.py fixtures served in-process (optionally with latency / bandwidth shaping and a cold cache),
+# e.g. the synthetic weekend from "replay_server.py synthesize" or recorded real sessions.
+#
+#   python load_test.py --users 8 --clicks 5
+#   python replay_server.py synthesize && python load_test.py --users 16 --replay-fixtures replay_fixtures --cold
+#   python load_test.py --replay-fixtures replay_fixtures --latency-ms 80 --sessions "2023:Monza:R" --json load.json
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from click_handler import load_fastest_lap
+
+SYNTHETIC_SESSIONS = ["2022:Synthetic:Q", "2022:Synthetic:R"]  # own event name, never mixed with real figures
+ZIPF_S = 1.1           # popularity skew of sessions and drivers
+OPTION_RATES = {       # share of clicks with each app checkbox ticked
+    'separate_charts': 0.3,
+    'compare_field': 0.2,
+    'corner_breakdown': 0.15,
+    'race_pace': 0.2,  # only offered on races and sprints
+}
+
+
+def rss_bytes():
+    """Resident set size of this process (Linux /proc; peak RSS from getrusage elsewhere)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def zipf_choice(rng, items, s=ZIPF_S):
+    """One of items, the first ones much more likely (item i has weight 1 / (i + 1) ** s)."""
+    return rng.choices(items, weights=[1 / (i + 1) ** s for i in range(len(items))])[0]
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def user_clicks(user, sessions, clicks, think_s, seed, loader=None, drivers_for=None):
+    """
+    One simulated analyst. Returns a list of click records (latency, stages, choices, error).
+
+    Args:
+        loader (callable): Session loader for the clicks, default session_cache.get_session.
+        drivers_for (callable): (year, event, session_type) -> [(code, team, colour), ...], default
+            driver_index.get_drivers.
+    """
+    import driver_index
+
+    drivers_for = drivers_for or driver_index.get_drivers
+    rng = random.Random(seed * 1000 + user)
+    records = []
+    for _ in range(clicks):
+        year, gp, session_type = zipf_choice(rng, sessions)
+        options = {name: rng.random() < rate for name, rate in OPTION_RATES.items()}
+        options['race_pace'] &= session_type in ("R", "S")
+        record = {'user': user, 'session': f"{year} {gp} {session_type}", **options}
+        start = time.perf_counter()
+        try:
+            drivers = drivers_for(year, gp, session_type)  # the selectors run before every click
+            driver = zipf_choice(rng, [code for code, _, _ in drivers])
+            record['driver'] = driver
+            timer = load_fastest_lap(year, gp, session_type, driver, log_path=None, loader=loader, **options)
+            record['stages'] = dict(timer.durations)
+            record['error'] = None
+        except Exception as e:  # a broken session counts against the run, it doesn't end it
+            record['stages'] = {}
+            record['error'] = f"{type(e).__name__}: {e}"
+        record['latency_s'] = time.perf_counter() - start
+        records.append(record)
+        if think_s:
+            time.sleep(rng.expovariate(1 / think_s))
+    return records
+
+
+def run(sessions, users, clicks, think_s=0.0, seed=0, registry=None, drivers_for=None):
+    """
+    Run `users` concurrent simulated users of `clicks` clicks each.
+
+    Args:
+        registry (session_cache.SessionRegistry): Where the clicks load sessions from, default session_cache.REGISTRY.
+        drivers_for (callable): Entry list of a session, see user_clicks.
+
+    Returns:
+        dict with the click records and a summary (latency percentiles, throughput, RSS, cache hit rates).
+    """
+    import session_cache
+    from figure_cache import FIGURES
+
+    if registry is None:  # an empty registry is falsy
+        registry = session_cache.REGISTRY
+    rss_start = rss_bytes()
+    rss_peak = [rss_start]
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(0.25):
+            rss_peak[0] = max(rss_peak[0], rss_bytes())
+
+    sampler = threading.Thread(target=sample_rss, name="rss-sampler", daemon=True)
+    sampler.start()
+    results = [None] * users
+
+    def user(i):
+        results[i] = user_clicks(i, sessions, clicks, think_s, seed, registry.get, drivers_for)
+
+    threads = [threading.Thread(target=user, args=(i,), name=f"user-{i}") for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    done.set()
+    sampler.join()
+
+    records = [record for user_records in results for record in user_records]
+    ok = [r for r in records if r['error'] is None]
+    latencies = [r['latency_s'] for r in ok]
+    stages = {}
+    for r in ok:
+        for stage, seconds in r['stages'].items():
+            stages.setdefault(stage, []).append(seconds)
+
+    figure_lookups = FIGURES.hits + FIGURES.disk_hits + FIGURES.misses
+    rss_end = rss_bytes()
+    summary = {
+        'users': users,
+        'clicks': len(records),
+        'errors': len(records) - len(ok),
+        'wall_s': wall,
+        'throughput_per_s': len(ok) / wall if wall else 0.0,
+        'latency_s': {f"p{q}": percentile(latencies, q) for q in (50, 95, 99)},
+        'latency_mean_s': statistics.fmean(latencies) if latencies else float("nan"),
+        'stages_s': {stage: {f"p{q}": percentile(values, q) for q in (50, 95, 99)} | {'n': len(values)}
+                     for stage, values in stages.items()},
+        'rss_mb': {'start': rss_start / 1024 ** 2, 'end': rss_end / 1024 ** 2, 'peak': rss_peak[0] / 1024 ** 2,
+                   'growth': (rss_end - rss_start) / 1024 ** 2},
+        'session_cache': {'hits': registry.hits, 'misses': registry.misses,
+                          'hit_rate': registry.hits / max(registry.hits + registry.misses, 1)},
+        'figure_cache': {'hits': FIGURES.hits, 'disk_hits': FIGURES.disk_hits, 'misses': FIGURES.misses,
+                         'hit_rate': (FIGURES.hits + FIGURES.disk_hits) / max(figure_lookups, 1),
+                         'mb': FIGURES.total_bytes() / 1024 ** 2},
+    }
+    return {'summary': summary, 'records': records}
+
+
+def print_summary(summary):
+    lat = summary['latency_s']
+    print(f"{summary['users']} users, {summary['clicks']} clicks, {summary['errors']} errors in "
+          f"{summary['wall_s']:.1f} s ({summary['throughput_per_s']:.2f} clicks/s)")
+    print(f"latency p50 {lat['p50'] * 1000:.0f} ms  p95 {lat['p95'] * 1000:.0f} ms  p99 {lat['p99'] * 1000:.0f} ms")
+    for stage, q in sorted(summary['stages_s'].items(), key=lambda item: -item[1]['p95']):
+        print(f"  {stage:18s} n={q['n']:4d}  p50 {q['p50'] * 1000:8.1f} ms  p95 {q['p95'] * 1000:8.1f} ms  "
+              f"p99 {q['p99'] * 1000:8.1f} ms")
+    rss = summary['rss_mb']
+    print(f"RSS {rss['start']:.0f} -> {rss['end']:.0f} MB (peak {rss['peak']:.0f}, growth {rss['growth']:+.0f})")
+    sc, fc = summary['session_cache'], summary['figure_cache']
+    print(f"session cache {sc['hits']} hits / {sc['misses']} misses ({sc['hit_rate']:.0%}), "
+          f"figure cache {fc['hits'] + fc['disk_hits']} hits / {fc['misses']} misses ({fc['hit_rate']:.0%}, "
+          f"{fc['mb']:.1f} MB)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app's data path with concurrent simulated users.")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--clicks", type=int, default=5, help="clicks per user")
+    parser.add_argument("--think-s", type=float, default=0.0, help="mean pause between a user's clicks")
+    parser.add_argument("--sessions", nargs="+", default=SYNTHETIC_SESSIONS,
+                        help="year:event:session in order of popularity (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay-fixtures", help="load sessions with fastf1 from these replay_server.py fixtures, "
+                                                  "served in-process (default: synthetic sessions in memory)")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory with --replay-fixtures")
+    parser.add_argument("--cold", action="store_true", help="with --replay-fixtures: start from an empty fastf1 cache")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="replay server latency")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0.0, help="replay server per-connection cap")
+    parser.add_argument("--json", help="write the summary and every click record to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="exit 1 if p95 latency is above this")
+    args = parser.parse_args(argv)
+
+    import cache_manager
+    import session_cache
+
+    sessions = [cache_manager.parse_session(text) for text in args.sessions]
+    if not args.replay_fixtures:
+        import synthetic_session
+        result = run(sessions, args.users, args.clicks, args.think_s, args.seed,
+                     session_cache.SessionRegistry(loader=synthetic_session.load), synthetic_session.entry_list)
+        print_summary(result['summary'])
+    else:
+        import replay_server
+
+        server = replay_server.ReplayServer(("127.0.0.1", 0), args.replay_fixtures, args.latency_ms,
+                                            args.bandwidth_kbps).start()
+        cold = tempfile.TemporaryDirectory(prefix="load_test_cache_") if args.cold else None
+        previous_url = os.environ.get("F1_REPLAY_URL")
+        os.environ["F1_REPLAY_URL"] = server.url  # what session_cache routes fastf1 through, as in the app
+        try:
+            session_cache.enable_cache(cold.name if cold else args.cache)
+            result = run(sessions, args.users, args.clicks, args.think_s, args.seed)
+        finally:
+            server.shutdown()
+            server.server_close()
+            if previous_url is None:
+                os.environ.pop("F1_REPLAY_URL", None)
+            else:
+                os.environ["F1_REPLAY_URL"] = previous_url
+            if cold is not None:
+                cold.cleanup()
+        print_summary(result['summary'])
+        stats = server.stats
+        print(f"replay server {stats['hits']} responses, {stats['bytes'] / 1024 ** 2:.1f} MB, "
+              f"{stats['misses']} misses")
+
+    errors = {}
+    for record in result['records']:
+        if record['error']:
+            errors[record['error']] = errors.get(record['error'], 0) + 1
+    for error, count in sorted(errors.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {count:4d}x {error}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+    status = 0
+    if result['summary']['errors']:
+        print(f"FAIL {result['summary']['errors']} of {result['summary']['clicks']} clicks failed")
+        status = 1
+    if args.max_p95_ms is not None and not result['summary']['latency_s']['p95'] * 1000 <= args.max_p95_ms:
+        print(f"FAIL p95 above {args.max_p95_ms:.0f} ms")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# The six-panel matplotlib dashboard from function.py: track map on top, then speed, acceleration,
+# throttle / brake, gear and DRS over distance. DashboardTemplate keeps one figure alive and only redraws
+# the data, so rendering a whole grid (batch_report.py) doesn't pay for figure and axes creation every time.
+from matplotlib import pyplot as plt
+
+import Trackplot
+from derived_channels import derived_channels
+
+
+def plot_speed(ax, telemetry_driver):
+    channels = derived_channels(telemetry_driver)
+    ax.plot(channels.distance, channels.speed, linewidth=2, color='cyan')
+    ax.set(xlabel="Distance (m)", ylabel="Speed (km/h)")
+
+
+def plot_longitudinal_acceleration(ax, telemetry_driver):
+    channels = derived_channels(telemetry_driver)  # raw dv/dt and its 3-point moving average
+
+    ax.plot(channels.distance, channels.accel_raw, linewidth=1, label='Raw', color='orange')
+    ax.plot(channels.distance, channels.accel_smooth, linewidth=2, label='Filtered', color='lime')
+    ax.set(xlabel="Distance (m)", ylabel="Long Acceleration (m/s²)")
+    ax.legend()
+
+
+def plot_throttle_brake(ax, telemetry_driver):
+    channels = derived_channels(telemetry_driver)
+    ax.plot(channels.distance, channels.throttle, label='Throttle', color='green')
+    ax.plot(channels.distance, channels.brake_pct, label='Brake', color='red')
+    ax.set(xlabel="Distance (m)", ylabel="Throttle / Brake (%)")
+    ax.legend()
+
+
+def plot_gear(ax, telemetry_driver):
+    channels = derived_channels(telemetry_driver)
+    ax.plot(channels.distance, channels.gear, label='Gear', color='magenta')
+    ax.set(xlabel="Distance (m)", ylabel="Gear")
+    ax.legend()
+
+
+def plot_drs(ax, telemetry_driver):
+    channels = derived_channels(telemetry_driver)
+    ax.plot(channels.distance, channels.drs_open, label='DRS', color='pink')
+    ax.set(xlabel="Distance (m)", ylabel="DRS")
+
+    # Lock the ticks in place
+    ax.set_ylim(-0.2, 1.2)  # This gives breathing room around 0 and 1
+    ax.set_yticks([0, 1])
+    ax.set_yticklabels(['OFF', 'ON'])
+    ax.legend()
+
+
+CHANNEL_PLOTS = [plot_speed, plot_longitudinal_acceleration, plot_throttle_brake, plot_gear, plot_drs]
+
+
+class DashboardTemplate:
+    """
+    One reusable dashboard figure. The track map only depends on the circuit, so it is drawn once per
+    session; the channel axes are cleared and redrawn for every driver.
+    """
+
+    def __init__(self, figsize=(14, 24)):
+        plt.style.use('dark_background')
+        self.fig, self.axes = plt.subplots(6, 1, figsize=figsize)
+        self.fig.subplots_adjust(hspace=0.5)  # More vertical space between plots
+        self._track_session = None
+
+    def render(self, session, telemetry_driver, driver=None):
+        """Draw one driver's lap into the template and return the figure."""
+        track_ax = self.axes[0]
+        if self._track_session is not session:
+            track_ax.cla()
+            Trackplot.plot_track_map(track_ax, session=session, driver=driver)
+            self._track_session = session
+        location = session.event['Location']
+        track_ax.set_title(f"{location} - {driver}" if driver else location, fontsize=12, color='white', pad=10)
+
+        for ax, plot in zip(self.axes[1:], CHANNEL_PLOTS):
+            ax.cla()
+            plot(ax, telemetry_driver)
+        return self.fig
+
+    def save(self, path, **kwargs):
+        self.fig.savefig(path, facecolor=self.fig.get_facecolor(), **kwargs)
+
+    def close(self):
+        plt.close(self.fig)
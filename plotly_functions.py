@@ -1,20 +1,20 @@
-import fastf1 
-from fastf1 import plotting
-import numpy as np
-from matplotlib import pyplot as plt
-import Track_plot
+# fastf1.plotting and plotly.express are only needed by plot_laptimes, so they are imported there on first use.
+# matplotlib never was needed here; keeping it out saves the app a few hundred ms of cold start.
 import plotly.graph_objects as go
-import plotly.express as px
-import plotly.io as pio
+from plotly.subplots import make_subplots
 import streamlit as st
+import downsample
+from derived_channels import derived_channels
+from downsample import DEFAULT_POINT_BUDGET
 
 
-def plot_speed_plotly(telemetry_driver): # this a a plotly functions that retrieves the drivers speed from Fast f1 and plots it 
+def plot_speed_plotly(telemetry_driver, point_budget=DEFAULT_POINT_BUDGET, show=True): # this a a plotly functions that retrieves the drivers speed from Fast f1 and plots it 
+    channels = derived_channels(telemetry_driver)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=telemetry_driver['Distance'],
-        y=telemetry_driver['Speed'],
-        mode='lines',
+    fig.add_trace(downsample.line_trace(
+        channels.distance,
+        channels.speed,
+        budget=point_budget,
         name='Speed',
         line=dict(color='cyan')
     ))
@@ -25,27 +25,27 @@ def plot_speed_plotly(telemetry_driver): # this a a plotly functions that retrie
         yaxis_title="Speed (km/h)",
         height=400
     )
-    st.plotly_chart(fig, use_container_width=True)
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_longitudinal_acceleration_plotly(telemetry_driver):
-    v = telemetry_driver['Speed'] / 3.6  # convertinng the speed into m/s 
-    time_float = telemetry_driver['Time'] / np.timedelta64(1, 's')  #  getting our time and ensurinf its in seconds
-    ax_raw = np.gradient(v) / np.gradient(time_float) # since accceleratition is Dv/Dx, change in volocity over time. we take that derivative
-    ax_smooth = np.convolve(ax_raw, np.ones((3,)) / 3, mode='same') # this smooths that acceleration using a 3-point moving average to reduce noise.
+def plot_longitudinal_acceleration_plotly(telemetry_driver, point_budget=DEFAULT_POINT_BUDGET, show=True):
+    # acceleration is dv/dt, smoothed with a 3-point moving average to reduce noise (see derived_channels)
+    channels = derived_channels(telemetry_driver)
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=telemetry_driver['Distance'],
-        y=ax_raw,
-        mode='lines',
+    fig.add_trace(downsample.line_trace(
+        channels.distance,
+        channels.accel_raw,
+        budget=point_budget,
         name='Raw',
         line=dict(color='orange')
     ))
-    fig.add_trace(go.Scatter(
-        x=telemetry_driver['Distance'],
-        y=ax_smooth,
-        mode='lines',
+    fig.add_trace(downsample.line_trace(
+        channels.distance,
+        channels.accel_smooth,
+        budget=point_budget,
         name='Filtered',
         line=dict(color='lime')
     ))
@@ -56,25 +56,28 @@ def plot_longitudinal_acceleration_plotly(telemetry_driver):
         yaxis_title="Long Acceleration (m/s²)",
         height=400
     )
-    st.plotly_chart(fig, use_container_width=True)
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_throttle_brake_plotly(telemetry_driver): # throttle vs Braje plot
-    telemetry_driver['Brake'] = telemetry_driver['Brake'].astype(int) * 100 # since in Fastf1 brake is binarry on/off rather than in percentages like the throttle
-    # i simply multiply it by 100 to have a work around 
+def plot_throttle_brake_plotly(telemetry_driver, point_budget=DEFAULT_POINT_BUDGET, show=True): # throttle vs Braje plot
+    channels = derived_channels(telemetry_driver) # in Fastf1 brake is binarry on/off rather than in percentages like the throttle,
+    # so brake_pct is 0 or 100. It is a new array, the telemetry frame itself is never changed.
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=telemetry_driver['Distance'],
-        y=telemetry_driver['Throttle'],
-        mode='lines',
+    fig.add_trace(downsample.line_trace(
+        channels.distance,
+        channels.throttle,
+        budget=point_budget,
         name='Throttle',
         line=dict(color='green')
     ))
-    fig.add_trace(go.Scatter(
-        x=telemetry_driver['Distance'],
-        y=telemetry_driver['Brake'],
-        mode='lines',
+    fig.add_trace(downsample.line_trace(
+        channels.distance,
+        channels.brake_pct,
+        budget=point_budget,
+        method='minmax', # on/off and step channels keep their edges with min/max buckets
         name='Brake',
         line=dict(color='red')
     ))
@@ -85,15 +88,19 @@ def plot_throttle_brake_plotly(telemetry_driver): # throttle vs Braje plot
         yaxis_title="Throttle / Brake (%)",
         height=400
     )
-    st.plotly_chart(fig, use_container_width=True) # this make the plot automatically fill the page width.
+    if show:
+        st.plotly_chart(fig, use_container_width=True) # this make the plot automatically fill the page width.
+    return fig
 
 
-def plot_gear_plotly(telemetry_driver): # This displays what  gear they were  along the lap.
+def plot_gear_plotly(telemetry_driver, point_budget=DEFAULT_POINT_BUDGET, show=True): # This displays what  gear they were  along the lap.
+    channels = derived_channels(telemetry_driver)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=telemetry_driver['Distance'], # x is the distance 
-        y=telemetry_driver['nGear'], # the y axis is the gear 
-        mode='lines',
+    fig.add_trace(downsample.line_trace(
+        channels.distance, # x is the distance 
+        channels.gear, # the y axis is the gear 
+        budget=point_budget,
+        method='minmax',
         name='Gear',
         line=dict(color='magenta')
     ))
@@ -104,17 +111,20 @@ def plot_gear_plotly(telemetry_driver): # This displays what  gear they were  al
         yaxis_title="Gear",
         height=400
     )
-    st.plotly_chart(fig, use_container_width=True) # Graph Properties
+    if show:
+        st.plotly_chart(fig, use_container_width=True) # Graph Properties
+    return fig
 
 
-def plot_drs_plotly(telemetry_driver):
-    telemetry_driver['DRS'] = telemetry_driver['DRS'].fillna(0).apply(lambda x: 1 if x >= 10 else 0) # This line replaces with zero, because FastF1 records Drs from 0 - 12.
-    # then converts the column so any value ≥ 10 is marked as 1 (DRS active) and everything else as 0 (DRS off).
+def plot_drs_plotly(telemetry_driver, point_budget=DEFAULT_POINT_BUDGET, show=True):
+    channels = derived_channels(telemetry_driver) # FastF1 records Drs from 0 - 12, drs_open is 1 for any value ≥ 10 (DRS active)
+    # and 0 for everything else (DRS off), missing values count as off.
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=telemetry_driver['Distance'],
-        y=telemetry_driver['DRS'],
-        mode='lines',
+    fig.add_trace(downsample.line_trace(
+        channels.distance,
+        channels.drs_open,
+        budget=point_budget,
+        method='minmax',
         name='DRS',
         line=dict(color='pink')
     ))
@@ -131,12 +141,13 @@ def plot_drs_plotly(telemetry_driver):
         ),
         height=300
     )
-    st.plotly_chart(fig, use_container_width=True)
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
     
-def plot_laptimes(session, driver_code):
-    import plotly.graph_objects as go
-
-    fig = go.Figure()
+def plot_laptimes(session, driver_code, show=True):
+    import fastf1.plotting
+    import plotly.express as px
 
     # Get tire compound colors
     compound_colors = fastf1.plotting.get_compound_mapping(session=session)
@@ -152,7 +163,7 @@ def plot_laptimes(session, driver_code):
     x="LapNumber",
     y="LapTimeSeconds",
     color="Compound",
-    color_discrete_map=fastf1.plotting.get_compound_mapping(session=session),
+    color_discrete_map=compound_colors,
     size=[8]*len(driver_laps),  # marker size
     title=f"{driver_code} Lap Times"
 )
@@ -162,9 +173,199 @@ def plot_laptimes(session, driver_code):
     autorange=True,
     tickformat="%M:%S.%L"  # format axis ticks as mm:ss.sss
     )
-    st.plotly_chart(fig, use_container_width=True)
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
 
 
     return fig
 
 
+def plot_lap_delta_plotly(lap_delta, highlight=None, point_budget=DEFAULT_POINT_BUDGET, show=True): # one line per lap from lap_delta.compute_deltas, against its reference lap
+    fig = go.Figure()
+    for label, row in zip(lap_delta.labels, lap_delta.delta):
+        fig.add_trace(downsample.line_trace(
+            lap_delta.distance,
+            row,
+            budget=point_budget,
+            name=label,
+            line=dict(width=3 if label == highlight else 1)
+        ))
+    fig.add_hline(y=0, line=dict(color='white', width=1, dash='dash')) # the reference lap sits on zero
+    fig.update_layout( # Graph Properties
+        template="plotly_dark",
+        title=f"Lap Delta vs {lap_delta.reference}",
+        xaxis_title="Distance (m)",
+        yaxis_title="Delta (s)",
+        hovermode="x unified",
+        height=500
+    )
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def plot_telemetry_dashboard_plotly(telemetry_driver, point_budget=DEFAULT_POINT_BUDGET, show=True):
+    # One stacked figure for speed, acceleration, throttle/brake, gear and DRS instead of five separate charts,
+    # same make_subplots(shared_xaxes=True) idea as web_telemetry.py. Every channel is put onto one evenly
+    # spaced distance grid, so the x axis goes to the browser as x0/dx once instead of a Distance array per trace,
+    # the template is sent once, and zooming one channel zooms them all. The grid holds each bucket's min / max
+    # samples rather than interpolated values, so spikes and minima survive on long ranges.
+    channels = derived_channels(telemetry_driver)
+    distance = channels.distance
+    x0, dx, n = downsample.uniform_grid(distance, point_budget)
+
+    def on_grid(y):
+        return downsample.resample_extrema(distance, y, x0, dx, n)
+
+    traces = [ # (row, y values, name, colour)
+        (1, on_grid(channels.speed), 'Speed', 'cyan'),
+        (2, on_grid(channels.accel_raw), 'Raw', 'orange'),
+        (2, on_grid(channels.accel_smooth), 'Filtered', 'lime'),
+        (3, on_grid(channels.throttle), 'Throttle', 'green'),
+        (3, on_grid(channels.brake_pct), 'Brake', 'red'),
+        (4, on_grid(channels.gear), 'Gear', 'magenta'),
+        (5, on_grid(channels.drs_open), 'DRS', 'pink'),
+    ]
+
+    fig = make_subplots(
+        rows=5, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[0.25, 0.2, 0.2, 0.2, 0.15],
+        subplot_titles=("Speed (km/h)", "Long Acceleration (m/s²)", "Throttle / Brake (%)", "Gear", "DRS")
+    )
+    for row, y, name, color in traces:
+        fig.add_trace(downsample.grid_trace(y, x0, dx, name=name, line=dict(color=color)), row=row, col=1)
+
+    fig.update_yaxes(tickmode='array', tickvals=[0, 1], ticktext=['OFF', 'ON'], range=[-0.2, 1.2], row=5, col=1)
+    fig.update_layout( # Graph Properties
+        template="plotly_dark",
+        title="Telemetry vs Distance",
+        xaxis5_title="Distance (m)", # x-axis label on the bottom subplot only
+        hovermode="x unified",
+        height=1400
+    )
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def plot_corner_speeds_plotly(corner_table, highlight=None, show=True):
+    # minimum speed through every corner, one line per driver (corner_analysis.fastest_lap_corners), the field's best
+    # at each corner dashed so you can see where the selected driver loses or gains
+    corners = list(dict.fromkeys(corner_table['Corner']))
+    fig = go.Figure()
+    for driver, rows in corner_table.groupby('Driver', sort=False):
+        fig.add_trace(go.Scatter(
+            x=rows['Corner'],
+            y=rows['MinSpeed'],
+            mode='lines+markers',
+            name=driver,
+            line=dict(width=3 if driver == highlight else 1),
+            opacity=1.0 if highlight is None or driver == highlight else 0.35
+        ))
+    best = corner_table.groupby('Corner', sort=False)['MinSpeed'].max().reindex(corners)
+    fig.add_trace(go.Scatter(x=corners, y=best, mode='lines', name='Field best',
+                             line=dict(color='white', width=1, dash='dash')))
+    fig.update_layout( # Graph Properties
+        template="plotly_dark",
+        title="Minimum Speed per Corner (fastest laps)",
+        xaxis=dict(title="Corner", type='category', categoryorder='array', categoryarray=corners),
+        yaxis_title="Minimum Speed (km/h)",
+        hovermode="x unified",
+        height=500
+    )
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def plot_stint_degradation_plotly(analysis, session=None, highlight=None, show=True):
+    # every driver's race pace in one view (stint_analysis.stint_analysis): clean laps as markers (fuel corrected
+    # for races and sprints only, see analysis.fuel_corrected)
+    # and each stint's fitted degradation line, coloured by compound
+    compound_colors = {}
+    if session is not None:
+        import fastf1.plotting
+        compound_colors = fastf1.plotting.get_compound_mapping(session=session)
+
+    laps = analysis.laps[analysis.laps['Clean']]
+    fig = go.Figure()
+    for driver, rows in laps.groupby('Driver', sort=False):
+        dim = highlight is not None and driver != highlight
+        fig.add_trace(go.Scatter(
+            x=rows['LapNumber'],
+            y=rows['FuelCorrected'],
+            mode='markers',
+            name=driver,
+            legendgroup=driver,
+            marker=dict(size=7 if driver == highlight else 4,
+                        color=[compound_colors.get(c, 'grey') for c in rows['Compound']]),
+            opacity=0.25 if dim else 1.0,
+            text=rows['Compound'] + ", tyre age " + rows['TyreLife'].astype(int).astype(str)
+        ))
+
+    # fitted lines, all stints in one trace per compound (segments separated by None)
+    stints = analysis.stints.dropna(subset=['Degradation'])
+    for compound, rows in stints.groupby('Compound', sort=False):
+        x, y = [], []
+        for row in rows.itertuples():
+            # fitted against tyre age, drawn over the stint's laps
+            x += [row.StartLap, row.EndLap, None]
+            y += [row.Intercept + row.Degradation * row.StartAge, row.Intercept + row.Degradation * row.EndAge, None]
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=f"{compound} fit",
+                                 line=dict(color=compound_colors.get(compound, 'grey'), width=2)))
+
+    fig.update_layout( # Graph Properties
+        template="plotly_dark",
+        title=("Fuel-corrected Race Pace" if analysis.fuel_corrected else "Pace") + " and Tyre Degradation",
+        xaxis_title="Lap",
+        yaxis_title=("Fuel-corrected " if analysis.fuel_corrected else "") + "Lap Time (s)",
+        height=600
+    )
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def plot_weekend_speed_plotly(traces, driver, point_budget=DEFAULT_POINT_BUDGET, show=True):
+    # the driver's fastest lap of every session of the weekend on one distance axis (weekend_loader.speed_traces)
+    fig = go.Figure()
+    for session_type, (distance, speed) in traces.items():
+        fig.add_trace(downsample.line_trace(distance, speed, budget=point_budget, name=session_type))
+    fig.update_layout( # Graph Properties
+        template="plotly_dark",
+        title=f"{driver} Fastest Lap Speed per Session",
+        xaxis_title="Distance (m)",
+        yaxis_title="Speed (km/h)",
+        hovermode="x unified",
+        height=500
+    )
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def plot_weekend_long_runs_plotly(long_runs, driver, show=True):
+    # mean clean lap time of every long run of the weekend (weekend_loader.long_runs), one bar per stint,
+    # degradation in the hover text
+    labels = long_runs['Session'] + " stint " + long_runs['Stint'].astype(str)
+    fig = go.Figure(go.Bar(
+        x=labels,
+        y=long_runs['MeanLapTime'],
+        text=long_runs['Compound'],
+        hovertext=[f"{laps} laps, {deg:+.3f} s/lap" for laps, deg in zip(long_runs['Laps'], long_runs['Degradation'])],
+        marker_color='cyan'
+    ))
+    low = long_runs['MeanLapTime'].min()
+    fig.update_layout( # Graph Properties
+        template="plotly_dark",
+        title=f"{driver} Long-run Pace across the Weekend",
+        xaxis_title="Run",
+        yaxis_title="Mean Lap Time (s)",
+        yaxis_range=[low - 1, long_runs['MeanLapTime'].max() + 0.5] if len(long_runs) else None,
+        height=450
+    )
+    if show:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
@@ -0,0 +1,317 @@
+# Hermetic local stand-in for the F1 live timing, schedule and Ergast endpoints.
+# Serves recorded responses from a fixture directory with configurable latency and bandwidth, so cold loads can be
+# measured reproducibly and without internet. Point fastf1 at it with F1_REPLAY_URL (session_cache does the rest) or
+# use_replay(url) after enabling the cache.
+#
+# Measuring cold loads: record the raw responses once (serve --record, with network), or generate those of a made-up
+# weekend (synthesize, no network needed, see synthetic_fixtures.py), then replay them into a fresh, empty fastf1
+# cache. fastf1 then downloads and parses every response exactly as it would from the real APIs, which is the load
+# users wait for. This recorded-response mode is the default.
+# F1_REPLAY_HYDRATE=1 instead copies finished .ff1pkl files into the cache before each load (hydrate). That skips
+# fastf1's parsing and only measures a warm-cache load over the network, so it is opt-in, for when only pickles are
+# at hand.
+#
+# Fixture layout:
+#   replay_fixtures/<host>/<path>[@<query hash>]           raw responses, e.g. livetiming.formula1.com/static/...
+#   replay_fixtures/<host>/<path>[@<query hash>].type      their Content-Type, if known
+#   replay_fixtures/_ff1cache/<year>/<event>/<session>/    fastf1 .ff1pkl files, only used with F1_REPLAY_HYDRATE=1
+#
+#   python replay_server.py serve --record                  # fetch and keep what's missing (needs network)
+#   python replay_server.py serve --latency-ms 80 --bandwidth-kbps 4000
+#   F1_REPLAY_URL=http://127.0.0.1:8765 streamlit run app.py
+#   python replay_server.py synthesize                      # the synthetic weekend: get_session(2022, "Synthetic", ..)
+#   python replay_server.py seed                            # fixtures from ./cache (pickles + recorded HTTP responses)
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlsplit
+
+FIXTURE_DIR = "replay_fixtures"
+PICKLE_ROOT = "_ff1cache"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CHUNK_BYTES = 16 * 1024  # bandwidth shaping granularity
+
+
+def fixture_path(fixture_dir, host, path, query=""):
+    """File of one recorded response. Queries (Ergast pagination) get a short hash suffix."""
+    relative = os.path.normpath(os.path.join(host, unquote(path).lstrip("/")))
+    if relative.startswith("..") or os.path.isabs(relative):
+        raise ValueError(f"path escapes the fixture directory: {path}")
+    if query:
+        relative += "@" + hashlib.sha1(query.encode()).hexdigest()[:12]
+    return os.path.join(fixture_dir, relative)
+
+
+def save_fixture(fixture_dir, url, body, content_type=None):
+    """Record one response under fixture_dir. Returns its path."""
+    parts = urlsplit(url)
+    path = fixture_path(fixture_dir, parts.netloc, parts.path, parts.query)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+    if content_type:
+        with open(path + ".type", "w", encoding="utf-8") as f:
+            f.write(content_type)
+    return path
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """GET /<host>/<path>?<query> -> the recorded response; GET of a directory -> JSON list of its files."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        try:
+            local = fixture_path(server.fixture_dir, host, path, parts.query)
+        except ValueError:
+            return self._send(400, b"bad path", "text/plain")
+
+        if os.path.isdir(local):
+            names = sorted(n for n in os.listdir(local) if os.path.isfile(os.path.join(local, n)))
+            return self._send(200, json.dumps(names).encode(), "application/json")
+        if not os.path.isfile(local) and server.record:
+            self._record(host, path, parts.query)
+        if not os.path.isfile(local):
+            server.count("misses", self.path)
+            return self._send(404, b"not in fixtures", "text/plain")
+
+        with open(local, "rb") as f:
+            body = f.read()
+        content_type = None
+        if os.path.exists(local + ".type"):
+            with open(local + ".type", encoding="utf-8") as f:
+                content_type = f.read().strip()
+        server.count("hits")
+        self._send(200, body, content_type or mimetypes.guess_type(path)[0] or "application/octet-stream")
+
+    def _record(self, host, path, query):
+        url = f"https://{host}/{path}" + (f"?{query}" if query else "")
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers={"User-Agent": "replay-recorder"}),
+                                        timeout=60) as response:
+                save_fixture(self.server.fixture_dir, url, response.read(), response.headers.get("Content-Type"))
+            self.server.count("recorded")
+        except (urllib.error.URLError, OSError) as e:
+            self.log_message("record failed for %s: %s", url, e)
+
+    def _send(self, status, body, content_type):
+        server = self.server
+        time.sleep(server.latency_s)  # time to first byte
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        start = time.perf_counter()
+        for sent in range(0, len(body), CHUNK_BYTES):
+            chunk = body[sent:sent + CHUNK_BYTES]
+            self.wfile.write(chunk)
+            if server.bandwidth:  # bytes per second, per connection
+                delay = start + (sent + len(chunk)) / server.bandwidth - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        server.count("bytes", amount=len(body))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Threaded fixture server.
+
+    Args:
+        fixture_dir (str): Root of the recorded responses.
+        latency_ms (float): Delay before every response.
+        bandwidth_kbps (float): Per-connection throughput cap in kilobytes per second, 0 for none.
+        record (bool): Fetch responses missing from the fixtures from the real host and keep them.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), fixture_dir=FIXTURE_DIR, latency_ms=0.0,
+                 bandwidth_kbps=0.0, record=False, verbose=False):
+        super().__init__(address, ReplayHandler)
+        self.fixture_dir = fixture_dir
+        self.latency_s = latency_ms / 1000
+        self.bandwidth = bandwidth_kbps * 1024
+        self.record = record
+        self.verbose = verbose
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0, "bytes": 0}
+        self.missing = []  # request paths not in the fixtures, to know what to record next
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, stat, path=None, amount=1):
+        with self._stats_lock:
+            self.stats[stat] += amount
+            if path is not None:
+                self.missing.append(path)
+
+    def start(self):
+        """Serve on a daemon thread (for tests and load runs in the same process). Returns self."""
+        threading.Thread(target=self.serve_forever, name="replay-server", daemon=True).start()
+        return self
+
+
+def seed(cache_dir="cache", fixture_dir=FIXTURE_DIR):
+    """
+    Build fixtures from a fastf1 cache directory: every session's .ff1pkl files, plus every response recorded in
+    fastf1's HTTP cache (schedule, Ergast, timing index) when there is one.
+
+    Returns:
+        (sessions copied, responses exported)
+    """
+    import cache_manager
+
+    sessions = cache_manager.scan(cache_dir)
+    for path in sessions['Path']:
+        target = os.path.join(fixture_dir, PICKLE_ROOT, os.path.relpath(path, cache_dir))
+        os.makedirs(target, exist_ok=True)
+        for entry in os.scandir(path):
+            if entry.name.endswith(cache_manager.PICKLE_SUFFIX):
+                shutil.copy2(entry.path, target)
+
+    exported = 0
+    http_cache = os.path.join(cache_dir, "fastf1_http_cache.sqlite")
+    if os.path.exists(http_cache):
+        from requests_cache import SQLiteCache
+
+        for response in SQLiteCache(http_cache).responses.values():
+            if response.status_code == 200:
+                save_fixture(fixture_dir, response.url, response.content, response.headers.get("Content-Type"))
+                exported += 1
+    return len(sessions), exported
+
+
+# --- client side ---
+
+def use_replay(url):
+    """
+    Route every fastf1 HTTP request (timing API, schedule, Ergast) to the replay server at `url`.
+    Call after fastf1.Cache.enable_cache, which creates the cached requests session.
+    """
+    import requests
+    from fastf1 import Cache
+
+    class ReplayAdapter(requests.adapters.HTTPAdapter):
+        def send(self, request, **kwargs):
+            if not request.url.startswith(url):
+                parts = urlsplit(request.url)
+                request.url = f"{url}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+            return super().send(request, **kwargs)
+
+    adapter = ReplayAdapter()
+    for session in (Cache._requests_session, Cache._requests_session_cached):
+        if session is None:
+            continue
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session._RATE_LIMITS = {}  # the public APIs' limits don't apply to a local server
+
+
+def hydrate(session, url, cache_dir=None):
+    """
+    Copy a session's .ff1pkl fixtures from the replay server into the local fastf1 cache before session.load().
+    Opt-in (F1_REPLAY_HYDRATE=1): the load that follows reads pickles instead of parsing API responses, so it is
+    not a cold load. Files already in the cache are skipped.
+
+    Returns:
+        bytes downloaded (0 if the server has no pickles for this session).
+    """
+    import cache_manager
+
+    remote = f"{url}/{PICKLE_ROOT}/{session.api_path[len('/static/'):].strip('/')}"
+    try:
+        with urllib.request.urlopen(remote + "/", timeout=60) as response:
+            names = json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return 0
+        raise
+
+    local = cache_manager.session_dir(session, cache_dir)
+    os.makedirs(local, exist_ok=True)
+    downloaded = 0
+    for name in names:
+        target = os.path.join(local, name)
+        if os.path.exists(target):
+            continue
+        with urllib.request.urlopen(f"{remote}/{quote(name)}", timeout=300) as response:
+            body = response.read()
+        with open(target + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(target + ".tmp", target)
+        downloaded += len(body)
+    return downloaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local replay server standing in for the F1 timing APIs.")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="fixture directory (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("seed", help="build fixtures from a fastf1 cache directory")
+    p.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+
+    p = commands.add_parser("synthesize", help="generate the live timing responses of the synthetic weekend")
+    p.add_argument("--year", type=int, default=2022)
+    p.add_argument("--event", default="Synthetic", help="event name (default: %(default)s)")
+    p.add_argument("--sessions", nargs="+", help="session types, e.g. Q R (default: the whole weekend)")
+
+    p = commands.add_parser("serve", help="serve the fixtures")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--latency-ms", type=float, default=0.0, help="delay before every response")
+    p.add_argument("--bandwidth-kbps", type=float, default=0.0, help="per-connection cap in KB/s (0: none)")
+    p.add_argument("--record", action="store_true", help="fetch and keep responses missing from the fixtures")
+    p.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        sessions, responses = seed(args.cache, args.fixtures)
+        print(f"{sessions} sessions and {responses} HTTP responses from {args.cache} into {args.fixtures}")
+        return
+    if args.command == "synthesize":
+        import synthetic_fixtures
+
+        responses = synthetic_fixtures.write_fixtures(args.fixtures, args.year, args.event, args.sessions)
+        print(f"{responses} responses of the {args.year} {args.event} weekend into {args.fixtures}")
+        return
+
+    server = ReplayServer((args.host, args.port), args.fixtures, args.latency_ms, args.bandwidth_kbps,
+                          args.record, args.verbose)
+    print(f"replaying {args.fixtures} on {server.url} (latency {args.latency_ms:.0f} ms, "
+          f"bandwidth {args.bandwidth_kbps or 'unlimited'} KB/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"served {server.stats['hits']} responses ({server.stats['bytes'] / 1024 ** 2:.1f} MB), "
+              f"{server.stats['misses']} misses, {server.stats['recorded']} recorded")
+        for path in dict.fromkeys(server.missing):
+            print(f"  missing {path}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# Offline event schedule index for the year / GP / session selectors.
+# The schedule is fetched from fastf1 (which reads it from its own cache) once per season, persisted to SQLite and
+# then held in memory for the life of the server process, so Streamlit reruns never touch fastf1 for it.
+import argparse
+import json
+import sqlite3
+import threading
+
+FIRST_YEAR = 2019
+SCHEDULE_INDEX_FILE = "schedule_index.sqlite"
+
+# fastf1 session names -> the identifiers we pass to fastf1.get_session
+SESSION_IDENTIFIERS = {
+    'Practice 1': 'FP1',
+    'Practice 2': 'FP2',
+    'Practice 3': 'FP3',
+    'Qualifying': 'Q',
+    'Sprint Qualifying': 'SQ',
+    'Sprint Shootout': 'SS',
+    'Sprint': 'S',
+    'Race': 'R',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    year        INTEGER NOT NULL,
+    round       INTEGER NOT NULL,
+    event_name  TEXT    NOT NULL,
+    location    TEXT    NOT NULL,
+    event_date  TEXT    NOT NULL,
+    sessions    TEXT    NOT NULL,  -- JSON list of session identifiers, in weekend order
+    PRIMARY KEY (year, round)
+);
+"""
+
+_lock = threading.Lock()
+_schedules = {}  # year -> [event dict, ...], the memory resident copy every rerun reads from
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _read_year(year, path):
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT round, event_name, location, event_date, sessions FROM events WHERE year = ? ORDER BY round",
+            (int(year),),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        {"round": r, "event_name": name, "location": loc, "date": date, "sessions": json.loads(sessions)}
+        for r, name, loc, date, sessions in rows
+    ]
+
+
+def fetch_schedule(year):
+    """Read one season's schedule from fastf1 and turn it into plain event dicts."""
+    import session_cache
+
+    fastf1 = session_cache.enable_cache()  # only needed when (re)building, never on the normal read path
+
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    events = []
+    for _, event in schedule.iterrows():
+        sessions = []
+        for i in range(1, 6):
+            name = event.get(f"Session{i}")
+            identifier = SESSION_IDENTIFIERS.get(name)
+            if identifier:
+                sessions.append(identifier)
+        events.append({
+            "round": int(event['RoundNumber']),
+            "event_name": event['EventName'],
+            "location": event['Location'],
+            "date": str(event['EventDate'].date()),
+            "sessions": sessions,
+        })
+    return events
+
+
+def build(year, path=SCHEDULE_INDEX_FILE):
+    """Fetch one season from fastf1 and replace it in the persisted index."""
+    events = fetch_schedule(year)
+    conn = _connect(path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM events WHERE year = ?", (int(year),))
+            conn.executemany(
+                "INSERT INTO events (year, round, event_name, location, event_date, sessions) VALUES (?, ?, ?, ?, ?, ?)",
+                [(int(year), e["round"], e["event_name"], e["location"], e["date"], json.dumps(e["sessions"]))
+                 for e in events],
+            )
+    finally:
+        conn.close()
+    with _lock:
+        _schedules[int(year)] = events
+    return events
+
+
+def get_schedule(year, path=SCHEDULE_INDEX_FILE):
+    """Events of a season: memory first, then the persisted index, and fastf1 only if neither has it."""
+    year = int(year)
+    events = _schedules.get(year)
+    if events is not None:
+        return events
+    with _lock:
+        if year not in _schedules:
+            events = _read_year(year, path)
+            if events:
+                _schedules[year] = events
+    if year in _schedules:
+        return _schedules[year]
+    return build(year, path)
+
+
+def event_names(year, path=SCHEDULE_INDEX_FILE):
+    """GP names for the Grand Prix selectbox, in calendar order."""
+    return [e["event_name"] for e in get_schedule(year, path)]
+
+
+def event_sessions(year, event_name, path=SCHEDULE_INDEX_FILE):
+    """Session identifiers held at one event (e.g. sprint weekends have no FP2/FP3)."""
+    for e in get_schedule(year, path):
+        if e["event_name"] == event_name:
+            return e["sessions"]
+    return []
+
+
+def invalidate(year=None, path=SCHEDULE_INDEX_FILE):
+    """Forget a season (or every season) both in memory and on disk; it is rebuilt on next access."""
+    conn = _connect(path)
+    try:
+        with conn:
+            if year is None:
+                conn.execute("DELETE FROM events")
+            else:
+                conn.execute("DELETE FROM events WHERE year = ?", (int(year),))
+    finally:
+        conn.close()
+    with _lock:
+        if year is None:
+            _schedules.clear()
+        else:
+            _schedules.pop(int(year), None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or invalidate the offline event schedule index.")
+    parser.add_argument("action", choices=["build", "invalidate"])
+    parser.add_argument("years", nargs="*", type=int, help=f"seasons (default: {FIRST_YEAR} to this year)")
+    parser.add_argument("--db", default=SCHEDULE_INDEX_FILE, help="index file (default: %(default)s)")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.action == "invalidate":
+        if not args.years:
+            invalidate(path=args.db)
+        for year in args.years:
+            invalidate(year, args.db)
+        return
+
+    import datetime
+    import session_cache
+
+    session_cache.enable_cache(args.cache)
+    years = args.years or range(FIRST_YEAR, datetime.date.today().year + 1)
+    for year in years:
+        events = build(year, args.db)
+        print(f"{year}: {len(events)} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# Shared, in-process registry of loaded FastF1 sessions.
+# Streamlit re-runs app.py on every click but imported modules stay alive, so a module level
+# registry is shared by every user session (and script thread) in the same server process.
+# fastf1 itself is only imported on the first load (see enable_cache), so importing this module is cheap.
+# With F1_REPLAY_URL set, every fastf1 request goes to a local replay server instead (see replay_server.py);
+# F1_REPLAY_HYDRATE=1 also copies the server's cache pickles in before a load.
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = "cache"
+MAX_CACHE_BYTES = 2 * 1024 ** 3  # roughly 2 GB of loaded sessions before the oldest gets dropped
+
+_cache_lock = threading.Lock()
+_cache_dir = None  # directory fastf1's cache was enabled with in this process
+
+
+def enable_cache(cache_dir=None):
+    """
+    Import fastf1 and enable its on-disk cache, once per process. Returns the fastf1 module.
+
+    Without an argument this keeps whatever directory was enabled first (CACHE_DIR if none was),
+    so CLIs can pick their own --cache and library code never overrides it.
+    """
+    global _cache_dir
+    import fastf1
+
+    with _cache_lock:
+        if _cache_dir is None or (cache_dir is not None and cache_dir != _cache_dir):
+            _cache_dir = cache_dir or CACHE_DIR
+            os.makedirs(_cache_dir, exist_ok=True)  # fastf1 refuses a missing directory (fresh cold-load caches)
+            fastf1.Cache.enable_cache(_cache_dir)
+            if replay_url():
+                import replay_server
+                replay_server.use_replay(replay_url())  # enable_cache made a new requests session, route it too
+    return fastf1
+
+
+def replay_url():
+    """Base URL of the replay server fastf1 should use instead of the real APIs, or None."""
+    return os.environ.get("F1_REPLAY_URL", "").rstrip("/") or None
+
+
+def replay_hydrate():
+    """Whether to hydrate the cache from the replay server's pickles (opt-in, skips fastf1's download and parsing)."""
+    return os.environ.get("F1_REPLAY_HYDRATE", "") not in ("", "0")
+
+
+def estimate_session_bytes(session):
+    """
+    Rough in-memory size of a loaded session (laps + car/pos telemetry + weather), measured the same way as
+    compact_telemetry.memory_report so the registry budget and the reported savings agree.
+    """
+    from compact_telemetry import frame_bytes, session_frames
+
+    total = 0
+    for _, _, frame in session_frames(session):
+        try:
+            total += frame_bytes(frame)
+        except Exception:
+            pass
+    return total
+
+
+class SessionRegistry:
+    """
+    LRU cache of loaded sessions keyed by (year, event, session_type), bounded by memory.
+
+    Args:
+        max_bytes (int): Approximate memory budget for all cached sessions together.
+        loader (callable): Function taking (year, event, session_type) and returning a loaded
+            session. Defaults to fastf1.get_session(...).load().
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, loader=None):
+        self.max_bytes = max_bytes
+        self._loader = loader or _load_full_session
+        self._sessions = OrderedDict()  # key -> session, oldest first
+        self._sizes = {}                # key -> estimated bytes
+        self._lock = threading.Lock()   # guards the two dicts above
+        self._loading = {}              # key -> lock, so two threads never load the same session twice
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(year, event, session_type):
+        return (int(year), str(event), str(session_type))
+
+    def get(self, year, event, session_type):
+        """Return a loaded session, loading it only if no other thread already has."""
+        key = self.make_key(year, event, session_type)
+
+        with self._lock:
+            if key in self._sessions:
+                self._sessions.move_to_end(key)
+                self.hits += 1
+                return self._sessions[key]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # another thread may have finished loading while we waited for the key lock
+            with self._lock:
+                if key in self._sessions:
+                    self._sessions.move_to_end(key)
+                    self.hits += 1
+                    return self._sessions[key]
+                self.misses += 1
+
+            try:
+                session = self._loader(*key)
+                size = estimate_session_bytes(session)
+                with self._lock:
+                    self._sessions[key] = session
+                    self._sizes[key] = size
+                    self._evict()
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return session
+
+    def _evict(self):
+        # always keep the newest entry, even if it alone is over budget
+        while len(self._sessions) > 1 and self.total_bytes() > self.max_bytes:
+            old_key, _ = self._sessions.popitem(last=False)
+            self._sizes.pop(old_key, None)
+
+    def total_bytes(self):
+        return sum(self._sizes.values())
+
+    def invalidate(self, year=None, event=None, session_type=None):
+        """Drop one session, or everything if called with no arguments."""
+        with self._lock:
+            if year is None:
+                self._sessions.clear()
+                self._sizes.clear()
+                return
+            key = self.make_key(year, event, session_type)
+            self._sessions.pop(key, None)
+            self._sizes.pop(key, None)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self.make_key(*key) in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+def open_session(year, event, session_type, **load_kwargs):
+    """
+    fastf1.get_session(...).load(**load_kwargs) with the cache enabled, for scripts that want their own session.
+    Pulls the session's cache files from the replay server first when hydration is turned on (replay_hydrate), and
+    stamps the session's cache directory for cache_manager's LRU eviction afterwards.
+    """
+    import cache_manager
+
+    fastf1 = enable_cache()
+    session = fastf1.get_session(year, event, session_type)
+    if replay_url() and replay_hydrate():
+        import replay_server
+        replay_server.hydrate(session, replay_url())
+    session.load(**load_kwargs)
+    try:
+        cache_manager.record_use(session)  # LRU stamp for the on-disk cache
+        cache_manager.maybe_evict()        # keep cache/ under F1_CACHE_MAX_MB, on its own thread
+    except OSError:
+        pass  # disk housekeeping never fails a load
+    return session
+
+
+def _load_full_session(year, event, session_type):
+    from compact_telemetry import compact_session
+
+    session = open_session(year, event, session_type)
+    return compact_session(session)  # float32 / int8 channels, a fraction of the memory for every cached session
+
+
+# the one registry everything in this process shares
+REGISTRY = SessionRegistry()
+
+
+def get_session(year, event, session_type):
+    """Loaded session from the shared registry (laps, telemetry, weather)."""
+    return REGISTRY.get(year, event, session_type)
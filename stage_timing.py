@@ -0,0 +1,102 @@
+# Lightweight stage timing for a single button click / request.
+# Each stage (session load, lap pick, telemetry, derived channels, figures...) runs inside timer.span(name).
+# The progress bar advances by how long stages have really taken on earlier requests, the breakdown can be shown
+# in the UI, and every request is appended as one JSON line to a local log so regressions show up under load.
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+TIMING_LOG_FILE = "timing_log.jsonl"
+EMA_WEIGHT = 0.3  # how quickly the expected stage durations follow new measurements
+
+_lock = threading.Lock()
+_expected = {}  # stage -> exponential moving average of its duration in seconds, shared by every user
+
+
+def expected_duration(stage, default=1.0):
+    return _expected.get(stage, default)
+
+
+class StageTimer:
+    """
+    Times named stages of one request and reports progress as they complete.
+
+    Args:
+        stages (list[str]): Stages in the order they will run, used to weight progress.
+        on_progress (callable): Called with a 0-100 int after each stage (e.g. st.progress(...).progress).
+        log_path (str): JSON lines file to append the finished record to, or None to skip logging.
+    """
+
+    def __init__(self, stages, on_progress=None, log_path=TIMING_LOG_FILE):
+        self.stages = list(stages)
+        self.on_progress = on_progress
+        self.log_path = log_path
+        self.durations = {}  # stage -> seconds, in the order they ran
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage] = self.durations.get(stage, 0.0) + time.perf_counter() - start
+            self._report_progress()
+
+    def _report_progress(self):
+        if self.on_progress is None:
+            return
+        # fall back to the mean of what we know for stages that have never been timed
+        known = [_expected[s] for s in self.stages if s in _expected]
+        default = sum(known) / len(known) if known else 1.0
+        weights = {s: expected_duration(s, default) for s in self.stages}
+        total = sum(weights.values()) or 1.0
+        done = sum(weights[s] for s in self.durations if s in weights)
+        self.on_progress(min(100, int(round(100 * done / total))))
+
+    @property
+    def total(self):
+        return time.perf_counter() - self._start
+
+    def breakdown(self):
+        """[(stage, seconds, share of total), ...] in the order the stages ran."""
+        total = sum(self.durations.values()) or 1.0
+        return [(stage, seconds, seconds / total) for stage, seconds in self.durations.items()]
+
+    def finish(self, **context):
+        """Update the expected stage durations and append the record to the timing log."""
+        with _lock:
+            for stage, seconds in self.durations.items():
+                old = _expected.get(stage)
+                _expected[stage] = seconds if old is None else (1 - EMA_WEIGHT) * old + EMA_WEIGHT * seconds
+
+        record = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'thread': threading.current_thread().name,
+            'total_s': round(self.total, 4),
+            'stages': {stage: round(seconds, 4) for stage, seconds in self.durations.items()},
+            **context,
+        }
+        if self.log_path:
+            line = json.dumps(record, default=str)
+            with _lock:
+                with open(self.log_path, 'a') as f:
+                    f.write(line + '\n')
+        return record
+
+
+def read_log(path=TIMING_LOG_FILE):
+    """All records from a timing log (skipping any half-written line)."""
+    records = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
@@ -0,0 +1,151 @@
+# Whole-field lap time and stint analytics: stint boundaries, tyre degradation per stint, fuel-corrected pace and
+# compound deltas for every driver at once, from session.laps alone (no telemetry).
+# Degradation is a least-squares slope of fuel-corrected lap time against tyre age, solved for every stint together
+# from grouped sums instead of one np.polyfit per stint. Results are cached per session.
+# The fuel model (START_FUEL_KG burned evenly over the race) only holds for races and sprints; practice and
+# qualifying fuel loads are unknown, so those sessions are analysed on raw lap times.
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+QUICKLAP_THRESHOLD = 1.07     # laps slower than 107% of the session's fastest are not race pace (SC, traffic, ...)
+START_FUEL_KG = 110.0         # maximum race fuel load
+FUEL_EFFECT_S_PER_KG = 0.03   # lap time cost of every kg of fuel on board
+MIN_STINT_LAPS = 3            # fewer clean laps than this and a stint gets no degradation slope
+MAX_CACHED_SESSIONS = 16
+RACE_SESSIONS = ('Race', 'Sprint')  # fastf1 session names the fuel model applies to
+
+
+@dataclass(frozen=True)
+class StintAnalysis:
+    laps: pd.DataFrame       # one row per lap: Driver, Team, LapNumber, Stint, Compound, TyreLife, LapTime (s),
+                             # FuelCorrected (s, equal to LapTime when fuel_corrected is False), Clean
+    stints: pd.DataFrame     # one row per (Driver, Stint): Compound, StartLap, EndLap, Laps, StartAge, EndAge,
+                             # CleanLaps, MeanPace, Degradation (s per lap of tyre age), Intercept
+    compounds: pd.DataFrame  # one row per compound: CleanLaps, MedianPace, DeltaToFastest, MeanDegradation
+    fuel_corrected: bool = True  # False for sessions outside RACE_SESSIONS: pace and slopes are raw lap times
+
+
+def fuel_corrected(lap_time, lap_number, total_laps):
+    """Lap time with the weight of the fuel still on board taken out (linear burn over the race distance)."""
+    fuel = START_FUEL_KG * (1 - (lap_number - 1) / max(total_laps, 1))
+    return lap_time - FUEL_EFFECT_S_PER_KG * np.clip(fuel, 0.0, START_FUEL_KG)
+
+
+def lap_table(laps, fuel_correct=True):
+    """
+    Per-lap frame of the analysis from a fastf1 Laps object, with the Clean flag and, with fuel_correct, the fuel
+    correction (FuelCorrected is the raw LapTime otherwise).
+    """
+    lap_time = laps['LapTime'].dt.total_seconds().to_numpy(dtype=np.float64)
+    lap_number = laps['LapNumber'].to_numpy(dtype=np.float64)
+    fastest = np.nanmin(lap_time) if np.isfinite(lap_time).any() else np.nan
+
+    clean = (
+        np.isfinite(lap_time)
+        & (lap_time <= fastest * QUICKLAP_THRESHOLD)
+        & laps['PitInTime'].isna().to_numpy()       # in laps...
+        & laps['PitOutTime'].isna().to_numpy()      # ...and out laps carry the pit stop
+    )
+    tyre_life = laps['TyreLife'].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        'Driver': laps['Driver'].to_numpy(),
+        'Team': laps['Team'].to_numpy(),
+        'LapNumber': lap_number,
+        'Stint': laps['Stint'].to_numpy(dtype=np.float64),
+        'Compound': laps['Compound'].fillna('UNKNOWN').to_numpy(),
+        'TyreLife': tyre_life,
+        'LapTime': lap_time,
+        'FuelCorrected': (fuel_corrected(lap_time, lap_number, np.nanmax(lap_number) if len(lap_number) else 1)
+                          if fuel_correct else lap_time),
+        'Clean': clean & np.isfinite(tyre_life),
+    })
+
+
+def stint_table(table):
+    """Stint boundaries and per-stint degradation, every stint of every driver solved in one grouped pass."""
+    keys = ['Driver', 'Stint']
+    bounds = table.groupby(keys, sort=False).agg(
+        Compound=('Compound', 'first'),
+        StartLap=('LapNumber', 'min'),
+        EndLap=('LapNumber', 'max'),
+        Laps=('LapNumber', 'size'),
+        StartAge=('TyreLife', 'min'),
+        EndAge=('TyreLife', 'max'),
+    )
+
+    clean = table[table['Clean']]
+    x = clean['TyreLife'].to_numpy()
+    y = clean['FuelCorrected'].to_numpy()
+    sums = pd.DataFrame({'n': 1.0, 'x': x, 'y': y, 'xx': x * x, 'xy': x * y}, index=clean.index)
+    sums[keys] = clean[keys]
+    s = sums.groupby(keys, sort=False)[['n', 'x', 'y', 'xx', 'xy']].sum().reindex(bounds.index, fill_value=0.0)
+
+    # least squares y = a + b x for every stint at once: b = (n Sxy - Sx Sy) / (n Sxx - Sx^2)
+    denom = s['n'] * s['xx'] - s['x'] ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (s['n'] * s['xy'] - s['x'] * s['y']) / denom
+        mean_pace = s['y'] / s['n']
+    fit = (s['n'] >= MIN_STINT_LAPS) & (denom > 0)
+
+    stints = bounds.assign(
+        CleanLaps=s['n'].astype(int),
+        MeanPace=mean_pace.where(s['n'] > 0),
+        Degradation=slope.where(fit),
+        Intercept=((s['y'] - slope * s['x']) / s['n']).where(fit),
+    )
+    return stints.reset_index()
+
+
+def compound_table(table, stints):
+    """Field-wide pace per compound and its gap to the fastest compound."""
+    clean = table[table['Clean']]
+    compounds = clean.groupby('Compound').agg(CleanLaps=('FuelCorrected', 'size'),
+                                              MedianPace=('FuelCorrected', 'median'))
+    compounds['DeltaToFastest'] = compounds['MedianPace'] - compounds['MedianPace'].min()
+    # degradation of each compound, stints weighted by their clean laps
+    fitted = stints.dropna(subset=['Degradation'])
+    per = fitted.assign(Weighted=fitted['Degradation'] * fitted['CleanLaps']).groupby('Compound')[
+        ['Weighted', 'CleanLaps']].sum()
+    compounds['MeanDegradation'] = per['Weighted'] / per['CleanLaps']
+    return compounds.sort_values('MedianPace').reset_index()
+
+
+def analyse_laps(laps, fuel_correct=True):
+    table = lap_table(laps, fuel_correct)
+    stints = stint_table(table)
+    return StintAnalysis(laps=table, stints=stints, compounds=compound_table(table, stints),
+                         fuel_corrected=fuel_correct)
+
+
+_lock = threading.Lock()
+_analyses = OrderedDict()  # (year, event, session) -> StintAnalysis, most recently used last
+
+
+def session_key(session):
+    event = session.event
+    return (int(event['EventDate'].year), event['EventName'], session.name)
+
+
+def stint_analysis(session):
+    """StintAnalysis of a loaded session, computed once and shared by every caller in the process."""
+    key = session_key(session)
+    with _lock:
+        analysis = _analyses.get(key)
+        if analysis is not None:
+            _analyses.move_to_end(key)
+            return analysis
+    analysis = analyse_laps(session.laps, fuel_correct=session.name in RACE_SESSIONS)
+    with _lock:
+        _analyses[key] = analysis
+        while len(_analyses) > MAX_CACHED_SESSIONS:
+            _analyses.popitem(last=False)
+    return analysis
+
+
+def clear():
+    with _lock:
+        _analyses.clear()
@@ -0,0 +1,286 @@
+# Replay fixtures generated from synthetic_session.py: the F1 live timing responses of a made-up race weekend.
+# A fresh checkout has nothing recorded to replay and nothing can be recorded offline, so this writes, for every
+# session of one weekend, the same endpoints fastf1 downloads and parses on a cold load - the season index, session
+# info, driver list, timing data, tyre stints, session / track status, lap count, weather, race control messages,
+# compressed car and position data - plus the circuit info (corners) fastf1 takes from the MultiViewer API.
+# fastf1.get_session(year, "Synthetic", ...).load() through replay_server.py then runs fastf1's whole download and
+# parsing path with no network. Laps, lap times and telemetry are those of synthetic_session.SyntheticSession, with
+# times rounded to the millisecond and positions to the metre (position data stays in metres, not fastf1's 1/10 m).
+#
+#   python replay_server.py synthesize                      # into replay_fixtures/
+#   python replay_server.py serve
+#
+# Replay them into an empty fastf1 cache: its HTTP cache keys responses by the real URLs, so a cache that has seen the
+# real season index would keep serving that.
+import base64
+import json
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import synthetic_session
+
+LIVE_TIMING = "https://livetiming.formula1.com"
+MULTIVIEWER = "https://api.multiviewer.app"
+# (session type, day offset from the race, local start time), a conventional weekend in order
+WEEKEND = [('FP1', -2, "13:30"), ('FP2', -2, "17:00"), ('FP3', -1, "14:30"), ('Q', -1, "18:00"), ('R', 0, "17:00")]
+MEETING_KEY = 9000
+CIRCUIT_KEY = 900
+SAMPLE_S = 1 / synthetic_session.SAMPLE_HZ
+SESSION_END_S = 5 * 60     # data keeps coming for a while after the last car is in
+WEATHER_EVERY_S = 60
+
+
+def stream_time(seconds):
+    """Stream timestamp fastf1 expects in front of every jsonStream line, 'HH:MM:SS.mmm'."""
+    ms = int(round(seconds * 1000))
+    return f"{ms // 3_600_000:02d}:{ms // 60_000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def lap_time_text(seconds):
+    """'1:10.123' or '23.456', as LastLapTime / sector values are sent."""
+    ms = int(round(seconds * 1000))
+    minutes, ms = divmod(ms, 60_000)
+    return f"{minutes}:{ms / 1000:06.3f}" if minutes else f"{ms / 1000:.3f}"
+
+
+def utc_text(dates):
+    """ISO timestamps with a Z, as in the Utc / Timestamp fields."""
+    return pd.DatetimeIndex(dates).strftime("%Y-%m-%dT%H:%M:%S.%f").str[:-3] + "Z"
+
+
+def json_stream(entries):
+    """jsonStream body from [(seconds, payload)]: one 'timestamp + JSON' line each, CRLF separated."""
+    lines = [stream_time(t) + json.dumps(payload, separators=(",", ":")) + "\r\n" for t, payload in entries]
+    return "".join(lines).encode("utf-8-sig")
+
+
+def z_stream(entries):
+    """.z.jsonStream body: each payload raw-deflated and base64 encoded, in quotes."""
+    lines = []
+    for t, payload in entries:
+        deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        packed = deflate.compress(json.dumps(payload, separators=(",", ":")).encode()) + deflate.flush()
+        lines.append(f'{stream_time(t)}"{base64.b64encode(packed).decode()}"\r\n')
+    return "".join(lines).encode("utf-8-sig")
+
+
+def session_dates(year, event_date=synthetic_session.EVENT_DATE):
+    """{session type: start (UTC, GMT offset 0)} of the synthetic weekend."""
+    race_day = event_date.replace(year=int(year))
+    return {session_type: race_day + pd.Timedelta(days=days) + pd.Timedelta(start + ":00")
+            for session_type, days, start in WEEKEND}
+
+
+def session_path(year, event, session_type, dates):
+    """Live timing path of a session, as fastf1.api.make_path builds it."""
+    from fastf1 import _api
+
+    return _api.make_path(meeting_name(event), dates['R'].strftime("%Y-%m-%d"),
+                          synthetic_session.SESSION_NAMES[session_type], dates[session_type].strftime("%Y-%m-%d"))
+
+
+def meeting_name(event):
+    """EventName fastf1 gives the synthetic event, matched by get_session(year, event, ...)."""
+    return f"{event} Grand Prix"
+
+
+def season_index(year, event, dates):
+    """Index.json of the season: one meeting, the synthetic weekend."""
+    sessions = []
+    for i, (session_type, _, _) in enumerate(WEEKEND):
+        start = dates[session_type]
+        sessions.append({
+            'Key': MEETING_KEY * 10 + i,
+            'Type': 'Race' if session_type == 'R' else 'Qualifying' if session_type == 'Q' else 'Practice',
+            'Name': synthetic_session.SESSION_NAMES[session_type],
+            'StartDate': start.strftime("%Y-%m-%dT%H:%M:%S"),
+            'EndDate': (start + pd.Timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M:%S"),
+            'GmtOffset': "00:00:00",
+            'Path': session_path(year, event, session_type, dates)[len('/static/'):],
+        })
+    return {'Year': int(year), 'Meetings': [{
+        'Key': MEETING_KEY,
+        'Number': 1,
+        'Location': str(event),
+        'OfficialName': f"FORMULA 1 {str(event).upper()} GRAND PRIX {year}",
+        'Name': meeting_name(event),
+        'Country': {'Key': 0, 'Code': 'SYN', 'Name': str(event)},
+        'Circuit': {'Key': CIRCUIT_KEY, 'ShortName': str(event)},
+        'Sessions': sessions,
+    }]}
+
+
+def circuit_info():
+    """MultiViewer circuit response: corners (and no marshal posts) of the synthetic circuit."""
+    corners = synthetic_session.circuit()['corners']
+    return {'rotation': 0, 'corners': [
+        {'number': int(row.Number), 'letter': row.Letter, 'angle': float(row.Angle),
+         'trackPosition': {'x': float(row.X), 'y': float(row.Y)}} for row in corners.itertuples()]}
+
+
+def sector_fractions(track):
+    """Share of the lap time spent in each third of the lap (the sectors), from the circuit's speed profile."""
+    bounds = np.interp([track['distance'][-1] / 3, 2 * track['distance'][-1] / 3], track['distance'], track['time'])
+    return bounds / track['lap_time']
+
+
+def timing_entries(session, session_type):
+    """TimingData and TimingAppData stream entries of a synthetic session, [(seconds, payload)] each."""
+    track = synthetic_session.circuit()
+    fractions = sector_fractions(track)
+    race = session_type in synthetic_session.LAPS
+    timing, app = [], []
+    for driver_number, laps in session.laps.groupby('DriverNumber', sort=False):
+        best = None
+        for lap in laps.itertuples():
+            start = lap.LapStartTime.total_seconds()
+            lap_ms = int(round(lap.LapTime.total_seconds() * 1000))
+            if not pd.isna(lap.PitOutTime):
+                timing.append((start, {'Lines': {driver_number: {'InPit': False, 'PitOut': True}}}))
+                app.append((start, {'Lines': {driver_number: {'Stints': {str(int(lap.Stint) - 1): {
+                    'Compound': lap.Compound, 'New': 'true', 'StartLaps': 0, 'TotalLaps': 0}}}}}))
+
+            sectors = [int(round(lap_ms * fraction)) for fraction in (fractions[0], fractions[1] - fractions[0])]
+            sectors.append(lap_ms - sum(sectors))  # sectors add up to the lap time to the millisecond
+            crossed = start
+            for i, sector_ms in enumerate(sectors[:2]):
+                crossed += sector_ms / 1000
+                timing.append((crossed, {'Lines': {driver_number: {'Sectors': {
+                    str(i): {'Value': lap_time_text(sector_ms / 1000)}}}}}))
+
+            end = start + lap_ms / 1000
+            line = {
+                'NumberOfLaps': int(lap.LapNumber),
+                'LastLapTime': {'Value': lap_time_text(lap_ms / 1000)},
+                'Sectors': {'2': {'Value': lap_time_text(sectors[2] / 1000)}},
+                'Speeds': {'ST': {'Value': str(int(round(lap.SpeedST)))}},
+            }
+            if best is None or lap_ms < best:
+                best = lap_ms
+                line['BestLapTime'] = {'Value': lap_time_text(lap_ms / 1000)}
+            if race:
+                line['Position'] = str(int(lap.Position))
+            if not pd.isna(lap.PitInTime) or lap.LapNumber == laps['LapNumber'].max():
+                line['InPit'] = True  # in for new tyres, or back to the garage after the last lap
+            timing.append((end, {'Lines': {driver_number: line}}))
+    timing.sort(key=lambda entry: entry[0])
+    app.sort(key=lambda entry: entry[0])
+    return timing, app
+
+
+def telemetry_entries(session, end_s):
+    """CarData.z and Position.z payloads on one clock for every car, [(seconds, payload)] each."""
+    clock = np.arange(0, end_s, SAMPLE_S)
+    dates = utc_text(session.t0_date + pd.to_timedelta(clock, unit='s'))
+    car_channels, positions = {}, {}
+    for driver_number in session.drivers:
+        car, pos = session.car_data[driver_number], session.pos_data[driver_number]
+        seconds = car['SessionTime'].dt.total_seconds().to_numpy()
+        # latest sample at or before each tick; in the garage before and after the driver's run
+        at = np.clip(np.searchsorted(seconds, clock, side='right') - 1, 0, len(seconds) - 1)
+        running = (clock >= seconds[0]) & (clock <= seconds[-1])
+        car_channels[driver_number] = np.column_stack([
+            np.where(running, car['RPM'].to_numpy()[at], 0),
+            np.where(running, car['Speed'].to_numpy()[at], 0),
+            np.where(running, car['nGear'].to_numpy()[at], 0),
+            np.where(running, car['Throttle'].to_numpy()[at], 0),
+            np.where(running, car['Brake'].to_numpy()[at] * 100, 0),
+            np.where(running, car['DRS'].to_numpy()[at], 0),
+        ]).round().astype(int).tolist()
+        positions[driver_number] = (np.column_stack([pos['X'].to_numpy()[at], pos['Y'].to_numpy()[at]])
+                                    .round().astype(int).tolist(), running)
+
+    car_entries, pos_entries = [], []
+    for i, t in enumerate(clock):
+        cars = {number: {'Channels': dict(zip(("0", "2", "3", "4", "5", "45"), channels[i]))}
+                for number, channels in car_channels.items()}
+        car_entries.append((t, {'Entries': [{'Utc': dates[i], 'Cars': cars}]}))
+        entries = {number: {'Status': 'OnTrack' if running[i] else 'OffTrack', 'X': xy[i][0], 'Y': xy[i][1], 'Z': 0}
+                   for number, (xy, running) in positions.items()}
+        pos_entries.append((t, {'Position': [{'Timestamp': dates[i], 'Entries': entries}]}))
+    return car_entries, pos_entries
+
+
+def session_responses(year, event, session_type, dates):
+    """{page file name: body} of one session of the synthetic weekend."""
+    session = synthetic_session.SyntheticSession(year, event, session_type)
+    start = dates[session_type]
+    session.t0_date = start  # the stream starts with the session, the first car leaves 10 minutes in
+    timing, app = timing_entries(session, session_type)
+    first_out = session.laps['LapStartTime'].min().total_seconds()
+    last_in = session.laps['Time'].max().total_seconds()
+    # a race is finished when the leader takes the flag, any other session when the last car is in
+    finished = (session.laps.groupby('Driver')['Time'].max().min().total_seconds()
+                if session_type in synthetic_session.LAPS else last_in)
+    end_s = last_in + SESSION_END_S
+    car, pos = telemetry_entries(session, end_s)
+
+    info = season_index(year, event, dates)['Meetings'][0]
+    meeting = {key: info[key] for key in ('Key', 'Name', 'OfficialName', 'Location', 'Country', 'Circuit')}
+    drivers = {}
+    for line, (code, number, team, colour) in enumerate(synthetic_session.ENTRY_LIST, start=1):
+        drivers[number] = {'RacingNumber': number, 'BroadcastName': code, 'FullName': code, 'Tla': code,
+                           'Line': line, 'TeamName': team, 'TeamColour': colour.lstrip('#'),
+                           'FirstName': code.title(), 'LastName': code, 'Reference': code}
+    session_info = {
+        'Meeting': meeting,
+        'Key': next(s['Key'] for s in info['Sessions'] if s['Name'] == session.name),
+        'Type': 'Race' if session_type == 'R' else 'Qualifying' if session_type == 'Q' else 'Practice',
+        'Name': session.name,
+        'StartDate': start.strftime("%Y-%m-%dT%H:%M:%S"),
+        'EndDate': (start + pd.Timedelta(seconds=end_s)).strftime("%Y-%m-%dT%H:%M:%S"),
+        'GmtOffset': "00:00:00",
+        'Path': session_path(year, event, session_type, dates)[len('/static/'):],
+    }
+    weather = [(t, {'AirTemp': "26.0", 'Humidity': "45.0", 'Pressure': "1012.0", 'Rainfall': "0",
+                    'TrackTemp': "34.0", 'WindDirection': "180", 'WindSpeed': "1.5"})
+               for t in np.arange(0, end_s, WEATHER_EVERY_S)]
+    responses = {
+        'SessionInfo.jsonStream': json_stream([(0, session_info)]),
+        'DriverList.jsonStream': json_stream([(0, drivers)]),
+        'TimingData.jsonStream': json_stream(timing),
+        'TimingAppData.jsonStream': json_stream(app),
+        'SessionStatus.jsonStream': json_stream([(first_out, {'Status': 'Started'}),
+                                                 (finished, {'Status': 'Finished'}),
+                                                 (end_s, {'Status': 'Finalised'})]),
+        'TrackStatus.jsonStream': json_stream([(0, {'Status': "1", 'Message': "AllClear"})]),
+        'WeatherData.jsonStream': json_stream(weather),
+        'RaceControlMessages.jsonStream': json_stream([(first_out, {'Messages': [{
+            'Utc': utc_text([start + pd.Timedelta(seconds=first_out)])[0], 'Category': "Flag", 'Flag': "GREEN",
+            'Scope': "Track", 'Message': "GREEN LIGHT - PIT EXIT OPEN"}]})]),
+        'CarData.z.jsonStream': z_stream(car),
+        'Position.z.jsonStream': z_stream(pos),
+    }
+    if session_type in synthetic_session.LAPS:
+        laps = synthetic_session.LAPS[session_type]
+        responses['LapCount.jsonStream'] = json_stream([(first_out, {'CurrentLap': 1, 'TotalLaps': laps})])
+    return responses
+
+
+def write_fixtures(fixture_dir, year=2022, event="Synthetic", session_types=None):
+    """
+    Write replay fixtures of the synthetic weekend (every session of WEEKEND, or just `session_types`) into
+    fixture_dir, in replay_server's layout.
+
+    Returns:
+        number of responses written.
+    """
+    from replay_server import save_fixture
+
+    dates = session_dates(year)
+    save_fixture(fixture_dir, f"{LIVE_TIMING}/static/{year}/Index.json",
+                 json.dumps(season_index(year, event, dates)).encode("utf-8-sig"), "application/json")
+    save_fixture(fixture_dir, f"{MULTIVIEWER}/api/v1/circuits/{CIRCUIT_KEY}/{year}",
+                 json.dumps(circuit_info()).encode(), "application/json")
+    written = 2
+    for session_type, _, _ in WEEKEND:
+        if session_types is not None and session_type not in session_types:
+            continue
+        responses = session_responses(year, event, session_type, dates)
+        path = session_path(year, event, session_type, dates)
+        for page, body in responses.items():
+            save_fixture(fixture_dir, f"{LIVE_TIMING}{path}{page}", body, "application/json")
+            written += 1
+    return written
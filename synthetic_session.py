@@ -0,0 +1,241 @@
+# Small synthetic stand-in for a loaded fastf1 session, for running the app's data path with no F1 data at all.
+# The checked-in cache/ holds the timing of one session but no schedule and no car / position data, and nothing can be
+# downloaded offline, so load_test.py (and its test) load sessions from here unless told to use real data.
+# A made-up circuit gets a speed profile from its curvature (grip, acceleration and braking limits), every driver
+# laps it at their own pace with tyre wear and, in races, fuel burn. Laps, car data and position data are real
+# fastf1 Laps / Telemetry objects, so pick_drivers(), pick_fastest(), get_car_data().add_distance(), get_pos_data()
+# and everything built on them behave as on a loaded session. Nothing here is real timing.
+import numpy as np
+import pandas as pd
+
+EVENT_DATE = pd.Timestamp("2022-11-20")
+# circuit outline (m), about 5 km and 9 corners once rounded
+CIRCUIT_OUTLINE = np.array([(0, 0), (1400, 0), (1550, 250), (1300, 450), (900, 420), (700, 700), (900, 1000),
+                            (300, 1100), (-200, 800), (-150, 300)], dtype=np.float64)
+CIRCUIT_POINTS = 1200
+CORNER_SMOOTHING = 6       # samples
+TOP_SPEED = 330 / 3.6      # m/s
+LATERAL_ACCEL = 40.0       # m/s^2, ~4 g through the corners
+TRACTION_ACCEL = 11.0      # m/s^2 out of them
+BRAKING_ACCEL = 45.0       # m/s^2 into them
+SAMPLE_HZ = 4.0            # car and position data rate, as fastf1's car data
+GEAR_SPEEDS = [85, 120, 155, 190, 225, 260, 295]  # km/h upshift points for gears 1 - 7
+DRS_OPEN = 12
+STINT_LAPS = 10
+LAPS = {'R': 24, 'S': 12}  # everything else: one short run
+RUN_LAPS = 6
+TYRE_WEAR_S = 0.06         # s per lap of tyre life
+FUEL_EFFECT_S = 0.035      # s per lap of fuel still on board, races only
+OUT_LAP_S = 6.0            # first lap of a stint, out of the pits on cold tyres
+PIT_EXIT_GAP = pd.Timedelta(seconds=30)  # between cars leaving the pit lane at the start of a session
+
+# (code, number, team, colour), fastest first
+ENTRY_LIST = [
+    ('VER', '1', 'Red Bull Racing', '#3671C6'),
+    ('LEC', '16', 'Ferrari', '#E8002D'),
+    ('HAM', '44', 'Mercedes', '#27F4D2'),
+    ('NOR', '4', 'McLaren', '#FF8000'),
+    ('ALO', '14', 'Aston Martin', '#229971'),
+    ('GAS', '10', 'Alpine', '#0093CC'),
+]
+SESSION_NAMES = {'FP1': 'Practice 1', 'FP2': 'Practice 2', 'FP3': 'Practice 3', 'SQ': 'Sprint Qualifying',
+                 'S': 'Sprint', 'Q': 'Qualifying', 'R': 'Race'}
+
+
+class CircuitInfo:
+    """What session.get_circuit_info() returns, as far as the app uses it."""
+
+    def __init__(self, corners, rotation=0.0):
+        self.corners = corners
+        self.rotation = rotation
+
+
+class SyntheticSession:
+    """
+    A loaded session with fastf1's attributes: event, name, drivers, laps, car_data, pos_data, results and
+    weather_data, plus get_circuit_info() and get_driver().
+    """
+
+    def __init__(self, year, event, session_type, entry_list=ENTRY_LIST, seed=0):
+        self.event = pd.Series({'EventName': str(event), 'Location': str(event), 'Country': 'Synthetic',
+                                'RoundNumber': 0, 'EventDate': EVENT_DATE.replace(year=int(year))})
+        self.name = SESSION_NAMES.get(session_type, session_type)
+        self.t0_date = self.event['EventDate']
+        self.date = self.t0_date
+        self.drivers = [number for _, number, _, _ in entry_list]
+        self.results = pd.DataFrame(
+            [{'DriverNumber': number, 'Abbreviation': code, 'TeamName': team, 'TeamColor': colour.lstrip('#'),
+              'Position': float(i + 1)} for i, (code, number, team, colour) in enumerate(entry_list)],
+            index=self.drivers)
+        self.weather_data = None
+        self.car_data, self.pos_data = {}, {}
+        self._circuit = circuit()
+        self.laps = self._drive(entry_list, session_type, np.random.default_rng(seed))
+
+    def get_circuit_info(self):
+        return CircuitInfo(self._circuit['corners'])
+
+    def get_driver(self, identifier):
+        return self.results.loc[identifier]
+
+    def _drive(self, entry_list, session_type, rng):
+        from fastf1.core import Laps
+
+        track = self._circuit
+        laps_per_driver = LAPS.get(session_type, RUN_LAPS)
+        race = session_type in LAPS
+        rows = []
+        for rank, (code, number, team, _) in enumerate(entry_list):
+            pace = track['lap_time'] * (1 + 0.003 * rank)
+            start = pd.Timedelta(minutes=10) + rank * PIT_EXIT_GAP  # out of the pit lane one after the other
+            car, pos = [], []
+            for lap_number in range(1, laps_per_driver + 1):
+                stint, tyre_life = (lap_number - 1) // STINT_LAPS + 1, (lap_number - 1) % STINT_LAPS + 1
+                lap_time = pace + TYRE_WEAR_S * tyre_life + rng.normal(0, 0.08)
+                if tyre_life == 1:
+                    lap_time += OUT_LAP_S
+                if race:
+                    lap_time += FUEL_EFFECT_S * (laps_per_driver - lap_number)
+                channels, position = lap_samples(track, lap_time, start)
+                car.append(channels)
+                pos.append(position)
+                rows.append({
+                    'Time': start + pd.to_timedelta(lap_time, unit='s'),
+                    'Driver': code,
+                    'DriverNumber': number,
+                    'LapTime': pd.to_timedelta(lap_time, unit='s'),
+                    'LapNumber': float(lap_number),
+                    'Stint': float(stint),
+                    'SpeedST': float(channels['Speed'].max()),
+                    'IsPersonalBest': False,
+                    'Compound': 'SOFT' if not race or stint % 2 else 'MEDIUM',
+                    'TyreLife': float(tyre_life),
+                    'FreshTyre': True,
+                    'Team': team,
+                    'LapStartTime': start,
+                    'LapStartDate': self.t0_date + start,
+                    'TrackStatus': '1',
+                    'Position': float(rank + 1) if race else np.nan,
+                    'Deleted': False,
+                    'IsAccurate': tyre_life > 1,  # out laps aren't
+                })
+                start += pd.to_timedelta(lap_time, unit='s')
+            self.car_data[number] = self._telemetry(car, number)
+            self.pos_data[number] = self._telemetry(pos, number)
+
+        laps = pd.DataFrame(rows)
+        last_of_stint = laps.groupby(['Driver', 'Stint'])['LapNumber'].transform('max') == laps['LapNumber']
+        laps['PitOutTime'] = laps['LapStartTime'].where(laps['TyreLife'] == 1)
+        laps['PitInTime'] = laps['Time'].where(last_of_stint & (laps['LapNumber'] < laps_per_driver))
+        fastest = laps.groupby('Driver')['LapTime'].transform('min') == laps['LapTime']
+        laps.loc[fastest, 'IsPersonalBest'] = True
+        return Laps(laps, session=self)
+
+    def _telemetry(self, lap_frames, number):
+        from fastf1.core import Telemetry
+
+        frame = pd.concat(lap_frames, ignore_index=True)
+        frame['Date'] = self.t0_date + frame['SessionTime']
+        return Telemetry(frame, session=self, driver=number)
+
+
+def circuit(points=CIRCUIT_POINTS):
+    """
+    Centre line, speed profile and corners of the synthetic circuit.
+
+    Returns:
+        dict with x, y, distance (m), speed (m/s), time (s) along one flying lap, its lap_time and the corners frame
+        (Number, Letter, X, Y, Angle, Distance) of circuit_info.
+    """
+    closed = np.vstack([CIRCUIT_OUTLINE, CIRCUIT_OUTLINE[:1]])
+    along = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(closed, axis=0).T))))
+    samples = np.linspace(0, along[-1], points, endpoint=False)
+    kernel = np.exp(-0.5 * (np.arange(-3 * CORNER_SMOOTHING, 3 * CORNER_SMOOTHING + 1) / CORNER_SMOOTHING) ** 2)
+    kernel /= kernel.sum()
+
+    def rounded(a):  # gaussian smoothing round the closed loop turns the outline's vertices into corners
+        pad = 3 * CORNER_SMOOTHING
+        return np.convolve(np.concatenate((a[-pad:], a, a[:pad])), kernel, 'valid')
+
+    x = rounded(np.interp(samples, along, closed[:, 0]))
+    y = rounded(np.interp(samples, along, closed[:, 1]))
+
+    def gradient(a):  # central differences round the closed loop
+        return (np.roll(a, -1) - np.roll(a, 1)) / 2
+
+    dx, dy = gradient(x), gradient(y)
+    ddx, ddy = gradient(dx), gradient(dy)
+    curvature = np.abs(dx * ddy - dy * ddx) / (dx ** 2 + dy ** 2) ** 1.5
+    step = np.hypot(np.diff(x, append=x[0]), np.diff(y, append=y[0]))
+    distance = np.concatenate(([0.0], np.cumsum(step)[:-1]))
+
+    speed = np.minimum(TOP_SPEED, np.sqrt(LATERAL_ACCEL / np.maximum(curvature, 1e-9)))
+    for _ in range(2):  # twice round, so the limits carry over the start line
+        for i in range(points):  # accelerating out of corners
+            speed[i] = min(speed[i], np.sqrt(speed[i - 1] ** 2 + 2 * TRACTION_ACCEL * step[i - 1]))
+        for i in range(points - 1, -1, -1):  # braking into them
+            nxt = (i + 1) % points
+            speed[i] = min(speed[i], np.sqrt(speed[nxt] ** 2 + 2 * BRAKING_ACCEL * step[i]))
+    time = np.concatenate(([0.0], np.cumsum(step / speed)[:-1]))
+
+    apex = np.flatnonzero((speed < np.roll(speed, 1)) & (speed <= np.roll(speed, -1)) & (speed < 0.9 * TOP_SPEED))
+    corners = pd.DataFrame({
+        'Number': np.arange(1, len(apex) + 1),
+        'Letter': '',
+        'X': x[apex],
+        'Y': y[apex],
+        'Angle': np.degrees(np.arctan2(y[apex] - y.mean(), x[apex] - x.mean())),  # labels outside the track
+        'Distance': distance[apex],
+    })
+    return {'x': x, 'y': y, 'distance': distance, 'speed': speed, 'time': time,
+            'lap_time': time[-1] + step[-1] / speed[-1], 'corners': corners}
+
+
+def lap_samples(track, lap_time, start):
+    """
+    Car data and position data of one lap driven in `lap_time` seconds from session time `start`, at SAMPLE_HZ.
+
+    Returns:
+        (car data, position data) frames with fastf1's columns except Date.
+    """
+    scale = track['lap_time'] / lap_time
+    elapsed = np.arange(0, lap_time, 1 / SAMPLE_HZ)
+    along = np.interp(elapsed * scale, track['time'], track['distance'])
+    speed = np.interp(along, track['distance'], track['speed']) * scale * 3.6
+    change = np.gradient(speed)
+    session_time = start + pd.to_timedelta(elapsed, unit='s')
+
+    gear = np.searchsorted(GEAR_SPEEDS, speed) + 1
+    low = np.take(np.concatenate(([0.0], GEAR_SPEEDS)), gear - 1)
+    high = np.take(np.concatenate((GEAR_SPEEDS, [350.0])), gear - 1)
+    car = pd.DataFrame({
+        'SessionTime': session_time,
+        'Time': pd.to_timedelta(elapsed, unit='s'),
+        'RPM': 9000 + 3000 * (speed - low) / (high - low),
+        'Speed': speed,
+        'nGear': gear,
+        'Throttle': np.where(change < -1.0, 0.0, np.where(speed > 0.97 * TOP_SPEED * 3.6, 100.0, 99.0)),
+        'Brake': change < -3.0,
+        'DRS': np.where(speed > 0.93 * TOP_SPEED * 3.6, DRS_OPEN, 0),
+        'Source': 'car',
+    })
+    pos = pd.DataFrame({
+        'SessionTime': session_time,
+        'Time': pd.to_timedelta(elapsed, unit='s'),
+        'X': np.interp(along, track['distance'], track['x']),
+        'Y': np.interp(along, track['distance'], track['y']),
+        'Z': 0.0,
+        'Status': 'OnTrack',
+        'Source': 'pos',
+    })
+    return car, pos
+
+
+def load(year, event, session_type):
+    """SessionRegistry loader: a synthetic session under the given name."""
+    return SyntheticSession(year, event, session_type)
+
+
+def entry_list(year, event, session_type):
+    """[(code, team, colour), ...] like driver_index.get_drivers."""
+    return [(code, team, colour) for code, _, team, colour in ENTRY_LIST]
@@ -0,0 +1,228 @@
+# HTTP telemetry service, so dashboards and notebooks can fetch laps without going through the Streamlit page.
+# It uses the same loading path as app.py (session_cache, driver_index, schedule_index, ...), so a session loaded
+# by one request is shared by every later one.
+#
+#   uvicorn telemetry_api:app --port 8000
+#
+# Arrays (telemetry, track, deltas) are sent as binary, not JSON:
+#   application/octet-stream                   little-endian float32 columns back to back; the X-Channels header
+#                                              lists them in order as name:length, e.g. "Distance:712,Speed:712"
+#   application/vnd.apache.arrow.stream        Arrow IPC stream (only if pyarrow is installed and asked for via Accept)
+# Every response carries a strong ETag and Cache-Control; send If-None-Match to get a 304 back.
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+
+import driver_index
+import lap_delta
+import schedule_index
+import session_cache
+from derived_channels import derived_channels, lap_key
+from track_geometry import get_track_geometry
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+CACHE_CONTROL = "public, max-age=86400"  # finished sessions don't change
+SCHEDULE_CACHE_CONTROL = "public, max-age=3600"
+MAX_CACHED_RESPONSES = 512
+MAX_DELTA_POINTS = 10000  # resampling grid per lap, well past the car data's own resolution
+
+session_cache.enable_cache()
+
+app = FastAPI(title="F1 Telemetry Viewer API")
+
+_lock = threading.Lock()
+_responses = OrderedDict()  # (path, query, media type) -> (etag, body, media type, extra headers)
+
+
+def _channel_arrays(channels):
+    return {name: np.ascontiguousarray(values, dtype='<f4') for name, values in channels.items()}
+
+
+def encode_binary(channels):
+    """Float32 columns back to back, plus the X-Channels header describing them."""
+    arrays = _channel_arrays(channels)
+    body = b"".join(arr.tobytes() for arr in arrays.values())
+    header = ",".join(f"{name}:{len(arr)}" for name, arr in arrays.items())
+    return body, {"X-Channels": header}
+
+
+def encode_arrow(channels):
+    """Arrow IPC stream with one float32 column per channel; shorter columns are padded with nulls."""
+    import pyarrow as pa
+
+    arrays = _channel_arrays(channels)
+    length = max((len(arr) for arr in arrays.values()), default=0)
+    columns = {}
+    for name, arr in arrays.items():
+        padded = np.zeros(length, dtype='<f4')
+        padded[:len(arr)] = arr
+        mask = np.arange(length) >= len(arr)
+        columns[name] = pa.array(padded, mask=mask)
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes(), {"X-Channels": ",".join(f"{name}:{len(arr)}" for name, arr in arrays.items())}
+
+
+def _wants_arrow(request):
+    if ARROW_MEDIA_TYPE not in request.headers.get("accept", ""):
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _respond(request, build, kind, cache_control=CACHE_CONTROL, build_headers=False):
+    """
+    Build (or reuse) a response body and serve it with a strong ETag.
+    A reused body is checked against If-None-Match without calling build, so a 304 never loads a session.
+
+    Args:
+        build (callable): Returns a dict of channels (kind='binary') or a JSON-able object (kind='json').
+        build_headers (bool): build returns (data, extra headers) instead, the headers are kept with the body.
+    """
+    arrow = kind == 'binary' and _wants_arrow(request)
+    media_type = ARROW_MEDIA_TYPE if arrow else (BINARY_MEDIA_TYPE if kind == 'binary' else "application/json")
+    key = (request.url.path, str(request.url.query), media_type)
+
+    with _lock:
+        cached = _responses.get(key)
+        if cached is not None:
+            _responses.move_to_end(key)
+    if cached is None:
+        data, headers = build() if build_headers else (build(), {})
+        if kind == 'json':
+            body, extra = json.dumps(data, separators=(",", ":"), default=str).encode(), {}
+        elif arrow:
+            body, extra = encode_arrow(data)
+        else:
+            body, extra = encode_binary(data)
+        extra.update(headers)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        cached = (etag, body, media_type, extra)
+        with _lock:
+            _responses[key] = cached
+            while len(_responses) > MAX_CACHED_RESPONSES:
+                _responses.popitem(last=False)
+
+    etag, body, media_type, extra = cached
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept", **extra}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _session(year, gp, session_type):
+    try:
+        return session_cache.get_session(year, gp, session_type)
+    except ValueError as e:  # fastf1 raises ValueError for unknown events / sessions
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def _pick_lap(session, driver, lap):
+    driver_laps = session.laps.pick_drivers(driver)
+    if driver_laps.empty:
+        raise HTTPException(status_code=404, detail=f"no laps for driver {driver}")
+    if lap == "fastest":
+        picked = driver_laps.pick_fastest()
+    else:
+        try:
+            picked = driver_laps.pick_laps(int(lap)).iloc[0]
+        except (ValueError, IndexError):
+            raise HTTPException(status_code=404, detail=f"{driver} has no lap {lap}")
+    if picked is None or picked.empty:
+        raise HTTPException(status_code=404, detail=f"{driver} has no timed lap")
+    return picked
+
+
+@app.get("/schedule/{year}")
+def schedule(year: int, request: Request):
+    return _respond(request, lambda: schedule_index.get_schedule(year), 'json', SCHEDULE_CACHE_CONTROL)
+
+
+@app.get("/drivers/{year}/{gp}/{session_type}")
+def drivers(year: int, gp: str, session_type: str, request: Request):
+    def build():
+        return [{"code": code, "team": team, "color": color}
+                for code, team, color in driver_index.get_drivers(year, gp, session_type)]
+    return _respond(request, build, 'json')
+
+
+@app.get("/laps/{year}/{gp}/{session_type}")
+def laps(year: int, gp: str, session_type: str, request: Request, driver: str = None):
+    def build():
+        session_laps = _session(year, gp, session_type).laps
+        if driver:
+            session_laps = session_laps.pick_drivers(driver)
+        frame = session_laps[['Driver', 'LapNumber', 'LapTime', 'Stint', 'Compound', 'TyreLife', 'IsPersonalBest']]
+        frame = frame.assign(LapTime=frame['LapTime'].dt.total_seconds())
+        return json.loads(frame.to_json(orient='records'))
+    return _respond(request, build, 'json')
+
+
+@app.get("/telemetry/{year}/{gp}/{session_type}/{driver}/{lap}")
+def telemetry(year: int, gp: str, session_type: str, driver: str, lap: str, request: Request,
+              channels: str = "Distance,Time,Speed,Throttle,Brake,nGear,DRS,RPM,Acceleration"):
+    """One lap's channels. lap is a lap number or 'fastest'."""
+    def build():
+        session = _session(year, gp, session_type)
+        picked = _pick_lap(session, driver, lap)
+        car = picked.get_car_data().add_distance()
+        derived = derived_channels(car, key=lap_key(session, picked))
+        available = {
+            'Distance': derived.distance,
+            'Time': derived.time,
+            'Speed': derived.speed,
+            'Throttle': derived.throttle,
+            'Brake': derived.brake_pct,
+            'nGear': derived.gear,
+            'DRS': derived.drs_open,
+            'RPM': car['RPM'].to_numpy(),
+            'Acceleration': derived.accel_smooth,
+            'AccelerationRaw': derived.accel_raw,
+        }
+        wanted = [name.strip() for name in channels.split(",") if name.strip()]
+        unknown = [name for name in wanted if name not in available]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown channels {unknown}, choose from {list(available)}")
+        return {name: available[name] for name in wanted}
+    return _respond(request, build, 'binary')
+
+
+@app.get("/track/{year}/{gp}/{session_type}")
+def track(year: int, gp: str, session_type: str, request: Request):
+    """Rotated centreline and corners. Corner labels are in the X-Corner-Labels header."""
+    def build():
+        geometry = get_track_geometry(_session(year, gp, session_type))
+        return {
+            'track_x': geometry.track[:, 0],
+            'track_y': geometry.track[:, 1],
+            'corner_x': geometry.corners[:, 0],
+            'corner_y': geometry.corners[:, 1],
+            'label_x': geometry.label_points[:, 0],
+            'label_y': geometry.label_points[:, 1],
+        }, {"X-Corner-Labels": ",".join(geometry.labels)}
+    return _respond(request, build, 'binary', build_headers=True)
+
+
+@app.get("/delta/{year}/{gp}/{session_type}")
+def delta(year: int, gp: str, session_type: str, request: Request,
+          drivers: str = None, reference: str = None, points: int = Query(1000, ge=2, le=MAX_DELTA_POINTS)):
+    """Fastest-lap deltas against a reference driver: a Distance column plus one column per driver."""
+    def build():
+        session = _session(year, gp, session_type)
+        wanted = [d.strip() for d in drivers.split(",")] if drivers else None
+        try:
+            result = lap_delta.fastest_lap_deltas(session, drivers=wanted, reference=reference, num_points=points)
+        except ValueError as e:  # reference not among the laps
+            raise HTTPException(status_code=400, detail=str(e))
+        return {'Distance': result.distance, **dict(zip(result.labels, result.delta))}
+    return _respond(request, build, 'binary')
@@ -0,0 +1,244 @@
+# Columnar, memory-mapped telemetry store.
+# fastf1 keeps each session as pickled whole-session frames (the .ff1pkl files in cache/), so getting one lap of car
+# data means unpickling everything. Ingesting a session once writes one .npy file per channel per driver plus a
+# lap offset index; reading a lap afterwards is np.load(mmap_mode='r') and a slice, i.e. a view into the file.
+#
+# Layout:
+#   telemetry_store/<year>/<Event_Name>/<session>/manifest.json
+#   telemetry_store/<year>/<Event_Name>/<session>/<DRV>/car/<Column>.npy
+#   telemetry_store/<year>/<Event_Name>/<session>/<DRV>/pos/<Column>.npy
+#   telemetry_store/<year>/<Event_Name>/<session>/<DRV>/laps.npy
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+
+STORE_DIR = "telemetry_store"
+
+# channel -> on-disk dtype. Time is seconds since the start of the lap the sample belongs to,
+# SessionTime is seconds since the session started (kept as float64 so it doesn't lose precision late in a race).
+CAR_COLUMNS = {
+    'SessionTime': np.float64,
+    'Time': np.float32,
+    'Distance': np.float32,
+    'Speed': np.float32,
+    'Throttle': np.float32,
+    'Brake': np.bool_,
+    'nGear': np.int8,
+    'DRS': np.int8,
+    'RPM': np.float32,
+}
+POS_COLUMNS = {
+    'SessionTime': np.float64,
+    'Time': np.float32,
+    'X': np.float32,
+    'Y': np.float32,
+}
+
+LAP_INDEX_DTYPE = np.dtype([
+    ('LapNumber', np.int16),
+    ('LapTime', np.float64),   # seconds, NaN if fastf1 has no lap time
+    ('car_start', np.int64),
+    ('car_stop', np.int64),
+    ('pos_start', np.int64),
+    ('pos_stop', np.int64),
+])
+
+
+def session_dir(year, event, session_type, root=STORE_DIR):
+    return os.path.join(root, str(int(year)), str(event).replace(' ', '_'), str(session_type))
+
+
+def _seconds(td):
+    """Timedelta series -> float seconds (NaT becomes NaN)."""
+    return td.dt.total_seconds().to_numpy(dtype=np.float64)
+
+
+def lap_bounds(session_time, lap_starts, lap_ends):
+    """Offsets of each lap in a SessionTime-sorted sample array (NaN bounds give an empty slice)."""
+    valid = ~(np.isnan(lap_starts) | np.isnan(lap_ends))
+    starts = np.zeros(len(lap_starts), dtype=np.int64)
+    stops = np.zeros(len(lap_ends), dtype=np.int64)
+    starts[valid] = np.searchsorted(session_time, lap_starts[valid], side='left')
+    stops[valid] = np.searchsorted(session_time, lap_ends[valid], side='right')
+    return starts, stops
+
+
+def _lap_relative(values, starts, stops, per_lap):
+    """Apply per_lap(segment) to each lap's slice of values, vectorised over the segment itself."""
+    out = np.full(len(values), np.nan, dtype=np.float64)
+    for a, b in zip(starts, stops):
+        if b > a:
+            out[a:b] = per_lap(values[a:b])
+    return out
+
+
+def _write_columns(folder, columns, frame, dtypes):
+    os.makedirs(folder, exist_ok=True)
+    for name, dtype in dtypes.items():
+        values = columns[name] if name in columns else frame[name].to_numpy()
+        if np.issubdtype(np.dtype(dtype), np.integer):
+            values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0)
+        np.save(os.path.join(folder, f"{name}.npy"), np.ascontiguousarray(values, dtype=dtype))
+
+
+def ingest_session(session, year, event, session_type, root=STORE_DIR):
+    """
+    Write every driver's car and position data of a loaded session to the columnar store.
+
+    Args:
+        session (fastf1.core.Session): A fully loaded session (see session_cache.get_session).
+        year (int), event (str), session_type (str): Key the session is stored under.
+        root (str): Store directory.
+
+    Returns:
+        str: The session directory that was written.
+    """
+    folder = session_dir(year, event, session_type, root)
+    drivers = []
+
+    for drv_number in session.drivers:
+        driver_laps = session.laps.pick_drivers(drv_number)
+        if driver_laps.empty or drv_number not in session.car_data:
+            continue
+        code = driver_laps['Driver'].iloc[0]
+
+        car = session.car_data[drv_number].sort_values('SessionTime')
+        pos = session.pos_data[drv_number].sort_values('SessionTime')
+        car_st = _seconds(car['SessionTime'])
+        pos_st = _seconds(pos['SessionTime'])
+
+        lap_starts = _seconds(driver_laps['LapStartTime'])
+        lap_ends = _seconds(driver_laps['Time'])
+        car_start, car_stop = lap_bounds(car_st, lap_starts, lap_ends)
+        pos_start, pos_stop = lap_bounds(pos_st, lap_starts, lap_ends)
+
+        # Time and Distance restart at every lap so a stored slice looks like lap.get_car_data().add_distance()
+        car_time = _lap_relative(car_st, car_start, car_stop, lambda t: t - t[0])
+        speed_ms = car['Speed'].to_numpy(dtype=np.float64) / 3.6
+        dt = np.diff(car_st, prepend=car_st[:1])
+        step = speed_ms * dt
+        car_distance = _lap_relative(step, car_start, car_stop, lambda s: np.cumsum(s) - s[0])
+        pos_time = _lap_relative(pos_st, pos_start, pos_stop, lambda t: t - t[0])
+
+        driver_dir = os.path.join(folder, code)
+        _write_columns(os.path.join(driver_dir, 'car'),
+                       {'SessionTime': car_st, 'Time': car_time, 'Distance': car_distance},
+                       car, CAR_COLUMNS)
+        _write_columns(os.path.join(driver_dir, 'pos'),
+                       {'SessionTime': pos_st, 'Time': pos_time},
+                       pos, POS_COLUMNS)
+
+        index = np.zeros(len(driver_laps), dtype=LAP_INDEX_DTYPE)
+        index['LapNumber'] = np.nan_to_num(driver_laps['LapNumber'].to_numpy(dtype=np.float64), nan=0)
+        index['LapTime'] = _seconds(driver_laps['LapTime'])
+        index['car_start'], index['car_stop'] = car_start, car_stop
+        index['pos_start'], index['pos_stop'] = pos_start, pos_stop
+        np.save(os.path.join(driver_dir, 'laps.npy'), index)
+        drivers.append(code)
+
+    manifest = {
+        'year': int(year),
+        'event': str(event),
+        'session': str(session_type),
+        'drivers': drivers,
+        'car_columns': {k: np.dtype(v).str for k, v in CAR_COLUMNS.items()},
+        'pos_columns': {k: np.dtype(v).str for k, v in POS_COLUMNS.items()},
+    }
+    with open(os.path.join(folder, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return folder
+
+
+class StoredSession:
+    """Read side of one ingested session. Every array handed out is a read-only view of a memory map."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        with open(os.path.join(folder, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    @property
+    def drivers(self):
+        return list(self.manifest['drivers'])
+
+    def _mmap(self, *parts):
+        path = os.path.join(self.folder, *parts)
+        arr = self._maps.get(path)
+        if arr is None:
+            with self._lock:
+                arr = self._maps.get(path)
+                if arr is None:
+                    arr = self._maps[path] = np.load(path, mmap_mode='r')
+        return arr
+
+    def laps(self, driver):
+        """The lap offset index of one driver (structured array, see LAP_INDEX_DTYPE)."""
+        return self._mmap(driver, 'laps.npy')
+
+    def _lap_row(self, driver, lap_number):
+        laps = self.laps(driver)
+        rows = np.flatnonzero(laps['LapNumber'] == lap_number)
+        if not len(rows):
+            raise KeyError(f"{driver} has no lap {lap_number} in {self.folder}")
+        return laps[rows[0]]
+
+    def fastest_lap_number(self, driver):
+        laps = self.laps(driver)
+        lap_times = np.where(np.isnan(laps['LapTime']), np.inf, laps['LapTime'])
+        return int(laps['LapNumber'][np.argmin(lap_times)])
+
+    def _channels(self, driver, stream, columns, start, stop):
+        return {name: self._mmap(driver, stream, f"{name}.npy")[start:stop] for name in columns}
+
+    def lap_car_data(self, driver, lap_number, columns=None):
+        """Like lap.get_car_data().add_distance(), as a dict of zero-copy column views."""
+        row = self._lap_row(driver, lap_number)
+        return self._channels(driver, 'car', columns or self.manifest['car_columns'],
+                              int(row['car_start']), int(row['car_stop']))
+
+    def lap_pos_data(self, driver, lap_number, columns=None):
+        """Like lap.get_pos_data(), as a dict of zero-copy column views."""
+        row = self._lap_row(driver, lap_number)
+        return self._channels(driver, 'pos', columns or self.manifest['pos_columns'],
+                              int(row['pos_start']), int(row['pos_stop']))
+
+
+def open_session(year, event, session_type, root=STORE_DIR):
+    """Open an ingested session, or return None if it hasn't been ingested yet."""
+    folder = session_dir(year, event, session_type, root)
+    if not os.path.exists(os.path.join(folder, 'manifest.json')):
+        return None
+    return StoredSession(folder)
+
+
+def as_frame(columns):
+    """Turn a dict of column views into a DataFrame for code that wants pandas (this copies)."""
+    import pandas as pd
+    return pd.DataFrame({name: np.asarray(values) for name, values in columns.items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest fastf1 sessions into the columnar telemetry store.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("event", help="Grand Prix name, e.g. 'Abu Dhabi'")
+    parser.add_argument("sessions", nargs="+", help="session identifiers, e.g. Q R")
+    parser.add_argument("--store", default=STORE_DIR, help="store directory (default: %(default)s)")
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    import session_cache
+
+    session_cache.enable_cache(args.cache)
+    for session_type in args.sessions:
+        session = session_cache.get_session(args.year, args.event, session_type)
+        folder = ingest_session(session, args.year, args.event, session_type, args.store)
+        print(f"wrote {folder}")
+
+
+if __name__ == "__main__":
+    main()
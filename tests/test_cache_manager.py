@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import threading
+import time
+
+import cache_manager
+
+
+def make_session(root, event, session, size, age_s):
+    """A fake fastf1 session directory of `size` bytes, last used `age_s` seconds ago."""
+    path = os.path.join(root, "2022", event, session)
+    os.makedirs(path)
+    with open(os.path.join(path, "laps.ff1pkl"), "wb") as f:
+        f.write(b"x" * size)
+    used = time.time() - age_s
+    os.utime(os.path.join(path, "laps.ff1pkl"), (used, used))
+    return path
+
+
+def test_evicts_least_recently_used_first(tmp_path):
+    root = str(tmp_path)
+    oldest = make_session(root, "2022-03-20_Bahrain_Grand_Prix", "2022-03-19_Qualifying", 1000, 3000)
+    middle = make_session(root, "2022-04-10_Australian_Grand_Prix", "2022-04-09_Qualifying", 1000, 2000)
+    newest = make_session(root, "2022-04-10_Australian_Grand_Prix", "2022-04-10_Race", 1000, 1000)
+
+    removed = cache_manager.evict(max_bytes=1500, cache_dir=root, min_idle=0)
+
+    assert [path for path, _ in removed] == [oldest, middle]
+    assert not os.path.exists(oldest) and not os.path.exists(middle)
+    assert os.path.exists(newest)
+
+
+def test_removes_empty_parent_directories_only(tmp_path):
+    root = str(tmp_path)
+    lone = make_session(root, "2022-03-20_Bahrain_Grand_Prix", "2022-03-19_Qualifying", 1000, 3000)
+    make_session(root, "2022-04-10_Australian_Grand_Prix", "2022-04-10_Race", 1000, 1000)
+
+    cache_manager.evict(max_bytes=1000, cache_dir=root, min_idle=0)
+
+    assert not os.path.exists(os.path.dirname(lone))       # the event had no other session
+    assert os.path.isdir(os.path.join(root, "2022"))       # the season still has one
+    assert os.path.isdir(root)
+
+
+def test_min_idle_keeps_recent_sessions(tmp_path):
+    root = str(tmp_path)
+    old = make_session(root, "2022-03-20_Bahrain_Grand_Prix", "2022-03-19_Qualifying", 1000, 3000)
+    recent = make_session(root, "2022-04-10_Australian_Grand_Prix", "2022-04-10_Race", 1000, 60)
+
+    removed = cache_manager.evict(max_bytes=0, cache_dir=root, min_idle=600)
+
+    assert [path for path, _ in removed] == [old]
+    assert os.path.exists(recent)
+
+
+def test_use_stamp_counts_as_recent(tmp_path):
+    root = str(tmp_path)
+    stamped = make_session(root, "2022-03-20_Bahrain_Grand_Prix", "2022-03-19_Qualifying", 1000, 3000)
+    other = make_session(root, "2022-04-10_Australian_Grand_Prix", "2022-04-10_Race", 1000, 2000)
+    open(os.path.join(stamped, cache_manager.USE_MARKER), "w").close()
+
+    removed = cache_manager.evict(max_bytes=1000, cache_dir=root, min_idle=0)
+
+    assert [path for path, _ in removed] == [other]
+
+
+def test_dry_run_deletes_nothing(tmp_path):
+    root = str(tmp_path)
+    path = make_session(root, "2022-03-20_Bahrain_Grand_Prix", "2022-03-19_Qualifying", 1000, 3000)
+
+    removed = cache_manager.evict(max_bytes=0, cache_dir=root, dry_run=True, min_idle=0)
+
+    assert removed == [(path, 1000)]
+    assert os.path.exists(path)
+
+
+def test_http_cache_is_not_part_of_the_budget(tmp_path):
+    root = str(tmp_path)
+    path = make_session(root, "2022-03-20_Bahrain_Grand_Prix", "2022-03-19_Qualifying", 1000, 3000)
+    with open(os.path.join(root, cache_manager.HTTP_CACHE_FILE), "wb") as f:
+        f.write(b"x" * 10000)
+
+    assert cache_manager.evict(max_bytes=2000, cache_dir=root, min_idle=0) == []
+    assert os.path.exists(path)
+
+
+def test_trim_http_cache_drops_expired_responses(tmp_path):
+    root = str(tmp_path)
+    conn = sqlite3.connect(os.path.join(root, cache_manager.HTTP_CACHE_FILE))
+    conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, value BLOB, expires INTEGER)")
+    now = int(time.time())
+    conn.executemany("INSERT INTO responses VALUES (?, ?, ?)",
+                     [(f"old{i}", b"x" * 10000, now - 60) for i in range(50)] + [("fresh", b"y", now + 3600)])
+    conn.commit()
+    conn.close()
+
+    assert cache_manager.trim_http_cache(root) > 0
+    conn = sqlite3.connect(os.path.join(root, cache_manager.HTTP_CACHE_FILE))
+    assert [key for key, in conn.execute("SELECT key FROM responses")] == ["fresh"]
+    conn.close()
+
+
+def test_maybe_evict_runs_off_the_calling_thread(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    old = make_session(root, "2022-03-20_Bahrain_Grand_Prix", "2022-03-19_Qualifying", 1000, 3000)
+    monkeypatch.setenv("F1_CACHE_MAX_MB", "0")
+    monkeypatch.setattr(cache_manager, "_last_evict", 0.0)
+
+    thread = cache_manager.maybe_evict(root)
+    assert thread is not None and thread is not threading.current_thread()
+    thread.join(10)
+
+    assert not os.path.exists(old)
+    assert cache_manager.maybe_evict(root) is None  # not again within EVICT_INTERVAL_S
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import corner_analysis
+import synthetic_session
+
+
+@pytest.fixture(scope="module")
+def session():
+    return synthetic_session.load(2022, "Synthetic", "Q")
+
+
+def test_one_row_per_driver_and_corner(session):
+    table = corner_analysis.fastest_lap_corners(session)
+    labels, _, _ = corner_analysis.corner_layout(session)
+
+    assert list(table.columns) == corner_analysis.CORNER_COLUMNS
+    assert len(table) == session.laps['Driver'].nunique() * len(labels)
+    # the segments tile the lap, so their times add up to the lap (to within one car data sample)
+    for _, rows in table.groupby('Driver'):
+        assert abs(rows['SegmentTime'].sum() - rows['LapTime'].iloc[0]) < 1 / synthetic_session.SAMPLE_HZ
+
+
+def test_segments_match_a_per_corner_loop(session):
+    labels, _, bounds = corner_analysis.corner_layout(session)
+    lap = session.laps.pick_drivers("LEC").pick_fastest()
+    table = corner_analysis.fastest_lap_corners(session, drivers=["LEC"])
+
+    car = lap.get_car_data().add_distance()
+    distance = car['Distance'].to_numpy()
+    speed = car['Speed'].to_numpy(dtype=np.float64)
+    brake = car['Brake'].to_numpy()
+    fraction = distance / distance[-1]
+    for k, row in enumerate(table.itertuples()):
+        inside = (fraction >= bounds[k]) & ((fraction < bounds[k + 1]) | (k == len(labels) - 1))
+        assert row.Corner == labels[k]
+        assert row.MinSpeed == pytest.approx(speed[inside].min())
+        if brake[inside].any():
+            assert row.BrakingPoint == pytest.approx(distance[inside][brake[inside]][0])
+        else:
+            assert np.isnan(row.BrakingPoint)
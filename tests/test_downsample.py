@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import downsample
+import synthetic_session
+
+
+@pytest.fixture(scope="module")
+def race_telemetry():
+    session = synthetic_session.load(2022, "Synthetic", "R")
+    return session.laps.pick_drivers("LEC").get_car_data().add_distance()  # the whole race, thousands of samples
+
+
+def test_lttb_keeps_the_ends_and_the_speed_envelope(race_telemetry):
+    x = race_telemetry['Distance'].to_numpy(dtype=np.float64)
+    y = race_telemetry['Speed'].to_numpy(dtype=np.float64)
+
+    idx = downsample.lttb_indices(x, y, 500)
+
+    assert len(idx) == 500 and idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    # the peaks and troughs are what the triangles pick: the kept range is within a few km/h of the full one
+    assert y[idx].max() > y.max() - 5 and y[idx].min() < y.min() + 5
+
+
+def test_minmax_keeps_every_buckets_extremes(race_telemetry):
+    gear = race_telemetry['nGear'].to_numpy(dtype=np.float64)
+
+    idx = downsample.minmax_indices(gear, 200)
+
+    assert len(idx) <= 202 and idx[0] == 0 and idx[-1] == len(gear) - 1
+    assert np.all(np.diff(idx) > 0)
+    # every bucket's lowest and highest gear survives, so no downshift or upshift peak disappears
+    size = int(np.ceil(len(gear) / 100))
+    for start in range(0, len(gear), size):
+        bucket = gear[start:start + size]
+        kept = gear[idx[(idx >= start) & (idx < start + size)]]
+        assert kept.min() == bucket.min() and kept.max() == bucket.max()
+
+
+def test_small_traces_are_left_alone(race_telemetry):
+    x = race_telemetry['Distance'].to_numpy()[:100]
+    y = race_telemetry['Speed'].to_numpy()[:100]
+
+    dx, dy = downsample.downsample(x, y, budget=downsample.DEFAULT_POINT_BUDGET)
+
+    np.testing.assert_array_equal(dx, x)
+    np.testing.assert_array_equal(dy, y)
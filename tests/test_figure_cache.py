@@ -0,0 +1,42 @@
+import os
+
+from figure_cache import FigureCache
+
+SESSION = (2022, "Synthetic", "Q")
+OTHER = (2022, "Synthetic", "R")
+
+
+def json_files(root):
+    return sorted(name for _, _, names in os.walk(root) for name in names if name.endswith(".json"))
+
+
+def test_invalidate_drops_the_sessions_disk_files(tmp_path):
+    cache = FigureCache(disk_dir=str(tmp_path))
+    key = cache.make_key(SESSION, "LEC", "fastest", "speed")
+    other = cache.make_key(OTHER, "LEC", "fastest", "speed")
+    cache.put(key, '{"data": []}')
+    cache.put(other, '{"data": [1]}')
+
+    cache.invalidate(SESSION)
+
+    assert FigureCache(disk_dir=str(tmp_path)).get(key) is None  # a fresh process doesn't find it on disk either
+    assert FigureCache(disk_dir=str(tmp_path)).get(other) == '{"data": [1]}'
+    assert cache.disk_bytes() == len('{"data": [1]}')
+
+
+def test_disk_tier_keeps_a_running_total_under_budget(tmp_path):
+    cache = FigureCache(disk_dir=str(tmp_path), max_disk_bytes=25)
+    keys = [cache.make_key(SESSION, driver, "fastest", "speed") for driver in ("LEC", "VER", "HAM")]
+    for key in keys:
+        cache.put(key, "x" * 10)
+
+    assert cache.disk_bytes() == 20
+    assert len(json_files(tmp_path)) == 2
+    assert FigureCache(disk_dir=str(tmp_path)).get(keys[0]) is None  # the oldest write went first
+
+
+def test_keys_carry_the_format_version():
+    import figure_cache
+
+    key = FigureCache.make_key(SESSION, "LEC", "fastest", "speed")
+    assert key[0][0] == figure_cache.FORMAT_VERSION
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import lap_delta
+import synthetic_session
+
+
+@pytest.fixture(scope="module")
+def session():
+    return synthetic_session.load(2022, "Synthetic", "Q")
+
+
+def test_batched_resampling_matches_one_interp_per_lap(session):
+    laps = [lap for _, lap in session.laps.pick_drivers("LEC").iterlaps()][:4]
+    traces = [lap_delta.lap_trace(lap) for lap in laps]
+
+    grid, times = lap_delta.resample_traces([d for d, _ in traces], [t for _, t in traces], num_points=500)
+
+    assert grid[-1] == min(d[-1] for d, _ in traces)
+    for row, (distance, time) in zip(times, traces):
+        np.testing.assert_allclose(row, np.interp(grid, distance, time))
+
+
+def test_fastest_lap_deltas_against_a_reference_driver(session):
+    fastest = session.laps.pick_fastest()['Driver']
+    reference = next(driver for driver in session.laps['Driver'].unique() if driver != fastest)
+
+    deltas = lap_delta.fastest_lap_deltas(session, reference=reference)
+
+    assert deltas.reference == reference
+    assert sorted(deltas.labels) == sorted(session.laps['Driver'].unique())
+    assert not deltas.row(reference).any()
+    assert deltas.row(fastest)[-1] < 0  # quicker than the reference over the lap
+
+
+def test_reference_without_a_timed_lap_is_a_clear_error(session):
+    with pytest.raises(ValueError, match="has no timed lap"):
+        lap_delta.fastest_lap_deltas(session, drivers=["LEC", "VER"], reference="HAM")
@@ -0,0 +1,65 @@
+import json
+
+import load_test
+
+
+def test_default_run_completes_clicks_offline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # track geometry and the like stay out of the repository
+    result_path = tmp_path / "load.json"
+
+    status = load_test.main(["--users", "2", "--clicks", "2", "--json", str(result_path)])
+
+    result = json.loads(result_path.read_text())
+    assert status == 0
+    assert result['summary']['clicks'] == 4
+    assert result['summary']['errors'] == 0
+    assert all("track map" in record['stages'] for record in result['records'])
+
+
+def test_every_option_of_a_race_click(tmp_path, monkeypatch):
+    import session_cache
+    import synthetic_session
+    from figure_cache import FIGURES
+
+    monkeypatch.chdir(tmp_path)
+    FIGURES.invalidate((2022, "Synthetic", "R"))  # nothing cached from other tests, every stage runs
+    registry = session_cache.SessionRegistry(loader=synthetic_session.load)
+    figures, tables = [], []
+
+    timer = load_test.load_fastest_lap(
+        2022, "Synthetic", "R", "LEC", separate_charts=True, compare_field=True, corner_breakdown=True,
+        race_pace=True, show_figure=figures.append, show_table=tables.append, log_path=None, loader=registry.get)
+
+    assert list(timer.durations) == ["session load", "lap pick", "car data", "derived channels", "track map",
+                                     "lap times", "telemetry figures", "lap delta", "corner analysis",
+                                     "stint analysis"]
+    assert len(figures) == 10 and len(tables) == 3
+
+
+def test_failed_clicks_fail_the_run(tmp_path, monkeypatch):
+    def broken_click(*args, **kwargs):
+        raise RuntimeError("no data")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(load_test, "load_fastest_lap", broken_click)
+    assert load_test.main(["--users", "1", "--clicks", "2"]) == 1
+
+
+def test_cold_replay_run_removes_its_cache(tmp_path, monkeypatch):
+    import tempfile
+
+    import session_cache
+    import synthetic_fixtures
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+    (tmp_path / "tmp").mkdir()
+    synthetic_fixtures.write_fixtures(str(tmp_path / "fixtures"), 2022, "Synthetic", ["Q"])
+    try:
+        status = load_test.main(["--users", "2", "--clicks", "1", "--sessions", "2022:Synthetic:Q",
+                                 "--replay-fixtures", str(tmp_path / "fixtures"), "--cold"])
+    finally:
+        session_cache.REGISTRY.invalidate(2022, "Synthetic", "Q")
+
+    assert status == 0
+    assert list((tmp_path / "tmp").iterdir()) == []
@@ -0,0 +1,69 @@
+import replay_server
+
+INDEX_URL = "https://livetiming.formula1.com/static/2022/Index.json"
+
+
+def test_fastf1_requests_are_served_from_fixtures(tmp_path):
+    from fastf1 import Cache
+
+    fixtures = str(tmp_path / "fixtures")
+    replay_server.save_fixture(fixtures, INDEX_URL, b'{"Years": []}', "application/json")
+    server = replay_server.ReplayServer(("127.0.0.1", 0), fixtures).start()
+    try:
+        (tmp_path / "cache").mkdir()
+        Cache.enable_cache(str(tmp_path / "cache"))
+        replay_server.use_replay(server.url)
+
+        response = Cache.requests_get(INDEX_URL)
+        missing = Cache.requests_get("https://livetiming.formula1.com/static/2022/Missing.json")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.status_code == 200
+    assert response.json() == {"Years": []}
+    assert missing.status_code == 404
+    assert server.stats["hits"] == 1 and server.stats["misses"] == 1
+    assert server.missing == ["/livetiming.formula1.com/static/2022/Missing.json"]
+
+
+def test_hydration_is_opt_in(monkeypatch):
+    import session_cache
+
+    monkeypatch.setenv("F1_REPLAY_URL", "http://127.0.0.1:8765")
+    monkeypatch.delenv("F1_REPLAY_HYDRATE", raising=False)
+    assert not session_cache.replay_hydrate()
+    monkeypatch.setenv("F1_REPLAY_HYDRATE", "1")
+    assert session_cache.replay_hydrate()
+
+
+def test_cold_load_of_synthetic_fixtures(tmp_path):
+    import fastf1
+    from fastf1 import Cache
+
+    import synthetic_fixtures
+    import synthetic_session
+
+    fixtures = str(tmp_path / "fixtures")
+    synthetic_fixtures.write_fixtures(fixtures, 2022, "Synthetic", ["Q"])
+    server = replay_server.ReplayServer(("127.0.0.1", 0), fixtures).start()
+    try:
+        (tmp_path / "cache").mkdir()  # empty: every response is downloaded and parsed
+        Cache.enable_cache(str(tmp_path / "cache"))
+        replay_server.use_replay(server.url)
+
+        session = fastf1.get_session(2022, "Synthetic", "Q")
+        session.load()
+        corners = session.get_circuit_info().corners  # from the MultiViewer API
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    expected = synthetic_session.SyntheticSession(2022, "Synthetic", "Q")
+    assert len(session.laps) == len(expected.laps)
+    fastest = session.laps.pick_drivers("LEC").pick_fastest()
+    assert abs((fastest['LapTime'] - expected.laps.pick_drivers("LEC").pick_fastest()['LapTime']).total_seconds()) < 1e-3
+    telemetry = fastest.get_car_data().add_distance()
+    assert telemetry['Distance'].iloc[-1] > 4500 and telemetry['Speed'].max() > 300
+    assert len(corners) == len(expected.get_circuit_info().corners)
+    assert not [path for path in server.missing if path.startswith("/livetiming.formula1.com/")]
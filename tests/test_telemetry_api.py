@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import session_cache
+    import synthetic_session
+
+    monkeypatch.chdir(tmp_path)  # the fastf1 cache and track geometry stay out of the repository
+    import telemetry_api
+
+    loads = []
+
+    def load(year, event, session_type):
+        loads.append((year, event, session_type))
+        return synthetic_session.load(year, event, session_type)
+
+    registry = session_cache.SessionRegistry(loader=load)
+    monkeypatch.setattr(session_cache, "get_session", registry.get)
+    monkeypatch.setattr(telemetry_api, "_responses", OrderedDict())  # no responses from other tests
+    client = TestClient(telemetry_api.app)
+    client.loads = loads
+    return client
+
+
+def test_telemetry_is_binary_with_an_etag(client):
+    response = client.get("/telemetry/2022/Synthetic/Q/LEC/fastest", params={"channels": "Distance,Speed"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    lengths = [int(part.split(":")[1]) for part in response.headers["X-Channels"].split(",")]
+    assert [part.split(":")[0] for part in response.headers["X-Channels"].split(",")] == ["Distance", "Speed"]
+    columns = np.split(np.frombuffer(response.content, dtype='<f4'), np.cumsum(lengths)[:-1])
+    assert columns[0][-1] > 4500 and columns[1].max() > 300
+    assert response.headers["ETag"].startswith('"')
+
+
+def test_matching_etag_is_a_304_without_a_load(client):
+    url = "/telemetry/2022/Synthetic/Q/LEC/fastest"
+    etag = client.get(url).headers["ETag"]
+    client.loads.clear()
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["ETag"] == etag
+    assert client.loads == []
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_unknown_driver_or_lap_is_a_404(client):
+    assert client.get("/telemetry/2022/Synthetic/Q/XXX/fastest").status_code == 404
+    assert client.get("/telemetry/2022/Synthetic/Q/LEC/999").status_code == 404
+    assert client.get("/telemetry/2022/Synthetic/Q/LEC/fastest", params={"channels": "Nope"}).status_code == 400
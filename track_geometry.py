@@ -0,0 +1,123 @@
+# Cached track geometry: rotated centreline, corner positions, labels and label points, per circuit and season.
+# Track_plot and Trackplot used to redo the rotation and loop over every corner on each click; a circuit's layout
+# doesn't change within a season, so it is computed once (vectorised) and reused by both the Plotly and matplotlib maps.
+import json
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+GEOMETRY_DIR = "track_geometry"
+LABEL_OFFSET = 700  # how far (in track units) the corner labels sit away from the racing line
+
+
+@dataclass(frozen=True)
+class TrackGeometry:
+    location: str
+    year: int
+    track: np.ndarray         # (N, 2) rotated centreline
+    corners: np.ndarray       # (K, 2) rotated corner positions
+    labels: list              # K corner labels, e.g. '9A'
+    label_points: np.ndarray  # (K, 2) rotated label positions, offset from the corner along its angle
+
+
+def rotate(xy, *, angle):
+    """Rotate an (x, y) coordinate array by a given angle in radians."""
+    rot_mat = np.array([[np.cos(angle), np.sin(angle)],
+                        [-np.sin(angle), np.cos(angle)]])
+    return np.matmul(xy, rot_mat)
+
+
+def compute_track_geometry(session, lap=None):
+    """Geometry of the session's circuit from one lap's position data (default: the session's fastest lap)."""
+    if lap is None:
+        lap = session.laps.pick_fastest()
+    pos = lap.get_pos_data()
+    circuit_info = session.get_circuit_info()
+    track_angle = circuit_info.rotation / 180 * np.pi
+
+    corners = circuit_info.corners
+    corner_xy = corners[['X', 'Y']].to_numpy(dtype=np.float64)
+    # rotate([LABEL_OFFSET, 0], angle=a) for every corner at once
+    corner_angles = corners['Angle'].to_numpy(dtype=np.float64) / 180 * np.pi
+    offsets = LABEL_OFFSET * np.column_stack([np.cos(corner_angles), np.sin(corner_angles)])
+    labels = (corners['Number'].astype(str) + corners['Letter'].fillna('').astype(str)).tolist()
+
+    return TrackGeometry(
+        location=session.event['Location'],
+        year=int(session.event['EventDate'].year),
+        track=rotate(pos[['X', 'Y']].to_numpy(dtype=np.float64), angle=track_angle),
+        corners=rotate(corner_xy, angle=track_angle).reshape(-1, 2),
+        labels=labels,
+        label_points=rotate(corner_xy + offsets, angle=track_angle).reshape(-1, 2),
+    )
+
+
+def _path(location, year, root):
+    return os.path.join(root, f"{int(year)}_{location.replace(' ', '_')}.json")
+
+
+def _save(geometry, root):
+    os.makedirs(root, exist_ok=True)
+    data = {
+        'location': geometry.location,
+        'year': geometry.year,
+        'track': geometry.track.tolist(),
+        'corners': geometry.corners.tolist(),
+        'labels': geometry.labels,
+        'label_points': geometry.label_points.tolist(),
+    }
+    with open(_path(geometry.location, geometry.year, root), 'w') as f:
+        json.dump(data, f)
+
+
+def _load(location, year, root):
+    path = _path(location, year, root)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    return TrackGeometry(
+        location=data['location'],
+        year=data['year'],
+        track=np.array(data['track']).reshape(-1, 2),
+        corners=np.array(data['corners']).reshape(-1, 2),
+        labels=data['labels'],
+        label_points=np.array(data['label_points']).reshape(-1, 2),
+    )
+
+
+_lock = threading.Lock()
+_geometries = {}  # (location, year) -> TrackGeometry
+
+
+def get_track_geometry(session, root=GEOMETRY_DIR):
+    """Track geometry for the session's circuit and season: memory, then disk, then computed once and stored."""
+    key = (session.event['Location'], int(session.event['EventDate'].year))
+    geometry = _geometries.get(key)
+    if geometry is not None:
+        return geometry
+    with _lock:
+        geometry = _geometries.get(key)
+        if geometry is None:
+            geometry = _load(*key, root)
+            if geometry is None:
+                geometry = compute_track_geometry(session)
+                _save(geometry, root)
+            _geometries[key] = geometry
+    return geometry
+
+
+def invalidate(location=None, year=None, root=GEOMETRY_DIR):
+    """Forget one circuit/season (memory and disk), or every cached geometry if called without arguments."""
+    with _lock:
+        if location is None:
+            _geometries.clear()
+            paths = [os.path.join(root, name) for name in os.listdir(root)] if os.path.isdir(root) else []
+        else:
+            _geometries.pop((location, int(year)), None)
+            paths = [_path(location, year, root)]
+    for path in paths:
+        if path.endswith('.json') and os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,113 @@
+# Vehicle load model from F1.py / "Tutorial Tyre Load.ipynb", as a reusable module.
+# Static weight distribution, drag, downforce and inertial + aero load transfer, for every sample of every lap
+# of every driver at once (see lap_batch.py for the ragged layout), with per-lap peak / mean summaries.
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+import lap_batch
+
+
+@dataclass(frozen=True)
+class CarParameters:
+    """Car parameters of the load model. Defaults are the values F1.py has always used."""
+    m: float = 798.0                        # kg
+    g: float = 9.81
+    fraction_weight_front: float = 0.46
+    rho: float = 1.225                      # air density
+    cda: float = 1.7                        # drag coefficient * frontal area
+    efficiency: float = 3.7                 # ClA / CdA
+    drag_height: float = 0.5                # m, height at which the drag force is applied
+    fraction_downforce_front: float = 0.4   # aero balance
+    cog_height: float = 0.25                # m
+    wheelbase: float = 3.6                  # m
+
+    @property
+    def cla(self):
+        return self.efficiency * self.cda
+
+    def with_changes(self, **changes):
+        return replace(self, **changes)
+
+
+@dataclass
+class AxleLoads:
+    """Per-sample model outputs (N). Shapes follow the speed / acceleration inputs, so they broadcast."""
+    front: np.ndarray            # load transfer + aero model
+    rear: np.ndarray
+    front_transfer: np.ndarray   # inertial load transfer only (II model)
+    rear_transfer: np.ndarray
+    drag: np.ndarray
+    downforce: np.ndarray
+
+
+def compute_loads(v, ax_smooth, params=CarParameters()):
+    """
+    Front / rear vertical load, drag and downforce.
+
+    Args:
+        v (np.ndarray): Speed in m/s.
+        ax_smooth (np.ndarray): Filtered longitudinal acceleration in m/s², same shape as v.
+        params (CarParameters): Parameters. Fields may also be numpy arrays that broadcast against v
+            (that is how the parameter sweep evaluates many cars at once).
+
+    Returns:
+        AxleLoads
+    """
+    p = params
+    static_weight_tot = p.m * p.g
+    static_weight_front = p.fraction_weight_front * static_weight_tot
+    static_weight_rear = static_weight_tot - static_weight_front
+
+    # II model: inertial load transfer. Positive acceleration -> load shifts to the rear axle (delta_load < 0)
+    delta_load = -p.cog_height / p.wheelbase * p.m * ax_smooth
+    front_transfer = static_weight_front + delta_load
+    rear_transfer = static_weight_rear - delta_load
+
+    # III model: drag and downforce
+    v2 = np.square(v)
+    drag = 0.5 * p.cda * p.rho * v2
+    downforce = 0.5 * p.cla * p.rho * v2
+    downforce_front = p.fraction_downforce_front * downforce
+    downforce_rear = (1 - p.fraction_downforce_front) * downforce
+    delta_load_drag = -p.drag_height / p.wheelbase * drag  # always negative: drag shifts load from front to rear
+
+    return AxleLoads(
+        front=front_transfer + downforce_front + delta_load_drag,
+        rear=rear_transfer + downforce_rear - delta_load_drag,
+        front_transfer=front_transfer,
+        rear_transfer=rear_transfer,
+        drag=drag,
+        downforce=downforce,
+    )
+
+
+def batch_loads(batch, params=CarParameters()):
+    """AxleLoads for every sample of a LapBatch (flat arrays, lap i is batch.offsets[i]:batch.offsets[i + 1])."""
+    _, ax_smooth = lap_batch.longitudinal_acceleration(batch)
+    return compute_loads(batch.channels['Speed'] / 3.6, ax_smooth, params)
+
+
+def lap_summaries(batch, loads):
+    """One row per lap: peak and mean front / rear load, drag and downforce."""
+    offsets = batch.offsets
+    summary = {
+        'Driver': batch.drivers,
+        'LapNumber': batch.lap_numbers,
+        'LapTime': batch.lap_times,
+        'Samples': batch.lengths,
+    }
+    for name in ('front', 'rear', 'drag', 'downforce'):
+        values = getattr(loads, name)
+        label = name.capitalize()
+        summary[f'Peak{label}'] = lap_batch.segment_reduce(np.fmax, values, offsets)
+        summary[f'Mean{label}'] = lap_batch.segment_mean(np.nan_to_num(values), offsets)
+    summary['MinFront'] = lap_batch.segment_reduce(np.fmin, loads.front, offsets)
+    return pd.DataFrame(summary)
+
+
+def session_load_summary(session, params=CarParameters(), drivers=None):
+    """Run the load model over every lap of every driver (or `drivers`) of a loaded session."""
+    batch = lap_batch.from_session(session, drivers=drivers, channels=['Speed'])
+    return lap_summaries(batch, batch_loads(batch, params))
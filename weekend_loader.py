@@ -0,0 +1,171 @@
+# Loads every session of a race weekend at once and compares a driver across them.
+# One session.load() is mostly waiting on the fastf1 cache / API and parsing, so the sessions of an event are loaded
+# concurrently on a bounded thread pool, each through session_cache.get_session (the shared registry, so a session
+# someone already loaded is not loaded twice). Sessions are yielded as they finish, and the wall time of a weekend is
+# close to that of its slowest session instead of the sum.
+#
+#   python weekend_loader.py 2023 Monza VER          # load the weekend, print load times and best laps
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import driver_index
+import schedule_index
+import session_cache
+
+MAX_WORKERS = 5     # one per session of a normal weekend
+LONG_RUN_LAPS = 5   # clean laps on one set of tyres before a stint counts as a long run
+
+BEST_LAP_COLUMNS = ['Session', 'LapNumber', 'LapTime', 'Compound', 'TyreLife', 'SpeedST', 'GapToBest']
+LONG_RUN_COLUMNS = ['Session', 'Stint', 'Compound', 'Laps', 'MeanLapTime', 'Degradation', 'FuelCorrected']
+
+
+def weekend_sessions(year, event):
+    """Sessions of an event the app can show (driver_index.SESSION_TYPES), in the order they were held."""
+    held = schedule_index.event_sessions(year, event)
+    return [s for s in held if s in driver_index.SESSION_TYPES] or list(driver_index.SESSION_TYPES)
+
+
+def load_weekend(year, event, session_types=None, max_workers=MAX_WORKERS, loader=None):
+    """
+    Load the sessions of a weekend concurrently, yielding each as soon as it is ready.
+
+    Args:
+        session_types (list): Sessions to load, default weekend_sessions(year, event).
+        max_workers (int): Sessions loading at the same time.
+        loader (callable): (year, event, session_type) -> loaded session, default session_cache.get_session.
+
+    Yields:
+        (session_type, session, seconds, error) in completion order; session is None and error the exception if that
+        session failed (e.g. not held, or no data yet), so one bad session never stops the others.
+    """
+    session_types = list(session_types or weekend_sessions(year, event))
+    loader = loader or session_cache.get_session
+
+    def load(session_type):
+        start = time.perf_counter()
+        return loader(year, event, session_type), time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(session_types))),
+                            thread_name_prefix="weekend") as pool:
+        futures = {pool.submit(load, s): s for s in session_types}
+        for future in as_completed(futures):
+            session_type = futures[future]
+            try:
+                session, seconds = future.result()
+            except Exception as e:
+                yield session_type, None, 0.0, e
+            else:
+                yield session_type, session, seconds, None
+
+
+def ordered(sessions):
+    """{session_type: session} in weekend order (FP1 ... R), whatever order they finished loading in."""
+    rank = {s: i for i, s in enumerate(schedule_index.SESSION_IDENTIFIERS.values())}
+    return dict(sorted(sessions.items(), key=lambda item: rank.get(item[0], len(rank))))
+
+
+def _fastest(session, driver):
+    """The driver's fastest lap of a session, or None if they set no timed lap there."""
+    lap = session.laps.pick_drivers(driver).pick_fastest()
+    if lap is None or lap.empty or pd.isna(lap['LapTime']):
+        return None
+    return lap
+
+
+def best_laps(sessions, driver):
+    """One row per session: the driver's fastest lap there and its gap to their best of the weekend (s)."""
+    rows = []
+    for session_type, session in ordered(sessions).items():
+        lap = _fastest(session, driver)
+        if lap is None:
+            continue
+        rows.append({
+            'Session': session_type,
+            'LapNumber': int(lap['LapNumber']),
+            'LapTime': lap['LapTime'].total_seconds(),
+            'Compound': lap['Compound'],
+            'TyreLife': lap['TyreLife'],
+            'SpeedST': lap['SpeedST'],
+        })
+    table = pd.DataFrame(rows, columns=BEST_LAP_COLUMNS[:-1])
+    table['GapToBest'] = table['LapTime'] - table['LapTime'].min()
+    return table
+
+
+def speed_traces(sessions, driver):
+    """{session_type: (distance, speed)} of the driver's fastest lap in every session, for one overlay."""
+    traces = {}
+    for session_type, session in ordered(sessions).items():
+        lap = _fastest(session, driver)
+        if lap is None:
+            continue
+        telemetry = lap.get_car_data().add_distance()
+        traces[session_type] = (telemetry['Distance'].to_numpy(dtype=np.float64),
+                                telemetry['Speed'].to_numpy(dtype=np.float64))
+    return traces
+
+
+def long_runs(sessions, driver, min_laps=LONG_RUN_LAPS):
+    """
+    The driver's long runs across the weekend: stints with at least `min_laps` clean laps, their mean raw lap time
+    and degradation slope from stint_analysis. Slopes are fitted on raw lap times for practice and qualifying
+    (their fuel loads are unknown) and on fuel-corrected ones for the race, flagged in FuelCorrected.
+    """
+    import stint_analysis
+
+    frames = []
+    for session_type, session in ordered(sessions).items():
+        analysis = stint_analysis.stint_analysis(session)
+        stints = analysis.stints[(analysis.stints['Driver'] == driver) & (analysis.stints['CleanLaps'] >= min_laps)]
+        if stints.empty:
+            continue
+        laps = analysis.laps[(analysis.laps['Driver'] == driver) & analysis.laps['Clean']]
+        mean = laps.groupby('Stint')['LapTime'].mean()
+        frames.append(pd.DataFrame({
+            'Session': session_type,
+            'Stint': stints['Stint'].astype(int).to_numpy(),
+            'Compound': stints['Compound'].to_numpy(),
+            'Laps': stints['CleanLaps'].to_numpy(),
+            'MeanLapTime': mean.reindex(stints['Stint']).to_numpy(),
+            'Degradation': stints['Degradation'].to_numpy(),
+            'FuelCorrected': analysis.fuel_corrected,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=LONG_RUN_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a whole race weekend concurrently and compare a driver.")
+    parser.add_argument("year", type=int)
+    parser.add_argument("event")
+    parser.add_argument("driver")
+    parser.add_argument("--sessions", nargs="+", help="session types (default: every session held)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--cache", default="cache", help="fastf1 cache directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    session_cache.enable_cache(args.cache)
+    sessions = {}
+    start = time.perf_counter()
+    total = 0.0
+    for session_type, session, seconds, error in load_weekend(args.year, args.event, args.sessions, args.workers):
+        if error is not None:
+            print(f"{session_type:4s} failed: {error}")
+            continue
+        sessions[session_type] = session
+        total += seconds
+        print(f"{session_type:4s} loaded in {seconds:6.1f} s")
+    print(f"wall {time.perf_counter() - start:.1f} s, sum of sessions {total:.1f} s")
+
+    if sessions:
+        print(best_laps(sessions, args.driver).round(3).to_string(index=False))
+        print(long_runs(sessions, args.driver).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()